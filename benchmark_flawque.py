@@ -0,0 +1,63 @@
+import sys
+import time
+from PyPOCL.Flaws import Flaw, Flawque
+
+def make_flaws(n):
+    flaws = []
+    for i in range(n):
+        flaw = Flaw((i,), f'flaw_{i}')
+        flaw.criteria = (i * 7919) % 101
+        flaw.risks = (i * 104729) % 13
+        flaws.append(flaw)
+    return flaws
+
+def run_benchmark(n, name='reusable'):
+    """Fill a flaw queue with n flaws, remove and reprioritize some of them and pop the rest. Measure the throughput
+    of each operation.
+
+    Args:
+        n (int): number of flaws
+        name (str): name of the queue, 'unsafe' queues are ordered by risks, other queues by criteria
+
+    Returns:
+        dict(str:float): operations per second of add, remove, reprioritize and pop
+    """
+    flaws = make_flaws(n)
+    que = Flawque(name)
+    results = {}
+
+    t0 = time.perf_counter()
+    for flaw in flaws:
+        que.add(flaw)
+    results['add'] = n / (time.perf_counter() - t0)
+
+    removed = flaws[::4]
+    t0 = time.perf_counter()
+    for flaw in removed:
+        que.remove(flaw)
+    results['remove'] = len(removed) / (time.perf_counter() - t0)
+
+    changed = flaws[1::4]
+    for flaw in changed:
+        flaw.criteria = (flaw.criteria * 31) % 101
+        flaw.risks = (flaw.risks * 7) % 13
+    t0 = time.perf_counter()
+    for flaw in changed:
+        que.reprioritize(flaw)
+    results['reprioritize'] = len(changed) / (time.perf_counter() - t0)
+
+    remaining = len(que)
+    t0 = time.perf_counter()
+    while len(que) > 0:
+        que.pop()
+    results['pop'] = remaining / (time.perf_counter() - t0)
+    return results
+
+if __name__ == '__main__':
+    sizes = [int(arg) for arg in sys.argv[1:]] or [1000, 10000, 100000]
+
+    print(f"\n{'queue':<10}{'flaws':>10}{'add/s':>14}{'remove/s':>14}{'reprio/s':>14}{'pop/s':>14}")
+    for name in ['reusable', 'unsafe']:
+        for n in sizes:
+            results = run_benchmark(n, name)
+            print(f"{name:<10}{n:>10}{results['add']:>14.0f}{results['remove']:>14.0f}{results['reprioritize']:>14.0f}{results['pop']:>14.0f}")
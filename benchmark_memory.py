@@ -0,0 +1,45 @@
+import contextlib
+import io
+import sys
+import tracemalloc
+from PyPOCL.PyDPOCL import POCLPlanner
+from PyPOCL.worldmodel import load_domain_and_problem
+from benchmark_planner import benchmark_files
+
+DEFAULT_BENCHMARK = 'manipulation-domain-many-objects'
+
+def run_benchmark(name, k=10, cutoff=60):
+    """Solve a benchmark problem while tracing memory allocations, and measure the memory held by the plans in the
+    frontier and the solutions.
+
+    Args:
+        name (str): name of the benchmark directory in tests/benchmarks
+        k (int): number of solutions to find
+        cutoff (int): time limit in seconds
+
+    Returns:
+        tuple(int, int, float): plans in the frontier and solutions after solving, bytes allocated by the search which
+            are still in use, bytes per plan
+    """
+    with contextlib.redirect_stdout(io.StringIO()):
+        domain, problem = load_domain_and_problem(*benchmark_files(name))
+        tracemalloc.start()
+        baseline, _ = tracemalloc.get_traced_memory()
+        planner = POCLPlanner(domain, problem)
+        planner.solve(k=k, cutoff=cutoff)
+        current, _ = tracemalloc.get_traced_memory()
+        tracemalloc.stop()
+    n_plans = len(planner) + len(planner.completed)
+    used = current - baseline
+    return n_plans, used, used / max(n_plans, 1)
+
+if __name__ == '__main__':
+    names = sys.argv[1:] if len(sys.argv) > 1 else [DEFAULT_BENCHMARK]
+
+    results = []
+    for name in names:
+        results.append((name, *run_benchmark(name)))
+
+    print(f"\n{'benchmark':<40}{'plans':>10}{'memory [kB]':>14}{'kB/plan':>10}")
+    for name, n_plans, used, per_plan in results:
+        print(f"{name:<40}{n_plans:>10}{used/1000:>14.1f}{per_plan/1000:>10.1f}")
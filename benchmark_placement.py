@@ -0,0 +1,94 @@
+import contextlib
+import io
+import os
+import sys
+import time
+from shapely import within, overlaps
+from PyPOCL.Ground_Compiler_Library.Element import Argument
+from PyPOCL.Ground_Compiler_Library.VariableBindingsGeometric import VariableBindingsGeometric, MARGIN_OF_ERROR
+from PyPOCL.worldmodel import load_domain_and_problem
+
+DOMAIN_FILE = 'domains/manipulation-domain/manipulation-domain.pddl'
+BATCH_DIR = 'domains/manipulation-domain-batch'
+PLACEMENT_METHODS = ['grid', 'analytic']
+
+def load_batch_problem(index):
+    problem_file = os.path.join(BATCH_DIR, f"test_{index}_problem.pddl")
+    worldmodel_file = os.path.join(BATCH_DIR, f"test_{index}_worldmodel.json")
+    with contextlib.redirect_stdout(io.StringIO()):
+        _, problem = load_domain_and_problem(DOMAIN_FILE, problem_file, worldmodel_file)
+    return problem
+
+def fill_table(problem, method, rounds=3):
+    """Place new areas for the objects of the worldmodel, one after the other. Each area must be disjunct from the
+    initial positions and from the areas placed before it, so the free space gets more fragmented with every placement.
+
+    Args:
+        problem (Problem): problem with the worldmodel
+        method (str): placement method of the geometric variable bindings
+        rounds (int): number of areas to place per object
+
+    Returns:
+        tuple(int, int, float): number of placements, number of successful placements, time spent resolving in seconds
+    """
+    vb = VariableBindingsGeometric()
+    vb.set_areas(problem.areas)
+    vb.set_base_area(problem.base_area)
+    vb.set_object_dimensions(problem.object_dimensions)
+    vb.placement = method
+
+    placed = []
+    attempts = 0
+    successes = 0
+    elapsed = 0
+    objects = sorted(problem.initial_positions, key=lambda o: o.name)
+    for obj in objects * rounds:
+        var = Argument(name=f"area_{obj.name}")
+        width, length = problem.object_dimensions[obj]
+        vb.register_variable(var, obj, width, length)
+        for area in list(problem.initial_positions.values()) + placed:
+            vb.add_disjunction(var, area)
+        attempts += 1
+        t0 = time.perf_counter()
+        success = vb.resolve(var)
+        elapsed += time.perf_counter() - t0
+        if not success:
+            continue
+        # check that the placement is valid
+        area = vb.get_assigned_area(var)
+        base = vb.defined_areas[vb.base_area].buffer(MARGIN_OF_ERROR)
+        if not within(area, base) or any(overlaps(area.buffer(-MARGIN_OF_ERROR), vb.get_area(other)) for other in vb.disjunctions[var]):
+            print(f"invalid placement of {var} with method {method}")
+            continue
+        successes += 1
+        placed.append(var)
+    return attempts, successes, elapsed
+
+def run_benchmark(indices, rounds=3):
+    """Fill the table of several worldmodels of the manipulation batch with each placement method.
+
+    Args:
+        indices (list(int)): indices of the batch problems
+        rounds (int): number of areas to place per object
+
+    Returns:
+        dict(str:tuple(int, int, float)): per placement method the placements, successful placements and time spent
+    """
+    results = {method: [0, 0, 0] for method in PLACEMENT_METHODS}
+    for index in indices:
+        problem = load_batch_problem(index)
+        for method in PLACEMENT_METHODS:
+            attempts, successes, elapsed = fill_table(problem, method, rounds)
+            results[method][0] += attempts
+            results[method][1] += successes
+            results[method][2] += elapsed
+    return {method: tuple(result) for method, result in results.items()}
+
+if __name__ == '__main__':
+    n = int(sys.argv[1]) if len(sys.argv) > 1 else 10
+    rounds = int(sys.argv[2]) if len(sys.argv) > 2 else 6
+    results = run_benchmark(range(n), rounds)
+
+    print(f"\n{'method':<12}{'groundings':>12}{'succeeded':>12}{'success [%]':>14}{'time [s]':>12}{'groundings/s':>14}")
+    for method, (attempts, successes, elapsed) in results.items():
+        print(f"{method:<12}{attempts:>12}{successes:>12}{100*successes/attempts:>14.1f}{elapsed:>12.3f}{attempts/elapsed:>14.1f}")
@@ -0,0 +1,61 @@
+import os
+import sys
+import time
+from PyPOCL import deterministic_uuid
+from PyPOCL.PyDPOCL import POCLPlanner
+from PyPOCL.worldmodel import load_domain_and_problem
+
+BENCHMARK_DIR = 'tests/benchmarks'
+
+def benchmark_files(name):
+    domain_file = os.path.join(BENCHMARK_DIR, name, "domain.pddl")
+    problem_file = os.path.join(BENCHMARK_DIR, name, "problem.pddl")
+    worldmodel_file = os.path.join(BENCHMARK_DIR, name, "worldmodel.json")
+    if not os.path.exists(worldmodel_file):
+        worldmodel_file = None
+    return domain_file, problem_file, worldmodel_file
+
+def run_benchmark(name, repeats=3, cutoff=60, lazy_successors=False):
+    """Solve a benchmark problem several times and measure the search throughput.
+
+    Args:
+        name (str): name of the benchmark directory in tests/benchmarks
+        repeats (int): number of times to solve the problem
+        cutoff (int): time limit per solve in seconds
+        lazy_successors (bool): create the successors for open conditions when they are popped
+
+    Returns:
+        tuple(int, float, float): nodes expanded, best planning time, nodes expanded per second
+    """
+    best_time = float('inf')
+    expanded = 0
+    for _ in range(repeats):
+        domain, problem = load_domain_and_problem(*benchmark_files(name))
+        planner = POCLPlanner(domain, problem, lazy_successors=lazy_successors)
+        t0 = time.perf_counter()
+        _, report = planner.solve(k=1, cutoff=cutoff)
+        elapsed = time.perf_counter() - t0
+        expanded = report.expanded
+        best_time = min(best_time, elapsed)
+    return expanded, best_time, expanded / best_time
+
+if __name__ == '__main__':
+    args = sys.argv[1:]
+    if '--integer-ids' in args:
+        args.remove('--integer-ids')
+        deterministic_uuid.use_integer_ids()
+    lazy_successors = '--lazy-successors' in args
+    if lazy_successors:
+        args.remove('--lazy-successors')
+    if len(args) > 0:
+        names = args
+    else:
+        names = sorted(name for name in os.listdir(BENCHMARK_DIR) if os.path.isdir(os.path.join(BENCHMARK_DIR, name)))
+
+    results = []
+    for name in names:
+        results.append((name, *run_benchmark(name, lazy_successors=lazy_successors)))
+
+    print(f"\n{'benchmark':<40}{'expanded':>10}{'time [s]':>12}{'nodes/s':>12}")
+    for name, expanded, best_time, rate in results:
+        print(f"{name:<40}{expanded:>10}{best_time:>12.3f}{rate:>12.1f}")
@@ -0,0 +1,54 @@
+import contextlib
+import io
+import os
+import random
+import sys
+import tempfile
+import time
+from generate_random_problems import generate_problem
+from PyPOCL.worldmodel import load_domain_and_problem, pre_process_operators
+
+DOMAIN_FILE = 'domains/manipulation-domain/manipulation-domain.pddl'
+OBJECT_COUNTS = [2, 4, 8, 16]
+
+def run_benchmark(n_objects, tmp_dir, repeats=3):
+    """Compile a random manipulation problem with n_objects objects and measure the time spent compiling and pre
+    processing the operators.
+
+    Args:
+        n_objects (int): number of objects in the problem
+        tmp_dir (str): directory to write the generated problem to
+        repeats (int): number of times to compile the problem
+
+    Returns:
+        tuple(int, float, float): number of operators, best compile time, best pre processing time
+    """
+    name = os.path.join(tmp_dir, f"n{n_objects}")
+    random.seed(n_objects)
+    with contextlib.redirect_stdout(io.StringIO()):
+        while not generate_problem(name, n_objects, 1):
+            pass
+
+    best_compile = float('inf')
+    best_preprocess = float('inf')
+    for _ in range(repeats):
+        with contextlib.redirect_stdout(io.StringIO()):
+            t0 = time.perf_counter()
+            domain, problem = load_domain_and_problem(DOMAIN_FILE, name + "_problem.pddl", name + "_worldmodel.json", use_cache=False)
+            best_compile = min(best_compile, time.perf_counter() - t0)
+            operators = domain.operators + [problem.init, problem.goal]
+            t0 = time.perf_counter()
+            pre_process_operators(operators)
+            best_preprocess = min(best_preprocess, time.perf_counter() - t0)
+    return len(operators), best_compile, best_preprocess
+
+if __name__ == '__main__':
+    counts = [int(arg) for arg in sys.argv[1:]] if len(sys.argv) > 1 else OBJECT_COUNTS
+    results = []
+    with tempfile.TemporaryDirectory() as tmp_dir:
+        for n_objects in counts:
+            results.append((n_objects, *run_benchmark(n_objects, tmp_dir)))
+
+    print(f"\n{'objects':>8}{'operators':>11}{'compile [s]':>14}{'pre process [s]':>18}")
+    for n_objects, n_operators, compile_time, preprocess_time in results:
+        print(f"{n_objects:>8}{n_operators:>11}{compile_time:>14.3f}{preprocess_time:>18.4f}")
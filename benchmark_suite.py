@@ -0,0 +1,216 @@
+import argparse
+import contextlib
+import datetime
+import io
+import json
+import os
+import platform
+import random
+import subprocess
+import sys
+import tempfile
+import time
+import tracemalloc
+from collections import defaultdict
+from generate_random_problems import generate_problem
+from PyPOCL import deterministic_uuid
+from PyPOCL.PyDPOCL import POCLPlanner
+from PyPOCL.worldmodel import load_domain_and_problem
+
+DOMAIN_FILE = 'domains/manipulation-domain/manipulation-domain.pddl'
+RESULTS_FILE = 'test_results/benchmark_suite.json'
+BASELINE_FILE = 'test_results/benchmark_baseline.json'
+RESULTS_VERSION = 1 # version of the format of the results file
+
+# problem families, each varies one parameter of generate_problem
+FAMILIES = {
+    'objects': [dict(n_objects=n, n_goals=2) for n in [2, 3, 4, 5, 6]],
+    'goals': [dict(n_objects=4, n_goals=n) for n in [1, 2, 3, 4]],
+    'clutter': [dict(n_objects=4, n_goals=2, clutter=c) for c in [0.05, 0.1, 0.15, 0.2]],
+    'reach-overlap': [dict(n_objects=4, n_goals=2, reach_overlap=w) for w in [0.6, 0.8, 1.0]],
+}
+
+# relative increase of a metric which is reported as a regression
+EXPANDED_TOLERANCE = 0.1
+TIME_TOLERANCE = 0.25
+MEMORY_TOLERANCE = 0.25
+MIN_TIME_DIFFERENCE = 0.05 # seconds, smaller differences in planning time are noise
+
+FLAW_TYPES = ['OPF', 'TCLF', 'GTF', 'GPTF', 'UGSV', 'UGGV', 'UGPV']
+
+def problem_id(family, params, instance):
+    values = ','.join(f'{key}={value}' for key, value in params.items())
+    return f'{family}/{values}/{instance}'
+
+def generate_family(family, instances, tmp_dir):
+    """generate the problems of a family. The problems only depend on the family, parameters and instance number.
+
+    Returns:
+        list(tuple(str, str, str)): id, problem file and worldmodel file of each problem
+    """
+    problems = []
+    for params in FAMILIES[family]:
+        for instance in range(instances):
+            pid = problem_id(family, params, instance)
+            name = os.path.join(tmp_dir, f'{family}_{len(problems)}')
+            random.seed(pid)
+            with contextlib.redirect_stdout(io.StringIO()):
+                while not generate_problem(name, **params):
+                    pass
+            problems.append((pid, name + '_problem.pddl', name + '_worldmodel.json'))
+    return problems
+
+def run_problem(problem_file, worldmodel_file, cutoff, measure_memory=True):
+    """Solve a problem and measure the search. The peak memory is measured in a second run, because tracing the
+    allocations slows down the search.
+
+    Returns:
+        dict: the metrics of the search
+    """
+    with contextlib.redirect_stdout(io.StringIO()):
+        deterministic_uuid.seed(0)
+        domain, problem = load_domain_and_problem(DOMAIN_FILE, problem_file, worldmodel_file)
+        planner = POCLPlanner(domain, problem, observers=[])
+        t0 = time.perf_counter()
+        plans, report = planner.solve(k=1, cutoff=cutoff, timing=True)
+        elapsed = time.perf_counter() - t0
+    # the search times the expansions per flaw type
+    flaw_times = {node.name: node.time for node in report.timings.root.children.values() if node.name in FLAW_TYPES}
+    result = {
+        'solved': len(plans) > 0,
+        'cost': plans[0].cost if plans else None,
+        'expanded': report.expanded,
+        'visited': report.visited,
+        'time': elapsed,
+        'nodes_per_second': report.expanded / elapsed,
+        'validation_time': report.validation_time,
+        'flaw_times': flaw_times,
+        'peak_memory': None,
+    }
+    if measure_memory:
+        with contextlib.redirect_stdout(io.StringIO()):
+            deterministic_uuid.seed(0)
+            domain, problem = load_domain_and_problem(DOMAIN_FILE, problem_file, worldmodel_file)
+            tracemalloc.start()
+            POCLPlanner(domain, problem, observers=[]).solve(k=1, cutoff=cutoff)
+            _, peak = tracemalloc.get_traced_memory()
+            tracemalloc.stop()
+        result['peak_memory'] = peak
+    return result
+
+def git_commit():
+    try:
+        return subprocess.run(['git', 'rev-parse', '--short', 'HEAD'], capture_output=True, text=True, check=True).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        return None
+
+def load_runs(filename):
+    """load the runs of a results file, an empty list if it does not exist"""
+    if not os.path.isfile(filename):
+        return []
+    with open(filename) as f:
+        data = json.load(f)
+    if data.get('version') != RESULTS_VERSION:
+        raise ValueError(f"{filename} has version {data.get('version')}, expected {RESULTS_VERSION}")
+    return data['runs']
+
+def save_runs(filename, runs):
+    os.makedirs(os.path.dirname(filename), exist_ok=True)
+    with open(filename, 'w') as f:
+        json.dump({'version': RESULTS_VERSION, 'runs': runs}, f, indent=1)
+
+def family_totals(results, metric):
+    """sum of a metric over the problems of each family which were solved"""
+    totals = defaultdict(float)
+    for pid, result in results.items():
+        if result['solved'] and result[metric] is not None:
+            totals[pid.split('/')[0]] += result[metric]
+    return totals
+
+def find_regressions(run, baseline):
+    """compare a run with a baseline run. The number of expanded nodes is deterministic and compared per problem, the
+    time and memory are noisy and compared per family.
+
+    Returns:
+        list(str): description of each regression
+    """
+    regressions = []
+    results = run['results']
+    base_results = baseline['results']
+    for pid, result in results.items():
+        base = base_results.get(pid)
+        if base is None or not base['solved']:
+            continue
+        if not result['solved']:
+            regressions.append(f"{pid}: no longer solved")
+        elif result['expanded'] > base['expanded'] * (1 + EXPANDED_TOLERANCE):
+            regressions.append(f"{pid}: expanded {result['expanded']} nodes, baseline {base['expanded']}")
+
+    # only compare families on the problems which both runs solved
+    common = {pid for pid in results if pid in base_results and results[pid]['solved'] and base_results[pid]['solved']}
+    for metric, tolerance, min_difference in [('time', TIME_TOLERANCE, MIN_TIME_DIFFERENCE), ('peak_memory', MEMORY_TOLERANCE, 0)]:
+        totals = family_totals({pid: results[pid] for pid in common}, metric)
+        base_totals = family_totals({pid: base_results[pid] for pid in common}, metric)
+        for family, total in totals.items():
+            base_total = base_totals.get(family, 0)
+            if base_total > 0 and total > base_total * (1 + tolerance) and total - base_total > min_difference:
+                regressions.append(f"{family}: {metric} {total:.4g}, baseline {base_total:.4g} (+{100*(total/base_total-1):.0f}%)")
+    return regressions
+
+def print_results(results):
+    flaw_types = sorted({flaw_type for result in results.values() for flaw_type in result['flaw_times']})
+    print(f"\n{'problem':<60}{'solved':>7}{'expanded':>10}{'time [s]':>10}{'nodes/s':>10}{'peak [MB]':>11}" + ''.join(f'{t:>8}' for t in flaw_types))
+    for pid, result in results.items():
+        peak = f"{result['peak_memory']/1e6:.1f}" if result['peak_memory'] is not None else '-'
+        flaw_times = ''.join(f"{result['flaw_times'].get(t, 0):>8.3f}" for t in flaw_types)
+        print(f"{pid:<60}{str(result['solved']):>7}{result['expanded']:>10}{result['time']:>10.3f}{result['nodes_per_second']:>10.1f}{peak:>11}{flaw_times}")
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser(description="Benchmark the planner on generated problem families and detect performance regressions.")
+    parser.add_argument('families', nargs='*', default=list(FAMILIES), help=f"families to run, from {list(FAMILIES)}")
+    parser.add_argument('--instances', type=int, default=3, help="number of problems per parameter value")
+    parser.add_argument('--cutoff', type=float, default=30, help="time limit per problem in seconds")
+    parser.add_argument('--no-memory', action='store_true', help="do not measure the peak memory")
+    parser.add_argument('--results', default=RESULTS_FILE, help="file to which the run is added")
+    parser.add_argument('--baseline', default=BASELINE_FILE, help="baseline to compare the run with")
+    parser.add_argument('--save-baseline', action='store_true', help="store this run as the baseline")
+    args = parser.parse_args()
+    for family in args.families:
+        if family not in FAMILIES:
+            parser.error(f"unknown family {family}, choose from {list(FAMILIES)}")
+
+    results = {}
+    with tempfile.TemporaryDirectory() as tmp_dir:
+        for family in args.families:
+            for pid, problem_file, worldmodel_file in generate_family(family, args.instances, tmp_dir):
+                print(f"running {pid}")
+                results[pid] = run_problem(problem_file, worldmodel_file, args.cutoff, not args.no_memory)
+    print_results(results)
+
+    run = {
+        'date': datetime.datetime.now().isoformat(timespec='seconds'),
+        'commit': git_commit(),
+        'python': platform.python_version(),
+        'settings': {'instances': args.instances, 'cutoff': args.cutoff},
+        'results': results,
+    }
+    runs = load_runs(args.results)
+    runs.append(run)
+    save_runs(args.results, runs)
+    print(f"\nresults added to {args.results}")
+
+    if args.save_baseline:
+        save_runs(args.baseline, [run])
+        print(f"baseline saved to {args.baseline}")
+        sys.exit(0)
+    baseline_runs = load_runs(args.baseline)
+    if len(baseline_runs) == 0:
+        print(f"no baseline in {args.baseline}, store one with --save-baseline")
+        sys.exit(0)
+    regressions = find_regressions(run, baseline_runs[-1])
+    print(f"\ncompared with the baseline of commit {baseline_runs[-1]['commit']} from {baseline_runs[-1]['date']}:")
+    for regression in regressions:
+        print(f"REGRESSION {regression}")
+    if len(regressions) == 0:
+        print("no regressions")
+    sys.exit(1 if regressions else 0)
@@ -8,6 +8,10 @@ from PyPOCL.plan_utility import check_plan, plan_to_json, visualize_plan, plan_t
 Problem = namedtuple("Problem", ["problem", "worldmodel"])
 
 LOG = 0
+# continue an interrupted batch: tests in the results file are skipped, and a test with a checkpoint is resumed from it
+RESUME = 1
+CHECKPOINT_DIR = "test_results/checkpoints"
+CHECKPOINT_INTERVAL = 60
 
 if __name__ == '__main__':
     batch_dir = "domains/manipulation-domain-batch/"
@@ -37,12 +41,28 @@ if __name__ == '__main__':
 
     # Prepare CSV file
     csv_filename = "test_results/random_batch_test_results.csv"
-    with open(csv_filename, mode="w", newline="") as csvfile:
-        fieldnames = ["iteration", "testname", "status", "plan_file", "planning_time", "expanded", "visited", "terminated", "plans_found", "assumption_failed", "nr_objects", "nr_goals"]
+    fieldnames = ["iteration", "testname", "status", "plan_file", "planning_time", "expanded", "visited", "terminated", "plans_found", "assumption_failed", "duplicates", "nr_objects", "nr_goals"]
+    finished_tests = set()
+    if RESUME and os.path.isfile(csv_filename):
+        with open(csv_filename, newline="") as csvfile:
+            for row in csv.DictReader(csvfile):
+                finished_tests.add(row["testname"])
+                success_count += row["status"] == "success"
+                faulty_plan_count += row["status"] == "faulty_plan"
+                plan_not_found_count += row["status"] == "no_plan_found"
+                error_count += row["status"] == "error"
+        iteration = len(finished_tests)
+        print(f"Resuming after {iteration} finished tests.")
+    os.makedirs(CHECKPOINT_DIR, exist_ok=True)
+
+    with open(csv_filename, mode="a" if finished_tests else "w", newline="") as csvfile:
         writer = csv.DictWriter(csvfile, fieldnames=fieldnames)
-        writer.writeheader()
+        if not finished_tests:
+            writer.writeheader()
 
         for testname, problem in problem_tuples.items():
+            if testname in finished_tests:
+                continue
             print(f"\n\niteration: {iteration}. running test: {testname}\n\n")
 
             domain, problem_obj = load_domain_and_problem(domain_file, problem.problem, problem.worldmodel)
@@ -52,9 +72,14 @@ if __name__ == '__main__':
 
             plangraph_name = f"plans/{domain.name}/{problem_obj.name}-plangraph"
 
+            checkpoint_file = os.path.join(CHECKPOINT_DIR, f"{testname}.pkl")
             planner = POCLPlanner(domain, problem_obj, LOG, plangraph_name=plangraph_name)
             try:
-                plans, planning_report = planner.solve(k=1, cutoff=600)
+                if RESUME and os.path.isfile(checkpoint_file):
+                    print(f"resuming {testname} from {checkpoint_file}")
+                    plans, planning_report = POCLPlanner.resume(checkpoint_file)
+                else:
+                    plans, planning_report = planner.solve(k=1, cutoff=600, checkpoint_file=checkpoint_file, checkpoint_interval=CHECKPOINT_INTERVAL)
             except:
                 print("error during execution")
                 error_count += 1
@@ -69,9 +94,13 @@ if __name__ == '__main__':
                     "terminated": 0,
                     "plans_found": 0,
                     "assumption_failed": 0,
+                    "duplicates": 0,
                     "nr_objects": nr_objects,
                     "nr_goals": nr_goals,
                 })
+                csvfile.flush()
+                if os.path.isfile(checkpoint_file):
+                    os.remove(checkpoint_file)
                 iteration += 1
                 continue
         
@@ -89,6 +118,7 @@ if __name__ == '__main__':
                     "terminated": planning_report.terminated,
                     "plans_found": planning_report.plans_found,
                     "assumption_failed": planning_report.assumption_failed,
+                    "duplicates": planning_report.duplicates,
                     "nr_objects": nr_objects,
                     "nr_goals": nr_goals,
                 })
@@ -117,9 +147,13 @@ if __name__ == '__main__':
                     "terminated": planning_report.terminated,
                     "plans_found": planning_report.plans_found,
                     "assumption_failed": planning_report.assumption_failed,
+                    "duplicates": planning_report.duplicates,
                     "nr_objects": nr_objects,
                     "nr_goals": nr_goals,
                 })
+            csvfile.flush()
+            if os.path.isfile(checkpoint_file):
+                os.remove(checkpoint_file)
             iteration += 1
     print(f"Done running. ran {iteration} iterations")
     print(f"{success_count} successfull.")
@@ -3,11 +3,28 @@ import random
 import json
 from shapely import box, intersects
 
-def generate_problem(name):
+def generate_problem(name, n_objects=None, n_goals=None, clutter=None, reach_overlap=None):
+    """generate a random problem and worldmodel file for the manipulation domain.
+
+    Args:
+        name (str): path of the files without the suffix
+        n_objects (int, optional): number of objects. Random if not given.
+        n_goals (int, optional): number of objects with a goal area. Random if not given.
+        clutter (float, optional): expected fraction of the table covered by objects. The objects are between 0.1 and
+            0.4 wide and long if not given.
+        reach_overlap (float, optional): width of the area which both robots can reach. Random if not given.
+
+    Returns:
+        bool: False if no collision free problem was found
+    """
     n_robots = 2
     max_nr_objects = 6
-    n_goals = random.randint(1, max_nr_objects+1)
-    n_objects = random.randint(n_goals, max_nr_objects+1)
+    if n_goals is None:
+        n_goals = random.randint(1, max_nr_objects+1 if n_objects is None else n_objects)
+    if n_objects is None:
+        n_objects = random.randint(n_goals, max_nr_objects+1)
+    if n_goals > n_objects:
+        raise ValueError(f"cannot make {n_goals} goals for {n_objects} objects")
     min_obj_size = 0.1
     max_obj_size = 0.4
     buffer = 0.1 # goal areas should be this much larger than the object
@@ -15,6 +32,13 @@ def generate_problem(name):
     goal_overlap_allowed = False
     table_width = 2.5
     table_length = 1.5
+    if clutter is not None:
+        # objects of size s on average cover the fraction clutter of the table
+        s = (clutter * table_width * table_length / n_objects) ** 0.5
+        min_obj_size = 0.5 * s
+        max_obj_size = 1.5 * s
+        if max_obj_size + buffer > max_goal_size:
+            raise ValueError(f"objects are too large for their goal areas with clutter {clutter}")
 
     attempts = 0
     max_attempts = 1000
@@ -22,7 +46,10 @@ def generate_problem(name):
     # generate the reaches of the different robots
     robot_reach = []
     if n_robots == 2:
-        width_overlap = random.uniform(max_obj_size+buffer, 1.0)
+        if reach_overlap is None:
+            width_overlap = random.uniform(max_obj_size+buffer, 1.0)
+        else:
+            width_overlap = reach_overlap
         x_overlap = (table_width-width_overlap)/2 # overlap in the middle of the table
 
         robot_reach = []
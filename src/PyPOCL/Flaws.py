@@ -1,5 +1,5 @@
-from collections import deque
-from bisect import bisect_left
+from heapq import heapify, heappop, heappush
+import copy
 
 """
 	Flaws for plan element graphs
@@ -35,6 +35,8 @@ class Flaw:
         f (tuple): A tuple representing the components of the flaw, usually containing elements that define the flaw.
         name (str): The name or type of the flaw, typically a descriptive label.
     """
+	__slots__ = 'name', 'flaw', 'cndts', 'risks', 'criteria', 'tiebreaker', 'flaw_type'
+
 	def __init__(self, f, name):
 		self.name = name
 		self.flaw = f
@@ -44,7 +46,7 @@ class Flaw:
 		self.tiebreaker = 0
 		self.flaw_type = None
 
-	#For comparison via bisect
+	# priority of flaws, Flawque._key gives the same order
 	def __lt__(self, other):
 		if self.flaw_type == 'unsafe':
 			if self.risks != other.risks:
@@ -54,11 +56,16 @@ class Flaw:
 		else:
 			return self.tiebreaker < other.tiebreaker
 
+	def copy(self, step_map):
+		"""copy the flaw for use in a new plan. step_map maps step IDs to the steps of the new plan."""
+		return copy.copy(self)
+
 	def __repr__(self):
 		return 'Flaw({}, criteria={}, tb={})'.format(self.flaw, self.criteria, self.tiebreaker)
 
 
 class OPF(Flaw):
+	__slots__ = 's_need', 'p', 'level'
 
 	def __init__(self, s_need, pre, level=0):
 		super(OPF, self).__init__((s_need, pre), 'opf')
@@ -68,6 +75,13 @@ class OPF(Flaw):
 		self.criteria = 0
 		self.tiebreaker = 0
 
+	def copy(self, step_map):
+		new_flaw = copy.copy(self)
+		# the consumer holds per plan state (open preconditions, choices)
+		new_flaw.s_need = step_map[self.s_need.ID]
+		new_flaw.flaw = (new_flaw.s_need, self.p)
+		return new_flaw
+
 	def __hash__(self):
 		return hash(self.flaw[0].ID) ^ hash(self.flaw[1].ID)
 
@@ -93,6 +107,8 @@ class TCLF(Flaw):
         threatening_step (Step): The step that threatens the validity of the causal link.
         causal_link_edge (CausalLink): The causal link that is being threatened by the step.
     """
+	__slots__ = 'threat', 'link'
+
 	def __init__(self, threatening_step, causal_link_edge):
 		super(TCLF, self).__init__((threatening_step, causal_link_edge), 'tclf')
 		self.threat = self.flaw[0]
@@ -124,6 +140,8 @@ class GTF(Flaw):
         threatening_step (Step): The step that threatens the validity of the causal link.
         causal_link_edge (CausalLink): The causal link that is being threatened by the step.
     """
+	__slots__ = 'threat', 'area'
+
 	def __init__(self, threatening_area, threatened_area):
 		super(GTF, self).__init__((threatening_area, threatened_area), 'gtf')
 		self.threat = self.flaw[0]
@@ -150,6 +168,8 @@ class GPTF(Flaw):
         threatening_area (Argument):
         threatened_path (Argument):
     """
+	__slots__ = 'threat', 'path'
+
 	def __init__(self, threatening_area, threatened_path):
 		super(GPTF, self).__init__((threatening_area, threatened_path), 'gptf')
 		self.threat = self.flaw[0]
@@ -173,6 +193,8 @@ class GPTF(Flaw):
 	# 	return hash(self.anterior.ID) ^ hash(self.posterior.ID) ^ hash(self.link.source.ID) ^ hash(self.link.sink.ID) ^ hash(self.link.label.ID)
 
 class DCF(Flaw):
+	__slots__ = ()
+
 	def __init__(self, f, name):
 		super(DCF, self).__init__(f, name)
 		self.criteria = len(f.Steps)
@@ -189,6 +211,8 @@ class UGSV(Flaw):
 	Attributes:
 		flaw (Tuple[1]): The argument of the symbolic variable that still needs to be grounded.
 	"""
+	__slots__ = 'arg',
+
 	def __init__(self, arg):
 		super(UGSV, self).__init__((arg,), f'Ungrounded_variable_{arg}')
 		self.arg = self.flaw[0]
@@ -205,6 +229,8 @@ class UGGV(Flaw):
 	Attributes:
 		flaw (Tuple[1]): The argument of the geometric variable that still needs to be grounded.
 	"""
+	__slots__ = 'arg',
+
 	def __init__(self, arg):
 		super(UGGV, self).__init__((arg,), f'Ungrounded_variable_{arg}')
 		self.arg = self.flaw[0]
@@ -221,6 +247,8 @@ class UGPV(Flaw):
 	Attributes:
 		flaw (Tuple[1]): The argument of the geometric variable that still needs to be grounded.
 	"""
+	__slots__ = 'arg',
+
 	def __init__(self, arg):
 		super(UGPV, self).__init__((arg,), f'Ungrounded_path_variable_{arg}')
 		self.arg = self.flaw[0]
@@ -231,13 +259,26 @@ class UGPV(Flaw):
 		return f'Ungrounded Geometric Path Variable ({self.flaw[0]})'
 
 class Flawque:
-	""" A deque which pretends to be a set, and keeps everything sorted, highest-value first"""
+	""" A priority queue of flaws which pretends to be a set. pop() returns the flaw with the highest priority.
+
+	Flaws are kept in a binary heap together with an index for constant time membership tests. Removed flaws stay
+	in the heap until they reach the top (lazy deletion). Flaws in the 'unsafe' queue are ordered by their risks
+	(oldest first on ties), flaws in other queues by their criteria (newest first on ties).
+	"""
 
 	def __init__(self, name=None):
-		self._flaws = deque()
+		self._heap = [] # entries [key, seq, flaw]. flaw is None if the entry was removed
+		self._index = {} # id(flaw): entry
+		self._seq = 0
 		self.name = name
 		self.count = 0
 
+	def _key(self, flaw):
+		# heapq pops the smallest key first
+		if self.name == 'unsafe':
+			return (-flaw.risks, flaw.tiebreaker)
+		return (-flaw.criteria, -flaw.tiebreaker)
+
 	def add(self, flaw):
 		flaw.flaw_type = self.name
 		flaw.tiebreaker = self.count
@@ -248,49 +289,85 @@ class Flawque:
 		for flaw in iter:
 			self.add(flaw)
 
+	def copy(self, step_map):
+		new_que = copy.copy(self)
+		new_que._heap = [[key, seq, flaw.copy(step_map)] for key, seq, flaw in self._heap if flaw is not None]
+		heapify(new_que._heap)
+		new_que._index = {id(entry[2]): entry for entry in new_que._heap}
+		return new_que
+
+	def __getstate__(self):
+		# the index is keyed by object ids, which change when pickling
+		state = self.__dict__.copy()
+		del state['_index']
+		return state
+
+	def __setstate__(self, state):
+		self.__dict__.update(state)
+		self._index = {id(entry[2]): entry for entry in self._heap if entry[2] is not None}
+
 	def __contains__(self, item):
-		return item in self._flaws
+		return id(item) in self._index
 
 	def __len__(self):
-		return len(self._flaws)
-
-	def removeDuplicates(self):
-		self._flaws = deque(set(self._flaws))
+		return len(self._index)
 
-	def head(self):
-		return self._flaws.popleft()
+	def __iter__(self):
+		""" iterate over the flaws in the queue in no particular order"""
+		return (entry[2] for entry in self._heap if entry[2] is not None)
 
-	def tail(self):
-		return self._flaws.pop()
+	def _discard_removed(self):
+		while self._heap and self._heap[0][2] is None:
+			heappop(self._heap)
 
 	def pop(self):
-		return self._flaws.pop()
+		self._discard_removed()
+		_, _, flaw = heappop(self._heap)
+		del self._index[id(flaw)]
+		return flaw
+
+	def tail(self):
+		return self.pop()
 
 	def peek(self):
-		return self._flaws[-1]
+		self._discard_removed()
+		return self._heap[0][2]
 
 	def insert(self, flaw):
-		index = bisect_left(self._flaws, flaw)
-		self._flaws.rotate(-index)
-		self._flaws.appendleft(flaw)
-		self._flaws.rotate(index)
-	
+		if id(flaw) in self._index:
+			self.remove(flaw)
+		entry = [self._key(flaw), self._seq, flaw]
+		self._seq += 1
+		self._index[id(flaw)] = entry
+		heappush(self._heap, entry)
+
 	def remove(self, flaw):
-		"""Remove a flaw from the internal deque if it exists."""
-		try:
-			self._flaws.remove(flaw)
-		except ValueError:
-			pass  # If the flaw is not present, do nothing
+		"""Remove a flaw from the queue if it exists."""
+		entry = self._index.pop(id(flaw), None)
+		if entry is not None:
+			entry[2] = None
+		if len(self._heap) > 2 * len(self._index) + 16:
+			# too many removed entries, compact the heap
+			self._heap = [entry for entry in self._heap if entry[2] is not None]
+			heapify(self._heap)
+
+	def reprioritize(self, flaw):
+		"""Update the position of a flaw in the queue after its criteria or risks changed."""
+		if self._key(flaw) != self._index[id(flaw)][0]:
+			self.insert(flaw)
 
 	def sort(self):
-		# Sort the flaws in-place by converting to a list, sorting, and reassigning to deque
-		self._flaws = deque(sorted(self._flaws))
+		"""Update the position of all flaws, e.g. after the criteria of several flaws changed."""
+		self._heap = [[self._key(flaw), seq, flaw] for _, seq, flaw in self._heap if flaw is not None]
+		heapify(self._heap)
+		self._index = {id(entry[2]): entry for entry in self._heap}
 
 	def __getitem__(self, position):
-		return self._flaws[position]
+		""" flaw at a position in order of increasing priority"""
+		return [entry[2] for entry in sorted(self._heap) if entry[2] is not None][position]
 
 	def __repr__(self):
-		return str(self._flaws)
+		return str([entry[2] for entry in sorted(self._heap) if entry[2] is not None])
 
 
 class FlawTypes:
@@ -355,11 +432,11 @@ class FlawLib:
             Returns a string representation of the `FlawLib` instance, displaying the flaw sets and their contents.
 
     Args:
-        None (this class is initialized with default flaw sets).
+        order (int): order in which the flaw types are resolved. 0 resolves symbolic variables first, 1 is the classic order.
     """
 	non_static_preds = set()
 
-	def __init__(self):
+	def __init__(self, order=0):
 		#static = unchangeable (should do oldest first.)
 		self.statics = Flawque('statics')
 
@@ -392,7 +469,7 @@ class FlawLib:
 		self.ungrounded_path_variables = Flawque('ungrounded_path_variables')
 
 		# order of flaw types to consider
-		order = 0
+		self.order = order
 		if order == 0:
 			# resolve symbolic variables (robot) first
 			self.typs = FlawTypes([self.statics,
@@ -424,6 +501,21 @@ class FlawLib:
 		else: #order == 2
 			raise NotImplementedError("Flaw order not implemented.")
 
+	def copy(self, step_map):
+		"""copy the flaw library for use in a new plan.
+
+		Args:
+			step_map (dict(uuid: Operator)): mapping between step IDs and the steps in the new plan
+		"""
+		new_lib = copy.copy(self)
+		que_map = {}
+		for name, value in vars(self).items():
+			if isinstance(value, Flawque):
+				que_map[id(value)] = value.copy(step_map)
+				setattr(new_lib, name, que_map[id(value)])
+		new_lib.typs = FlawTypes([que_map[id(flaw_set)] for flaw_set in self.typs])
+		return new_lib
+
 	def __len__(self):
 		return sum(len(flaw_set) for flaw_set in self.typs)
 
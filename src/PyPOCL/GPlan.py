@@ -3,10 +3,13 @@ from PyPOCL.Ground_Compiler_Library.GElm import GLiteral, Operator
 from PyPOCL.deterministic_uuid import duuid4
 from PyPOCL.Flaws import FlawLib, OPF, TCLF, UGSV, UGGV, UGPV
 from PyPOCL.Ground_Compiler_Library.OrderingGraph import OrderingGraph, CausalLinkGraph
+from PyPOCL.Ground_Compiler_Library.Graph import Edge
 from PyPOCL.Ground_Compiler_Library.VariableBindings import VariableBindings
 from PyPOCL.worldmodel import Domain, Problem
+from PyPOCL.clockdeco import clock
 import copy
 from collections import namedtuple
+from shapely import get_coordinates
 
 
 dummyTuple = namedtuple('dummyTuple', ['init', 'goal'])
@@ -69,6 +72,7 @@ class GPlan:
 	resolve():
 	resolve_with_primitive():
 	resolve_with_decomp():
+	signature():
 	"""
 
 	def __init__(self):
@@ -108,20 +112,20 @@ class GPlan:
 		self.steps[pos] = item
 
 	@staticmethod
-	def make_root_plan(domain: Domain, problem: Problem) -> GPlan:
+	def make_root_plan(domain: Domain, problem: Problem, flaw_order: int=0) -> GPlan:
 		"""Helper function to create a root plan at the start of planning
 
 		Args:
-			dummy_init_constructor (_type_): _description_
-			dummy_goal_constructor (_type_): _description_
-			objects (set(Argument)): list of objects in the world
-			object_types(defaultdict(str, set(str)))
+			domain (Domain): domain of the planning problem
+			problem (Problem): problem of the planning problem
+			flaw_order (int): order in which flaw types are resolved, see FlawLib
 		"""
 		if domain.name != problem.domain:
 			raise ValueError(f"Domain name {domain.name} does not match problem domain {problem.domain}")
 		root_plan = GPlan()
 		root_plan.domain = domain.name
 		root_plan.problem = problem.name
+		root_plan.flaws = FlawLib(flaw_order)
 
 		root_plan.dummy = dummyTuple(problem.init, problem.goal)
 
@@ -167,11 +171,31 @@ class GPlan:
 			print('{} {} {}'.format(i, s, s.ID))
 		raise ValueError('ID={} not found in plan {}'.format(id, self.name))
 
+	@clock
 	def instantiate(self, add_to_name):
-		new_self = copy.deepcopy(self)
+		"""create a child plan which can be modified without changing this plan.
+
+		Only the mutable parts of the plan are copied. Immutable data such as the ground literals, arguments,
+		ordering edges and polygons are shared between the parent and the child plan.
+
+		Args:
+			add_to_name (str): string to append to the name of the new plan
+		"""
+		new_self = copy.copy(self)
 		new_self.ID = duuid4()
 		new_self.name += add_to_name
-		# refresh attributes
+
+		# copy the steps since they hold per plan state. Graph elements keep refering to the steps of the parent,
+		# these are only used for their identity.
+		step_map = {step.ID: step.copy() for step in self.steps}
+		new_self.steps = [step_map[step.ID] for step in self.steps]
+		new_self.dummy = dummyTuple(step_map[self.dummy.init.ID], step_map[self.dummy.goal.ID])
+
+		new_self.OrderingGraph = self.OrderingGraph.copy()
+		new_self.CausalLinkGraph = self.CausalLinkGraph.copy()
+		new_self.variableBindings = self.variableBindings.copy()
+		new_self.flaws = self.flaws.copy(step_map)
+		new_self.potential_tclf = [tclf.copy(step_map) for tclf in self.potential_tclf]
 		return new_self
 
 	# @property
@@ -590,16 +614,16 @@ class GPlan:
 		Update the criteria for flaws
 		"""
 		# ungrounded symbolic variables
-		for flaw in self.flaws.ungrounded_symbolic_variables:
+		for flaw in list(self.flaws.ungrounded_symbolic_variables):
 			if self.variableBindings.symbolic_vb.is_ground(flaw.arg):
 				# remove flaw from flawlist
 				self.log_message(f"removing flaw {flaw} as variable is already ground.")
 				self.flaws.ungrounded_symbolic_variables.remove(flaw)
 
 		# ungrounded geometric variables
-		for flaw in self.flaws.ungrounded_geometric_variables:
+		for flaw in list(self.flaws.ungrounded_geometric_variables):
 			flaw.criteria = 1 / self.variableBindings.geometric_vb.get_max_area(flaw.arg).area
-		self.flaws.ungrounded_geometric_variables.sort()
+			self.flaws.ungrounded_geometric_variables.reprioritize(flaw)
 
 		# check if any potential TCLFs are fully initialised
 		for pot_tclf in self.potential_tclf:
@@ -705,6 +729,103 @@ class GPlan:
 						source = step
 		return(source, sink)
 
+	def signature(self) -> int:
+		"""Canonical hash of the plan contents which does not depend on the IDs of the steps and their arguments.
+		Plans with the same steps, causal links, orderings, bindings and flaws have the same signature.
+
+		Steps are labelled by their ground step and the values of their arguments. These labels are refined with the
+		labels of the neighbouring steps in the ordering and causal link graphs (Weisfeiler-Lehman refinement). Unbound
+		variables are labelled by the steps they are an argument of, and by the labels of the variables and areas they
+		are constrained against. Flaws are labelled by the steps, causal links and variables they refer to.
+		"""
+		vb = self.variableBindings
+		sym_vb = vb.symbolic_vb
+		geo_vb = vb.geometric_vb
+
+		# an argument can be shared by several steps
+		positions = {}
+		for step in self.steps:
+			for i, arg in enumerate(step.Args):
+				positions.setdefault(arg, []).append((step.ID, i))
+
+		def group_label(group, colors):
+			const = sym_vb.const[group]
+			if const is not None:
+				return ('c', const.name)
+			return ('v', tuple(sorted((colors[ID], i) for var in sym_vb.group_members[group] for ID, i in positions.get(var, []))))
+
+		def arg_label(arg, colors):
+			"""label of the value of an argument, or of its positions in the steps if it has no value"""
+			if arg in sym_vb.group_mapping:
+				return group_label(sym_vb.group_mapping[arg], colors)
+			if arg in geo_vb.defined_areas:
+				return ('d', arg.name)
+			if arg == geo_vb.base_area:
+				return ('b',)
+			if arg in geo_vb.placelocs and geo_vb.placelocs[arg].area_assigned is not None:
+				return ('a', get_coordinates(geo_vb.placelocs[arg].area_assigned).round(6).tobytes())
+			if arg in geo_vb.paths and geo_vb.paths[arg].path_assigned is not None:
+				return ('p', get_coordinates(geo_vb.paths[arg].path_assigned).round(6).tobytes())
+			return ('g', arg.typ, tuple(sorted((colors[ID], i) for ID, i in positions.get(arg, []))))
+
+		def constrained_label(arg, colors):
+			"""label of an argument including the labels of the variables and areas an unbound variable is constrained against"""
+			label = arg_label(arg, colors)
+			if label[0] == 'v':
+				group = sym_vb.group_mapping[arg]
+				return label + (tuple(sorted(hash(group_label(other, colors)) for other in sym_vb.non_codesignations[group])),)
+			if label[0] == 'g':
+				within_areas = tuple(sorted(hash(arg_label(area, colors)) for area in geo_vb.within_mapping.get(arg, [])))
+				disjunct_areas = tuple(sorted(hash(arg_label(area, colors)) for area in geo_vb.disjunctions.get(arg, [])))
+				location = geo_vb.placelocs.get(arg) or geo_vb.paths.get(arg)
+				obj = arg_label(location.object, colors) if location is not None and location.object is not None else None
+				return label + (within_areas, disjunct_areas, obj)
+			return label
+
+		successors = {step.ID: [] for step in self.steps}
+		predecessors = {step.ID: [] for step in self.steps}
+		for edge in self.OrderingGraph.edges:
+			successors[edge.source.ID].append((0, edge.sink.ID))
+			predecessors[edge.sink.ID].append((0, edge.source.ID))
+		for edge in self.CausalLinkGraph.edges:
+			label = hash((edge.label.source.ID, edge.label.sink.ID))
+			successors[edge.source.ID].append((label, edge.sink.ID))
+			predecessors[edge.sink.ID].append((label, edge.source.ID))
+
+		def refine(colors):
+			"""refine the colors of the steps until the partition of the steps is stable"""
+			num_colors = len(set(colors.values()))
+			for _ in range(len(self.steps)):
+				colors = {ID: hash((color,
+									tuple(sorted((label, colors[other]) for label, other in successors[ID])),
+									tuple(sorted((label, colors[other]) for label, other in predecessors[ID]))))
+						  for ID, color in colors.items()}
+				new_num_colors = len(set(colors.values()))
+				if new_num_colors == num_colors:
+					break
+				num_colors = new_num_colors
+			return colors
+
+		# positions of unbound variables are first labelled by the ground steps, then by the refined steps
+		step_colors = {step.ID: step.stepnum for step in self.steps}
+		colors = refine({step.ID: hash((step.stepnum, tuple(arg_label(arg, step_colors) for arg in step.Args))) for step in self.steps})
+		colors = refine({step.ID: hash((colors[step.ID], tuple(constrained_label(arg, colors) for arg in step.Args))) for step in self.steps})
+
+		def flaw_part_label(part):
+			if isinstance(part, Operator):
+				return ('s', colors.get(part.ID))
+			if isinstance(part, GLiteral):
+				return ('l', part.ID)
+			if isinstance(part, Edge): # causal link
+				return ('e', colors.get(part.source.ID), colors.get(part.sink.ID), part.label.source.ID, part.label.sink.ID)
+			return constrained_label(part, colors)
+
+		# threats which are not detected yet are part of the plan state as well
+		flaw_sets = list(self.flaws.typs) + [self.potential_tclf]
+		flaws = tuple(sorted(hash((i, type(flaw).__name__, tuple(flaw_part_label(part) for part in flaw.flaw)))
+							 for i, flaw_set in enumerate(flaw_sets) for flaw in flaw_set))
+		return hash((tuple(sorted(colors.values())), flaws))
+
 	def __lt__(self, other):
 		# if self.cost / (1 + math.log2(self.depth+1)) + self.heuristic != other.cost / (1 + math.log2(other.depth+1)) + other.heuristic:
 		# 	return self.cost / (1 + math.log2(self.depth+1)) + self.heuristic < other.cost / (1 + math.log2(other.depth+1)) + other.heuristic
@@ -718,6 +839,9 @@ class GPlan:
 			return self.cost < other.cost
 		elif self.heuristic != other.heuristic:
 			return self.heuristic < other.heuristic
+		elif not isinstance(other, GPlan):
+			# plans go before pending refinements with the same priority
+			return True
 		elif len(self.flaws) != len(other.flaws):
 			return len(self.flaws) < len(other.flaws)
 		elif len(self.CausalLinkGraph.edges) != len(other.CausalLinkGraph.edges):
@@ -17,6 +17,7 @@ from PyPOCL.deterministic_uuid import duuid4
 
 class Element:
 	"""Element is a token or label with the following attributes"""
+	__slots__ = 'ID', 'typ', 'name', 'arg_name', 'replaced_ID'
 
 	def __init__(self, ID=None, typ=None, name=None, arg_name=None):
 		if ID is None:
@@ -89,7 +90,7 @@ class Element:
 		return self
 
 	def __repr__(self):
-		id = str(self.ID)[19:23]
+		id = str(self.ID)[-4:]
 		return '({}-{}-{})'.format(id, self.typ, self.name)
 
 
@@ -207,7 +208,7 @@ class Operator(InternalElement):
 			exe = ''
 		else:
 			exe = self.executed
-		uid = str(self.ID)[19:23]
+		uid = str(self.ID)[-4:]
 		return '{}{}-{}-{}'.format(exe, self.name, self.stepnumber, uid)
 
 
@@ -268,11 +269,13 @@ class Literal(InternalElement):
 		return self
 
 	def __repr__(self):
-		shrt_id = str(self.ID)[19:23]
+		shrt_id = str(self.ID)[-4:]
 		return 'literal-{}-{}-{}'.format(shrt_id, self.truth, self.name)
 
 
 class Argument(Element):
+	__slots__ = 'p_types',
+
 	def __init__(self, ID=None, typ=None, name=None, arg_name=None):
 		if typ is None:
 			typ = 'Arg'
@@ -316,7 +319,7 @@ class Argument(Element):
 		return self
 
 	def __repr__(self):
-		shrt_id = str(self.ID)[19:23]
+		shrt_id = str(self.ID)[-4:]
 		if self.arg_name is None:
 			arg_name = ''
 		else:
@@ -330,6 +333,7 @@ class Argument(Element):
 
 class Actor(Argument):
 	""" An actor is an argument """
+	__slots__ = ()
 
 	def __init__(self, ID=None, typ=None, name=None, arg_name=None):
 		if typ is None:
@@ -343,7 +347,7 @@ class Actor(Argument):
 		return self
 
 	def __repr__(self):
-		shrt_id = str(self.ID)[19:23]
+		shrt_id = str(self.ID)[-4:]
 		if self.arg_name is None:
 			arg_name = ''
 		else:
@@ -16,6 +16,30 @@ dummyTuple = namedtuple('dummyTuple', ['init', 'final'])
 # 		self.init = init
 # 		self.final = final
 
+class StepTables:
+	"""
+	Read-only candidate and threat tables of a ground step. The tables are identical for every instance of the step,
+	so all instances refer to the same object instead of carrying a copy.
+
+	Attributes
+	----------
+	cndts : list(int)
+		step numbers of the steps which can provide a precondition
+	cndt_map : dict(uuid: list(tuple(int, int)))
+		mapping between preconditions and the (stepnr, effnr) which can provide that precondition
+	threats : list(int)
+		step numbers of the steps which can threaten a precondition
+	threat_map : dict(uuid: list(tuple(int, int)))
+		mapping between preconditions and the (stepnr, effnr) which threaten that precondition
+	"""
+	__slots__ = 'cndts', 'cndt_map', 'threats', 'threat_map'
+
+	def __init__(self, cndts=None, cndt_map=None, threats=None, threat_map=None):
+		self.cndts = cndts
+		self.cndt_map = cndt_map
+		self.threats = threats
+		self.threat_map = threat_map
+
 class Operator:
 	"""
 	Read-Only Operator
@@ -53,6 +77,8 @@ class Operator:
         ?
 	depth : int
         ?
+	tables : StepTables
+		candidate and threat tables, shared by all instances of the ground step
 	cndts : list(int)
         list of antecedents of this step. given in terms of stepnumber
 	condt_map : dict(uuid: list(tuple(int, int)))
@@ -78,12 +104,21 @@ class Operator:
 	swap_setup(plan):
 	swap_substeps():
 	instantiate():
+	copy():
 	fulfill():
 	update_choices():
 	is_cndt():
 	is_threat():
 	"""
 
+	__slots__ = ('schema', 'Args', 'ID', 'preconds', 'effects', 'stepnum', 'stepnumber', 'nonequals', 'reach_constraints',
+		'path_reach_constraints', 'paths', 'height', 'sub_steps', 'sub_orderings', 'sub_links', 'dummy', 'depth', 'tables',
+		'instantiable', 'risks', 'choices', 'choice_map', 'open_preconds', 'sibling')
+
+	# attributes which are copied for every new instance of the operator
+	instance_attributes = ('Args', 'preconds', 'effects', 'reach_constraints', 'path_reach_constraints', 'paths',
+		'risks', 'choices', 'choice_map', 'open_preconds')
+
 	def __init__(self, operator, args, preconditions, effects, stepnum, height, nonequals):
 
 		# READ-ONLY ATTRIBUTES #
@@ -118,10 +153,7 @@ class Operator:
 		# depth starts at 0 and takes on value during planning
 		self.depth = 0
 
-		self.cndts = None
-		self.cndt_map = None
-		self.threat_map = None
-		self.threats = None
+		self.tables = StepTables()
 
 		self.instantiable = True
 
@@ -157,16 +189,30 @@ class Operator:
 		:param precond_to_effect: dict of form GLiteral -> Operator^k such as D[pre.ID] -> [cndt antecedent step nums]
 		:param step_to_threat: dict of form GLiteral -> Operator^k such as D[stepnum] -> [cndt threat step nums]
 		"""
-		self.cndts = list(step_to_cndt[self.stepnum])
-		self.cndt_map = {pre.ID: list(precond_to_effect[pre.ID]) for pre in self.preconds}
-		self.threats = list(step_to_threat[self.stepnum])
-		self.threat_map = {pre.ID: list(precond_to_threat[pre.ID]) for pre in self.preconds}
+		self.tables = StepTables(
+			list(step_to_cndt[self.stepnum]),
+			{pre.ID: list(precond_to_effect[pre.ID]) for pre in self.preconds},
+			list(step_to_threat[self.stepnum]),
+			{pre.ID: list(precond_to_threat[pre.ID]) for pre in self.preconds})
 
 	def swap_setup(self, cndts, cndtmap, threats, threatmap):
-		self.cndts = cndts
-		self.cndt_map = cndtmap
-		self.threats = threats
-		self.threat_map = threatmap
+		self.tables = StepTables(cndts, cndtmap, threats, threatmap)
+
+	@property
+	def cndts(self):
+		return self.tables.cndts
+
+	@property
+	def cndt_map(self):
+		return self.tables.cndt_map
+
+	@property
+	def threats(self):
+		return self.tables.threats
+
+	@property
+	def threat_map(self):
+		return self.tables.threat_map
 
 	def swap_substeps(self, gsteps, decomp_step, num_GL_steps):
 		change_dict = {step: gsteps[step.stepnumber].instantiate() for step in decomp_step.ground_subplan.Steps}
@@ -212,7 +258,15 @@ class Operator:
 		self.dummy = dummyTuple(init_step, final_step)
 
 	def instantiate(self, default_refresh=None, default_None_is_to_refresh_open_preconds=None):
-		new_self = copy.deepcopy(self)
+		# only the attributes which refer to the arguments or hold planning state are copied. The schema, step number
+		# and the candidate and threat tables are shared with this operator.
+		new_self = copy.copy(self)
+		memo = {id(self.tables): self.tables}
+		for attr in self.instance_attributes:
+			setattr(new_self, attr, copy.deepcopy(getattr(self, attr), memo))
+		if self.height > 0:
+			for attr in ('sub_steps', 'sub_orderings', 'sub_links', 'dummy'):
+				setattr(new_self, attr, copy.deepcopy(getattr(self, attr), memo))
 		new_self.ID = duuid4()
 		arg_mapping = dict()
 		for a in self.Args:
@@ -232,6 +286,18 @@ class Operator:
 
 		return new_self
 
+	def copy(self):
+		"""
+		copy this step for use in a new plan. The step keeps its ID. Read-only attributes (Args, conditions and the
+		cndt/threat tables) are shared with the original, only the instance attributes are copied.
+		"""
+		new_self = copy.copy(self)
+		new_self.open_preconds = list(self.open_preconds)
+		new_self.choices = list(self.choices)
+		new_self.risks = list(self.risks)
+		new_self.choice_map = dict(self.choice_map)
+		return new_self
+
 	def fulfill(self, pre):
 		if self.cndt_map is None:
 			raise AttributeError('Cndt Map not found; run setup(xyz) first')
@@ -284,6 +350,8 @@ class GLiteral:
 	"""
 	A READ-ONLY Ground Literal / Condition
 	"""
+	__slots__ = 'name', 'Args', 'truth', 'ID', 'is_static'
+
 	def __init__(self, pred_name, arg_tup, trudom, _id, is_static):
 		self.name = pred_name
 		self.Args = list(arg_tup)
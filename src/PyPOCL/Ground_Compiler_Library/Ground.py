@@ -286,34 +286,56 @@ class GLib:
 		self._gsteps.extend(particles)
 
 	def load(self, antecedents, consequents):
+		effect_index = self._indexEffects(consequents)
 		for ante in antecedents:
 			# steps which have no preconditions needn't have any candidates
 			if not ante.has_cndt:
 				continue
 			for pre in ante.Preconditions:
 				print('... Processing antecedents for {} \t\tof step {}'.format(pre, ante))
-				self._loadAntecedentPerConsequent(consequents, ante, pre)
+				self._loadAntecedentPerConsequent(effect_index.get(pre.name, []), ante, pre)
 
-	def _loadAntecedentPerConsequent(self, antecedents: Set[Action], _step: Action, _pre) -> None:
-		"""check if the steps in antecedents are antecedents to a step with a certain precondition
+	def _indexEffects(self, steps):
+		"""group the effects of the steps by the name of their predicate. The effects of a step are only computed once,
+		instead of once for every precondition they are compared with.
 
 		Args:
-			antecedents (_type_): _description_
-			_step (_type_): _description_
-			_pre (_type_): _description_
+			steps (List(Action)): steps whose effects are indexed
+
+		Returns:
+			dict(str: List(Tuple(Action, List(Tuple(int, bool))))): maps a predicate name to the steps which have an effect
+				with that predicate, in the order of steps, together with the index and truth of those effects
 		"""
-		for gstep in antecedents:
+		effect_index = defaultdict(list)
+		for gstep in steps:
 			# skip steps which cannever be a candidate (such as goal)
 			if not gstep.is_cndt:
 				continue
-			if self._parseEffects(gstep, _step, _pre) > 0:
+			step_effects = defaultdict(list)
+			for i, Eff in enumerate(gstep.Effects):
+				step_effects[Eff.name].append((i, Eff.truth))
+			for name, effects in step_effects.items():
+				effect_index[name].append((gstep, effects))
+		return effect_index
+
+	def _loadAntecedentPerConsequent(self, antecedents: List, _step: Action, _pre) -> None:
+		"""check if the steps in antecedents are antecedents to a step with a certain precondition
+
+		Args:
+			antecedents (List(Tuple(Action, List(Tuple(int, bool))))): candidate steps with their effects on the predicate of _pre
+			_step (Action): step which has the precondition
+			_pre (Condition): precondition of _step
+		"""
+		for gstep, effects in antecedents:
+			if self._parseEffects(gstep, effects, _step, _pre) > 0:
 				self.ante_dict[_step.stepnumber].add(gstep.stepnumber)
 
-	def _parseEffects(self, step1, step2, pre):
+	def _parseEffects(self, step1, effects, step2, pre):
 		"""process the effects that the condition pre from step 1 has on step2. Assuming step1 precedes step2
 
 		Args:
 			step1 (Action): step whose effects are to be analysed
+			effects (List(Tuple(int, bool))): index and truth of the effects of step1 with the same predicate as pre
 			step2 (Action): step which has condition pre
 			pre (GLiteral): condition of step2 which is subject to the effects of step1
 
@@ -321,11 +343,8 @@ class GLib:
 			int: number of effects of step1 that fulfill pre of step2
 		"""
 		count = 0
-		for i in range(len(step1.Effects)):
-			Eff = step1.Effects[i]
-			if Eff.name != pre.name:
-				continue # effect is not based on the same predicate as the precondition
-			if Eff.truth != pre.truth: # the effect undoes the precondition. Add to threat list
+		for i, truth in effects:
+			if truth != pre.truth: # the effect undoes the precondition. Add to threat list
 				self.threat_dict[step2.stepnumber].add(step1.stepnumber)
 				self.flaw_threat_dict[pre.replaced_ID].add((step1.stepnumber, i))
 			else: # the effect is identical and therefore fulfills the precondition
@@ -1,4 +1,5 @@
 import collections
+import copy
 
 from PyPOCL.Ground_Compiler_Library.Graph import Graph, Edge
 from PyPOCL.Ground_Compiler_Library.Element import Element
@@ -6,14 +7,32 @@ from PyPOCL.Ground_Compiler_Library.Element import Element
 CausalLinkLabel = collections.namedtuple('CausalLinkLabel', ['source', 'sink'])
 
 class OrderingGraph(Graph):
+	"""
+	Graph of orderings between steps.
+
+	The transitive closure of the orderings is maintained incrementally as edges are added. Every element gets a dense
+	index, and for every index a bitset (int) of its descendants and its ancestors is kept. This makes isPath and
+	cycle detection constant time lookups.
+	"""
 	def __init__(self, ID=None, typ=None, name=None, Elements=None, Edges=None):
 		if typ is None:
 			typ = 'ordering graph'
 		super(OrderingGraph, self).__init__(ID, typ, name, Elements, Edges)
+		self._rebuild_reachability()
 
 	def __len__(self):
 		return len(self.edges)
 
+	def copy(self):
+		"""Copy the graph for a new plan. Elements and edges are immutable and are shared with the original."""
+		new_graph = copy.copy(self)
+		new_graph.elements = set(self.elements)
+		new_graph.edges = set(self.edges)
+		new_graph._index = dict(self._index)
+		new_graph._descendants = list(self._descendants)
+		new_graph._ancestors = list(self._ancestors)
+		return new_graph
+
 	def isInternallyConsistent(self):
 
 		if len(self) == 0:
@@ -24,28 +43,72 @@ class OrderingGraph(Graph):
 		return True
 
 	def addOrdering(self, source, sink):
-		self.elements.add(source)
-		self.elements.add(sink)
-		self.edges.add(Edge(source, sink, '<'))
+		self.addEdge(source, sink)
 
 	def addEdge(self, source, sink):
 		self.elements.add(source)
 		self.elements.add(sink)
-		self.edges.add(Edge(source, sink, '<'))
+		self._add_edge(Edge(source, sink, '<'))
+
+	# reachability index #
+
+	def _rebuild_reachability(self):
+		"""(re)build the reachability index from the edge set"""
+		self._index = {}
+		self._descendants = []
+		self._ancestors = []
+		self._cyclic = False
+		self._indexed_edges = 0
+		for edge in self.edges:
+			self._add_reachability(edge.source, edge.sink)
+		self._indexed_edges = len(self.edges)
+
+	def _sync_reachability(self):
+		"""rebuild the index if the edge set was modified directly instead of through addEdge"""
+		if self._indexed_edges != len(self.edges):
+			self._rebuild_reachability()
+
+	def _add_edge(self, edge):
+		self._sync_reachability()
+		if edge in self.edges:
+			return
+		self.edges.add(edge)
+		self._indexed_edges += 1
+		self._add_reachability(edge.source, edge.sink)
+
+	def _element_index(self, element):
+		i = self._index.get(element)
+		if i is None:
+			i = len(self._descendants)
+			self._index[element] = i
+			self._descendants.append(0)
+			self._ancestors.append(0)
+		return i
+
+	def _add_reachability(self, source, sink):
+		"""update the transitive closure with the ordering source < sink"""
+		s = self._element_index(source)
+		t = self._element_index(sink)
+		if s == t: # a step is always ordered with respect to itself
+			return
+		if self._descendants[t] >> s & 1:
+			# sink already precedes source
+			self._cyclic = True
+		new_descendants = self._descendants[t] | (1 << t)
+		new_ancestors = self._ancestors[s] | (1 << s)
+		if self._descendants[s] & new_descendants == new_descendants:
+			# ordering is already implied by the existing orderings
+			return
+		for i in _bits(new_ancestors):
+			self._descendants[i] |= new_descendants
+		for i in _bits(new_descendants):
+			self._ancestors[i] |= new_ancestors
 
 	def detectCycle(self, ):
 		''' Returns True if cycle, False otherwise
-			Strategy: for each element, find descendent elements. If a is descendant of b and b is descendant of a,
-			then there is a cycle'''
-
-		for element in self.elements:
-			visited = self.rDetectCycle(element) - {element}
-			predecessors = set(edge.source for edge in self.edges if edge.sink.ID == element.ID)
-			# predecessors = self.getParents(element)
-			for elm in visited:
-				if elm in predecessors:
-					return True
-		return False
+			Cycles are detected when the closing edge is added, so this is a lookup'''
+		self._sync_reachability()
+		return self._cyclic
 
 	######       rDetect       ####################
 	def rDetectCycle(self, element, visited=None):
@@ -71,24 +134,23 @@ class OrderingGraph(Graph):
 
 	def foundPath(self, start, finish):
 		""" Returns if there is path start to finish (1) finish to start (2) or none at all (0)"""
-		visited = self.rDetectCycle(start)
-		if visited:
-			if finish in visited:
-				return 1
-		visited2 = self.rDetectCycle(finish)
-		if visited2:
-			if start in visited2:
-				return 2
+		if self.isPath(start, finish):
+			return 1
+		if self.isPath(finish, start):
+			return 2
 		return 0
 
 	#@clock
 	def isPath(self, start, finish):
 		"""Returns True if path from start to Finish, False otherwise"""
-		visited = self.rDetectCycle(start)
-		if visited:
-			if finish in visited:
-				return True
-		return False
+		if start == finish:
+			return True
+		self._sync_reachability()
+		s = self._index.get(start)
+		t = self._index.get(finish)
+		if s is None or t is None:
+			return False
+		return bool(self._descendants[s] >> t & 1)
 
 	def topoSort(self):
 		L = []
@@ -134,18 +196,31 @@ class CausalLinkGraph(OrderingGraph):
 		super(CausalLinkGraph, self).__init__(ID, typ, name, Elements, Edges)
 		self.nonThreats = collections.defaultdict(set)
 
+	def copy(self):
+		new_graph = super(CausalLinkGraph, self).copy()
+		new_graph.nonThreats = collections.defaultdict(set, {k: set(v) for k, v in self.nonThreats.items()})
+		return new_graph
+
 	def addEdge(self, source, sink, source_condition, sink_condition):
 		self.elements.add(source)
 		self.elements.add(sink)
 		label = CausalLinkLabel(source_condition, sink_condition)
 		new_link = Edge(source, sink, label)
-		self.edges.add(new_link)
+		self._add_edge(new_link)
 		return new_link
 
 	def __repr__(self):
 		return str(['{} --{}--> {}'.format(edge.source, edge.label, edge.sink) for edge in self.edges])
 
 
+def _bits(mask):
+	"""iterate over the indices of the set bits in mask"""
+	while mask:
+		low = mask & -mask
+		yield low.bit_length() - 1
+		mask ^= low
+
+
 
 
 import unittest
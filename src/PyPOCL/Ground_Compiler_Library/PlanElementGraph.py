@@ -3,7 +3,7 @@ from PyPOCL.Ground_Compiler_Library.Flaws_unused import Flaw, FlawLib, TCLF
 from PyPOCL.Ground_Compiler_Library.Element import Argument, Element, Operator, Literal
 from PyPOCL.Ground_Compiler_Library.Graph import Edge
 from PyPOCL.Ground_Compiler_Library.ElementGraph import ElementGraph
-from PyPOCL.deterministic_uuid import duuid4
+from PyPOCL.deterministic_uuid import duuid4, creation_order
 import copy
 
 class Action(ElementGraph):
@@ -112,7 +112,7 @@ class Action(ElementGraph):
 			self.preconditions = self.getPreconditionsOrEffects(label)
 
 	def getPreconditionsOrEffects(self, label):
-		return [edge.sink for edge in self.edges if edge.label == label]
+		return sorted((edge.sink for edge in self.edges if edge.label == label), key=lambda elm: creation_order(elm.ID))
 
 	def __getattr__(self, name):
 		if name == 'preconditions':
@@ -133,14 +133,14 @@ class Action(ElementGraph):
 
 	def replaceInternals(self):
 		self.ID = duuid4()
-		for elm in self.elements:
+		for elm in sorted(self.elements, key=lambda elm: creation_order(elm.ID)):
 			if not isinstance(elm, Argument):
 				elm.ID = duuid4()
 
 	# USE THIS ONLY when creating GROUND STEPS for first time (replacing replaced_ID)
 	def _replaceInternals(self):
 		self.ID = duuid4()
-		for elm in self.elements:
+		for elm in sorted(self.elements, key=lambda elm: creation_order(elm.ID)):
 			if not isinstance(elm, Argument):
 				elm.replaced_ID = duuid4()
 
@@ -182,7 +182,7 @@ class Action(ElementGraph):
 				exe += '-'
 		else:
 			exe = 'ex'
-		id = str(self.root.ID)[19:23]
+		id = str(self.root.ID)[-4:]
 		return '{}{}-{}-{}'.format(exe, self.root.name, self.root.stepnumber, id) + args
 
 
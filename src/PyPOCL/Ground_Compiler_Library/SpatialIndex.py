@@ -0,0 +1,43 @@
+from typing import Dict, Hashable, List
+
+from shapely import STRtree
+from shapely.geometry.base import BaseGeometry
+
+class SpatialIndex:
+    """R-tree over a fixed set of geometries, used to find the geometries near a query geometry without testing all of them.
+
+    Attributes
+    ----------
+    keys : list
+        keys of the indexed geometries, in insertion order
+    geometries : list(BaseGeometry)
+        indexed geometries, in the same order as keys
+    tree : STRtree
+        shapely tree over the geometries. None if the index is empty.
+    """
+    def __init__(self, items: Dict[Hashable, BaseGeometry]):
+        self.keys = list(items.keys())
+        self.geometries = list(items.values())
+        self.tree = STRtree(self.geometries) if len(self.geometries) > 0 else None
+
+    def query(self, geometry: BaseGeometry, predicate: str = None) -> List[Hashable]:
+        """find the keys of the geometries which satisfy predicate(geometry, indexed geometry).
+
+        Args:
+            geometry (BaseGeometry): geometry to query with
+            predicate (str, optional): binary shapely predicate, e.g. 'intersects' or 'overlaps'. If None, all geometries
+                whose bounding box intersects the bounding box of the query are returned.
+
+        Returns:
+            list: keys of the matching geometries, in insertion order
+        """
+        if self.tree is None:
+            return []
+        indices = sorted(self.tree.query(geometry, predicate=predicate))
+        return [self.keys[i] for i in indices]
+
+    def __len__(self):
+        return len(self.keys)
+
+    def __repr__(self):
+        return f"spatial index with {len(self.keys)} geometries"
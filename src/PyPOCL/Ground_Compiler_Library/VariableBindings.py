@@ -1,3 +1,4 @@
+import copy
 from typing import List
 from PyPOCL.Ground_Compiler_Library.Element import Argument
 from PyPOCL.Ground_Compiler_Library.VariableBindingsSymbolic import VariableBindingsSymbolic
@@ -30,6 +31,14 @@ class VariableBindings:
     def isInternallyConsistent(self):
         return True
 
+    def copy(self):
+        """copy the variable bindings for use in a new plan. The world description (objects, types, reach) is shared."""
+        new_vb = copy.copy(self)
+        new_vb.symbolic_vb = self.symbolic_vb.copy()
+        new_vb.geometric_vb = self.geometric_vb.copy()
+        new_vb.reach_constraints = list(self.reach_constraints)
+        return new_vb
+
     def set_objects(self, objects, object_types, object_dimensions, initial_positions):
         """configure the objects present in the worldmodel
 
@@ -4,17 +4,25 @@ from typing import List
 from collections import defaultdict
 from operator import attrgetter
 from PyPOCL.Ground_Compiler_Library.Element import Argument
-from shapely import Polygon, MultiPolygon, LineString, box, difference, within, union, intersects, buffer
+import numpy as np
+import shapely
+from shapely import Polygon, MultiPolygon, LineString, box, difference, within, union, intersects, buffer, get_coordinates
+from shapely.affinity import scale, translate
 from PyPOCL.Ground_Compiler_Library.pathPlanner import find_path
+from PyPOCL.Ground_Compiler_Library.SpatialIndex import SpatialIndex
+from PyPOCL.clockdeco import clock
 
 # visualization
 import matplotlib.pyplot as plt
 from matplotlib.patches import Polygon as MplPolygon
 
 MARGIN_OF_ERROR = 1e-7 # buffer for nummerical problems
+PLACEMENT_CLEARANCE = 0.005 # distance kept to other areas when placing an area, if there is room for it
+INDEX_OVERFLOW = 16 # number of areas assigned after the spatial index was built, above which the index is rebuilt
 
 @dataclass
 class placeloc:
+    __slots__ = 'object', 'object_width', 'object_length', 'area_max', 'area_assigned'
     object: Argument
     object_width: float
     object_length: float
@@ -23,6 +31,7 @@ class placeloc:
 
 @dataclass
 class path:
+    __slots__ = 'object', 'object_width', 'object_length', 'start_area', 'goal_area', 'path_assigned', 'area_assigned'
     object: Argument
     object_width: float
     object_length: float
@@ -52,6 +61,13 @@ class VariableBindingsGeometric:
         maps a variable A to all other variables B where within(B, A) holds
     disjunctions : dict(Argument:set(Argument))
         maps a variable A to all other variable areas that must be disjunct from A
+    _static_index : SpatialIndex
+        spatial index over the defined areas
+    _dynamic_index : SpatialIndex
+        spatial index over the assigned areas of place locations and paths. Built when needed, None if outdated.
+    _unindexed : dict(Argument:Polygon)
+        areas assigned after the dynamic index was built. They are tested one by one and replace the indexed area of the
+        same variable, until there are more than INDEX_OVERFLOW of them and the index is rebuilt.
     """
     def __init__(self):
         self.base_area = None
@@ -67,13 +83,32 @@ class VariableBindingsGeometric:
         self.path_variables = []
         self.paths = {}
 
+        self._static_index = SpatialIndex({})
+        self._dynamic_index = None
+        self._unindexed = {}
+
         self.buffer = 0.05 # buffer to use when placing objects in the area.
+        self.placement = 'analytic' # 'analytic' or 'grid', method to find a position for an area
     
     def isInternallyConsistent():
         return True
 
+    def copy(self):
+        """copy the bindings for use in a new plan. Polygons are immutable and are shared between the copies."""
+        new_vb = copy.copy(self)
+        new_vb.variables = list(self.variables)
+        new_vb.placelocs = {var: copy.copy(ploc) for var, ploc in self.placelocs.items()}
+        new_vb.within_mapping = {var: list(areas) for var, areas in self.within_mapping.items()}
+        new_vb.inverse_within_mapping = {var: list(areas) for var, areas in self.inverse_within_mapping.items()}
+        new_vb.disjunctions = {var: list(areas) for var, areas in self.disjunctions.items()}
+        new_vb.path_variables = list(self.path_variables)
+        new_vb.paths = {var: copy.copy(p) for var, p in self.paths.items()}
+        new_vb._unindexed = dict(self._unindexed)
+        return new_vb
+
     def set_areas(self, areas: dict):
         self.defined_areas = areas
+        self._static_index = SpatialIndex(areas)
         for a in areas.keys():
             self.within_mapping[a] = []
             self.inverse_within_mapping[a] = []
@@ -120,6 +155,7 @@ class VariableBindingsGeometric:
                 self.paths[var].object_width = self.object_dimensions[obj_instance][0]
                 self.paths[var].object_length = self.object_dimensions[obj_instance][1]
     
+    @clock
     def set_assigned_area(self, var: Argument, area: Polygon):
         """set the area assigned to a variable. Should only be used when loading a plan from a file. Otherwise use resolve() to set the area.
 
@@ -131,6 +167,7 @@ class VariableBindingsGeometric:
             print(f"Variable {var} is not registered in the geometric variable bindings")
             return
         self.placelocs[var].area_assigned = area
+        self._update_index(var, area)
         # check if the area is within the maximum area
         if not within(area, self.placelocs[var].area_max):
             print(f"Assigned area {area} is not within maximum area {self.placelocs[var].area_max} for variable {var}")
@@ -175,6 +212,7 @@ class VariableBindingsGeometric:
             return
         self.paths[var].path_assigned = path
         self.paths[var].area_assigned = area
+        self._update_index(var, area)
 
     def get_path(self, var:Argument) -> LineString:
         if var in self.paths:
@@ -184,6 +222,38 @@ class VariableBindingsGeometric:
         print(f"Error [VariableBindingsGeometric]: Variable {var} is not registered in defined areas or in geometric variables")
         raise
 
+    def _update_index(self, var: Argument, area: Polygon):
+        """record a newly assigned area. The dynamic index is shared with the copies of the bindings, so it is not
+        modified. The area is kept aside instead, and the index is only rebuilt once enough areas were assigned."""
+        if self._dynamic_index is None:
+            return
+        self._unindexed[var] = area
+        if len(self._unindexed) > INDEX_OVERFLOW:
+            self._dynamic_index = None
+            self._unindexed = {}
+
+    @clock
+    def query_areas(self, geometry, predicate: str = 'intersects') -> set:
+        """find the defined areas and assigned areas of place locations and paths that are spatially related to a geometry.
+
+        Args:
+            geometry (BaseGeometry): geometry to query with
+            predicate (str, optional): binary shapely predicate which should hold between the geometry and the areas. Defaults to 'intersects'.
+
+        Returns:
+            set(Argument): areas and variables for which the predicate holds
+        """
+        if self._dynamic_index is None:
+            assigned = {var: ploc.area_assigned for var, ploc in self.placelocs.items() if ploc.area_assigned is not None}
+            assigned.update({var: p.area_assigned for var, p in self.paths.items() if p.area_assigned is not None})
+            self._dynamic_index = SpatialIndex(assigned)
+        found = set(self._static_index.query(geometry, predicate))
+        found.update(var for var in self._dynamic_index.query(geometry, predicate) if var not in self._unindexed)
+        if self._unindexed:
+            test = getattr(shapely, predicate)
+            found.update(var for var, area in self._unindexed.items() if area is not None and test(geometry, area))
+        return found
+
     def register_variable(self, areavar: Argument, objvar: Argument=None, width=0, length=0):
         if areavar in self.variables:
             print(f"Warning variable {areavar} is already registered")
@@ -272,6 +342,7 @@ class VariableBindingsGeometric:
         """
         return False
 
+    @clock
     def can_unify(self, varA, varB) -> bool:
         """check if area A can lie within area B
 
@@ -294,6 +365,7 @@ class VariableBindingsGeometric:
         else: # A is variable and can thus shrink
             return area_A.intersects(area_B)
 
+    @clock
     def unify(self, varA, varB) -> bool:
         """add a constraint that area A must lie within area B
 
@@ -363,6 +435,7 @@ class VariableBindingsGeometric:
                     return False
             return True
     
+    @clock
     def is_within(self, varA, varB) -> bool:
         """check if area A is within area B
 
@@ -402,6 +475,7 @@ class VariableBindingsGeometric:
             return False
         return True
     
+    @clock
     def intersect(self, varA, varB) -> bool:
         """Check if variable A and variable B intersect
 
@@ -418,6 +492,7 @@ class VariableBindingsGeometric:
             return False
         return intersects(A_area, B_area)
 
+    @clock
     def can_intersect(self, varA, varB) -> bool:
         # check if the areas can overlap
         # check if either A or B is a defined area
@@ -476,13 +551,13 @@ class VariableBindingsGeometric:
         self.disjunctions[varB].remove(varA)
         return True
 
+    @clock
     def resolve(self, var):
         """ground the variable into a concrete description of an area which fits the constrainst specified.
 
         Returns:
             bool: True if resolving succeeded. False otherwise.
         """
-        HELPER_VIZ = False # only use when debugging
         ploc = self.placelocs[var]
 
         # calculate the max area using the most recent information
@@ -497,14 +572,17 @@ class VariableBindingsGeometric:
                     disjunct_area_max = disjunct_area_max.intersection(self.placelocs[within_var].area_max)
 
         # remove all areas that are disjunct from the area_max
+        nearby = self.query_areas(disjunct_area_max)
         for d_area in self.disjunctions[var]:
             if d_area in self.defined_areas:
+                if d_area not in nearby:
+                    continue
                 disjunct_area_max = difference(disjunct_area_max, self.defined_areas[d_area])
             elif d_area in self.variables:
-                if self.placelocs[d_area].area_assigned is not None:
+                if d_area in nearby:
                     disjunct_area_max = difference(disjunct_area_max, self.placelocs[d_area].area_assigned)
             elif d_area in self.path_variables:
-                if self.paths[d_area].area_assigned is not None:
+                if d_area in nearby:
                     disjunct_area_max = difference(disjunct_area_max, self.paths[d_area].area_assigned)
             else:
                 print(f"Unkown variable {d_area} in disjunctions")
@@ -529,6 +607,7 @@ class VariableBindingsGeometric:
             if maxx - minx - (ploc.object_width) >= -MARGIN_OF_ERROR and maxy - miny - (ploc.object_length) >= -MARGIN_OF_ERROR:
                 if within(a_min, buffered_disjunct_area_max):
                     ploc.area_assigned = a_min
+                    self._update_index(var, a_min)
                     return True
 
         if a_min is None:
@@ -545,23 +624,77 @@ class VariableBindingsGeometric:
             maxx = a_min_x1 + candidate_width
             miny = a_min_y2 - candidate_length
             maxy = a_min_y1 + candidate_length
+        if self.placement == 'analytic':
+            a_candidate = self._place_box(buffered_disjunct_area_max, candidate_width, candidate_length, minx, miny, maxx, maxy)
+        elif self.placement == 'grid':
+            a_candidate = self._place_box_grid(buffered_disjunct_area_max, candidate_width, candidate_length, minx, miny, maxx, maxy, a_min)
+        else:
+            raise ValueError(f"unknown placement method {self.placement}")
+        if a_candidate is None:
+            # No solution could be found
+            return False
+        ploc.area_assigned = a_candidate
+        self._update_index(var, a_candidate)
+        return True
+
+    def _place_box(self, free_area, width, length, minx, miny, maxx, maxy):
+        """find the lowest, then leftmost, axis aligned box of size width x length within the free area, whose lower left
+        corner lies within [minx, maxx - width] x [miny, maxy - length].
+
+        The positions at which the box fits are found by eroding the free area with the box: the free area is scaled such
+        that the box becomes a square and buffered inwards with mitred corners. This is exact for axis aligned edges and
+        an approximation for others, so candidates are checked and the grid search is used if none of them fit.
+        Areas which touch other areas cut the free space for paths, so a clearance is kept to the other areas if possible.
+
+        Returns:
+            Polygon: box within the free area. None if the box does not fit.
+        """
+        ratio = width / length
+        bounds = box(minx - MARGIN_OF_ERROR, miny - MARGIN_OF_ERROR, maxx - width + MARGIN_OF_ERROR, maxy - length + MARGIN_OF_ERROR)
+        for clearance in (PLACEMENT_CLEARANCE, 0):
+            scaled_area = scale(free_area.buffer(-clearance, join_style='mitre'), 1, ratio, origin=(0, 0))
+            eroded = scale(scaled_area.buffer(-0.5*width, join_style='mitre'), 1, 1/ratio, origin=(0, 0))
+            # positions of the lower left corner of the box
+            corners = translate(eroded, -0.5*width, -0.5*length).intersection(bounds)
+            if not corners.is_empty:
+                break
+        else:
+            return None
+
+        # the lowest point of a polygon is one of its vertices. Rounding y avoids that numerical noise decides between
+        # vertices at the same height.
+        coords = get_coordinates(corners)
+        for i in np.lexsort((coords[:, 0], np.round(coords[:, 1], 6))):
+            x_pos = min(max(coords[i, 0], minx), maxx - width)
+            y_pos = min(max(coords[i, 1], miny), maxy - length)
+            a_candidate = box(x_pos, y_pos, x_pos+width, y_pos+length)
+            if within(a_candidate, free_area):
+                return a_candidate
+        return self._place_box_grid(free_area, width, length, minx, miny, maxx, maxy)
+
+    def _place_box_grid(self, free_area, width, length, minx, miny, maxx, maxy, a_min=None):
+        """find a box of size width x length within the free area by sliding it over the bounds in steps of 1 cm.
+        Used when the analytic placement cannot be trusted and to compare against.
+
+        Returns:
+            Polygon: box within the free area. None if no position on the grid fits.
+        """
+        HELPER_VIZ = False # only use when debugging
         x_pos = minx # lower left coordinate
         y_pos = miny # lower left coordinate
-        while y_pos + candidate_length <= maxy:
+        while y_pos + length <= maxy:
             # sample acceptable pose in the area_max
-            a_candidate = box(x_pos, y_pos, x_pos+candidate_width, y_pos+candidate_length)
+            a_candidate = box(x_pos, y_pos, x_pos+width, y_pos+length)
             if HELPER_VIZ:
-                self.helper_show_resolve_step(buffered_disjunct_area_max, a_min, a_candidate)
-            if within(a_candidate, buffered_disjunct_area_max):
-                ploc.area_assigned = a_candidate
-                return True
+                self.helper_show_resolve_step(free_area, a_min, a_candidate)
+            if within(a_candidate, free_area):
+                return a_candidate
             # iterate to next position
             x_pos += 0.01
-            if x_pos+candidate_width > maxx:
+            if x_pos+width > maxx:
                 x_pos = minx
                 y_pos += 0.01
-        # No solution could be found
-        return False
+        return None
 
     def resolve_all(self):
         """ground all variables into a concrete description of an area which fits the constrainst specified.
@@ -597,6 +730,7 @@ class VariableBindingsGeometric:
             if isinstance(a_min, Polygon):
                 plt.fill(*a_min.exterior.xy, color='cyan')                     
 
+    @clock
     def resolve_path(self, var):
         start_arg = self.paths[var].start_area
         start_area = self.placelocs[start_arg].area_assigned
@@ -614,6 +748,7 @@ class VariableBindingsGeometric:
         # check if the start and goal areas are connected
         # remove all areas that are disjunct from the area_max
         disjunct_areas = {}
+        nearby = self.query_areas(available_space)
         for d_arg in self.disjunctions[var]:
             if d_arg in self.defined_areas:
                 d_area = self.defined_areas[d_arg]
@@ -622,6 +757,8 @@ class VariableBindingsGeometric:
             else:
                 print(f"problem: disjunct area {d_arg} is not defined")
                 continue
+            if d_arg not in nearby:
+                continue
             available_space = difference(available_space, d_area)
             disjunct_areas[d_arg] = d_area
         # erode available space with the size of the object
@@ -657,6 +794,7 @@ class VariableBindingsGeometric:
         path_area = path.buffer(erosion_dist)
         self.paths[var].path_assigned = path
         self.paths[var].area_assigned = path_area
+        self._update_index(var, path_area)
         return True
 
     def helper_visualize_resolve_path(self, start = None, goal = None, obsts = [], eroded: Polygon = None) -> None:
@@ -711,7 +849,7 @@ class VariableBindingsGeometric:
         plt.show(block=False)
 
     def repr_arg(self, var):
-        shrt_id = str(var.ID)[19:23]
+        shrt_id = str(var.ID)[-4:]
         if var.arg_name is None:
             arg_name = ''
         else:
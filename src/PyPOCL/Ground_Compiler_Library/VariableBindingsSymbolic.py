@@ -35,6 +35,31 @@ class VariableBindingsSymbolic:
         self.group_mapping = {}
         self.group_members = {}
         self.non_codesignations = {}
+        self._owned_non_codesignations = set()
+
+    def copy(self):
+        """copy the bindings for use in a new plan.
+        The sets of non codesignations are shared between the copies until one of them modifies a set."""
+        new_vb = copy.copy(self)
+        group_copies = {group: copy.copy(group) for group in self.groups}
+        new_vb.variables = list(self.variables)
+        new_vb.groups = list(group_copies.values())
+        new_vb.group_mapping = {var: group_copies[group] for var, group in self.group_mapping.items()}
+        # group_members also keeps the members of merged groups
+        new_vb.group_members = {group_copies.get(group, group): set(members) for group, members in self.group_members.items()}
+        new_vb.const = {group_copies[group]: const for group, const in self.const.items()}
+        new_vb.non_codesignations = {group_copies[group]: ncs for group, ncs in self.non_codesignations.items()}
+        # both copies now share all sets
+        self._owned_non_codesignations = set()
+        new_vb._owned_non_codesignations = set()
+        return new_vb
+
+    def _writable_non_codesignations(self, group):
+        """get the set of non codesignations of a group, copying it first if it is shared with another plan"""
+        if group not in self._owned_non_codesignations:
+            self.non_codesignations[group] = set(self.non_codesignations[group])
+            self._owned_non_codesignations.add(group)
+        return self.non_codesignations[group]
     
     def get_const(self, var):
         return self.const[self.group_mapping[var]]
@@ -66,6 +91,7 @@ class VariableBindingsSymbolic:
         self.group_mapping[var] = param
         self.group_members[param] = {var}
         self.non_codesignations[param] = set()
+        self._owned_non_codesignations.add(param)
         # if var is an object immediately map the group to the object
         if var in self.objects:
             self.const[param] = var
@@ -142,16 +168,18 @@ class VariableBindingsSymbolic:
         # merge properties of this group
         self.group_mapping[varA].merge(self.group_mapping[varB])
         self.group_members[groupA].update(self.group_members[groupB])
-        self.non_codesignations[groupA].update(self.non_codesignations[groupB])
+        self._writable_non_codesignations(groupA).update(self.non_codesignations[groupB])
         for group in self.non_codesignations[groupB]:
-            self.non_codesignations[group].add(groupA)
-            self.non_codesignations[group].remove(groupB)
+            ncs = self._writable_non_codesignations(group)
+            ncs.add(groupA)
+            ncs.remove(groupB)
 
         # reasign members of groupB
         for v in self.group_members[groupB]:
             self.group_mapping[v] = groupA
 
         del self.non_codesignations[groupB]
+        self._owned_non_codesignations.discard(groupB)
         del self.const[groupB]
         self.groups.remove(groupB)
 
@@ -174,8 +202,8 @@ class VariableBindingsSymbolic:
         if groupA == groupB: # variables already codesignate
             return False
         
-        self.non_codesignations[groupA].add(groupB)
-        self.non_codesignations[groupB].add(groupA)
+        self._writable_non_codesignations(groupA).add(groupB)
+        self._writable_non_codesignations(groupB).add(groupA)
         return True
     
     def print_var(self, var):
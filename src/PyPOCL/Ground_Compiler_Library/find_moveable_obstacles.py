@@ -1,8 +1,9 @@
 from PyPOCL.Ground_Compiler_Library.Element import Argument
 from PyPOCL.GPlan import GPlan
+from PyPOCL.Ground_Compiler_Library.SpatialIndex import SpatialIndex
 
 from typing import List
-from shapely import Polygon, MultiPolygon, difference, within, intersects
+from shapely import Polygon, MultiPolygon, difference, within
 
 # visualization
 import matplotlib.pyplot as plt
@@ -39,11 +40,14 @@ def find_movable_obstacles(plan: GPlan, pathvar: Argument) -> List[List[Argument
     # check if the start and goal areas are connected
     # remove all areas that are disjunct from the area_max
     disjunct_args = geo_vb.disjunctions[pathvar]
+    nearby = geo_vb.query_areas(available_space)
     for d_area in disjunct_args:
         if d_area in geo_vb.defined_areas:
-            available_space = difference(available_space, geo_vb.defined_areas[d_area])
+            if d_area in nearby:
+                available_space = difference(available_space, geo_vb.defined_areas[d_area])
         elif geo_vb.placelocs[d_area].area_assigned is not None:
-            available_space = difference(available_space, geo_vb.placelocs[d_area].area_assigned)
+            if d_area in nearby:
+                available_space = difference(available_space, geo_vb.placelocs[d_area].area_assigned)
         else:
             print(f"problem: disjunct area {d_area} is not defined")
     # erode available space with the size of the object
@@ -70,23 +74,23 @@ def find_movable_obstacles(plan: GPlan, pathvar: Argument) -> List[List[Argument
 
     areas = [plan.variableBindings.geometric_vb.get_area(a) for a in all_areas]
     inflated_areas = [area.buffer(erosion_dist) for area in areas]
+    poly_index = SpatialIndex(poly_args)
+    inflated_index = SpatialIndex(dict(enumerate(inflated_areas)))
     for i in range(len(all_areas)):
         area_arg_i = all_areas[i]
         area_i = inflated_areas[i]
         # check connections to eroded
-        for poly_arg in poly_args:
-            poly = poly_args[poly_arg]
-            if intersects(poly, area_i):
-                connections[area_arg_i].append(poly_arg)
-                connections[poly_arg].append(area_arg_i)
+        for poly_arg in poly_index.query(area_i, 'intersects'):
+            connections[area_arg_i].append(poly_arg)
+            connections[poly_arg].append(area_arg_i)
         # check connections to other objects
-        for j in range(i, len(all_areas)):
+        for j in inflated_index.query(area_i, 'intersects'):
+            if j < i:
+                continue
             area_arg_j = all_areas[j]
-            area_j = inflated_areas[j]
-            if intersects(area_i, area_j):
-                # add connection between the two
-                connections[area_arg_i].append(area_arg_j)
-                connections[area_arg_j].append(area_arg_i)
+            # add connection between the two
+            connections[area_arg_i].append(area_arg_j)
+            connections[area_arg_j].append(area_arg_i)
 
     # run dijkstra algorithm over the connections
     cost_dict = dict()
@@ -1,15 +1,46 @@
 import numpy as np
 from shapely.geometry import Point
 from heapq import heappush, heappop
+from collections import OrderedDict
 
 from typing import List, Set, Tuple
-from shapely import Point, Polygon, LineString
+from PyPOCL.clockdeco import clock
+from shapely import Point, Polygon, LineString, linestrings, covers, intersects_xy, prepare, buffer
 
 # visualization
 import matplotlib.pyplot as plt
 from matplotlib.patches import Polygon as MplPolygon
 
 
+VISIBILITY_GRAPH_CACHE_SIZE = 256 # number of visibility graphs kept in the cache
+SAMPLE_MARGIN = 1e-9 # margin for testing points on a segment against the polygon
+_visibility_graph_cache = OrderedDict()
+
+def _visible(polygon: Polygon, points_a: np.ndarray, points_b: np.ndarray) -> np.ndarray:
+    """check for each pair of points whether the straight segment between them lies in the polygon
+
+    Args:
+        polygon (Polygon): prepared polygon
+        points_a (np.ndarray): (n, 2) array with the first point of each pair
+        points_b (np.ndarray): (n, 2) array with the second point of each pair
+
+    Returns:
+        np.ndarray: boolean array, True if the segment is covered by the polygon
+    """
+    visible = np.ones(len(points_a), dtype=bool)
+    # a covered segment has all its points in the polygon. Testing a few points is much cheaper than testing the
+    # segment and removes most of the segments that leave the polygon. The points are tested against a slightly larger
+    # polygon, such that rounding errors do not remove segments along the boundary.
+    outer = buffer(polygon, SAMPLE_MARGIN, join_style='mitre')
+    prepare(outer)
+    for t in (0.5, 0.25, 0.75):
+        sample = points_a[visible] + t * (points_b[visible] - points_a[visible])
+        visible[visible] = intersects_xy(outer, sample[:, 0], sample[:, 1])
+    if np.any(visible):
+        segments = linestrings(np.stack((points_a[visible], points_b[visible]), axis=1))
+        visible[visible] = covers(polygon, segments)
+    return visible
+
 def create_visibility_graph(polygon: Polygon):
     # Collect all vertices from exterior and interior rings
     exterior_coords = list(polygon.exterior.coords)[:-1]
@@ -17,44 +48,72 @@ def create_visibility_graph(polygon: Polygon):
     all_coords = exterior_coords + [pt for ring in interior_coords for pt in ring]
 
     visibility_graph = {i: [] for i in range(len(all_coords))}
+    if len(all_coords) < 2:
+        return visibility_graph, all_coords
+
+    # Check all segments at once if they are inside polygon and don't cross any holes
+    prepare(polygon)
+    coords = np.array(all_coords)
+    i_indices, j_indices = np.triu_indices(len(all_coords), k=1)
+    visible = _visible(polygon, coords[i_indices], coords[j_indices])
+    for i, j in zip(i_indices[visible].tolist(), j_indices[visible].tolist()):
+        visibility_graph[i].append(j)
+        visibility_graph[j].append(i)
 
-    for i, p1 in enumerate(all_coords):
-        for j, p2 in enumerate(all_coords):
-            if j <= i:
-                continue
-            segment = LineString([p1, p2])
+    return visibility_graph, all_coords
 
-            # Check if segment is inside polygon and doesn't cross any holes
-            if polygon.covers(segment):
-            #if polygon.contains(segment) and all(not segment.crosses(hole) for hole in hole_boundaries):
-                visibility_graph[i].append(j)
-                visibility_graph[j].append(i)
+def get_visibility_graph(polygon: Polygon):
+    """get the visibility graph of a polygon. Graphs are cached by the geometry of the polygon, such that plans with
+    the same free space share the graph. The returned graph should not be modified.
 
-    return visibility_graph, all_coords
+    Returns:
+        tuple(dict(int:list(int)), list(tuple)): adjacency lists of the graph and the coordinates of its vertices
+    """
+    key = polygon.wkb
+    if key in _visibility_graph_cache:
+        _visibility_graph_cache.move_to_end(key)
+        return _visibility_graph_cache[key]
+    graph = create_visibility_graph(polygon)
+    _visibility_graph_cache[key] = graph
+    if len(_visibility_graph_cache) > VISIBILITY_GRAPH_CACHE_SIZE:
+        _visibility_graph_cache.popitem(last=False)
+    return graph
+
+def clear_visibility_graph_cache():
+    _visibility_graph_cache.clear()
 
 def add_point_to_visibility_graph(points, visibility_graph, polygon, new_point):
     i_new_point = len(points)
     points.append(new_point)
     visibility_graph[i_new_point] = []
 
-    for i, p in enumerate(points):
-        if i == i_new_point:
-            continue
-        segment = LineString([new_point, p])
-
-        # Check if segment is inside polygon and doesn't cross any holes
-        if polygon.covers(segment):
-            visibility_graph[i].append(i_new_point)
-            visibility_graph[i_new_point].append(i)
+    prepare(polygon)
+    coords = np.array(points[:-1]).reshape(-1, 2)
+    visible = _visible(polygon, np.repeat([new_point], len(coords), axis=0), coords)
+    for i in np.flatnonzero(visible).tolist():
+        visibility_graph[i].append(i_new_point)
+        visibility_graph[i_new_point].append(i)
     return visibility_graph, points
 
 def find_path_visibility_graph(start: Point, goal: Point, free_space: Polygon):
-    visibility_graph, points = create_visibility_graph(free_space)
-    start_index = len(points)
-    visibility_graph, points = add_point_to_visibility_graph(points, visibility_graph, free_space, (start.x, start.y))
-    goal_index = len(points)
-    visibility_graph, points = add_point_to_visibility_graph(points, visibility_graph, free_space, (goal.x, goal.y))
-    
+    visibility_graph, graph_points = get_visibility_graph(free_space)
+    # connect start and goal to the cached graph without modifying it
+    start_index = len(graph_points)
+    goal_index = start_index + 1
+    points = graph_points + [(start.x, start.y), (goal.x, goal.y)]
+    prepare(free_space)
+    coords = np.array(points).reshape(-1, 2)
+    start_visible = np.flatnonzero(_visible(free_space, np.repeat(coords[[start_index]], start_index, axis=0), coords[:start_index])).tolist()
+    goal_visible = np.flatnonzero(_visible(free_space, np.repeat(coords[[goal_index]], goal_index, axis=0), coords[:goal_index])).tolist()
+    added_edges = {start_index: list(start_visible), goal_index: list(goal_visible)}
+    for i in start_visible:
+        added_edges.setdefault(i, []).append(start_index)
+    for i in goal_visible:
+        added_edges.setdefault(i, []).append(goal_index)
+
+    def neighbors(node):
+        return visibility_graph.get(node, []) + added_edges.get(node, [])
+
     #helper_visualize_visibility_graph(free_space, points, visibility_graph, start, goal)
     
     # perform A* on the visibility graph
@@ -75,7 +134,7 @@ def find_path_visibility_graph(start: Point, goal: Point, free_space: Polygon):
         if current in closed_set:
             continue
         closed_set.add(current)
-        for neighbor in visibility_graph[current]:
+        for neighbor in neighbors(current):
             cost_neighbor = cost + distance(points[current], points[neighbor])
             if neighbor not in cost_to_come or cost_neighbor < cost_to_come[neighbor]:
                 cost_to_come[neighbor] = cost_neighbor
@@ -266,6 +325,7 @@ def helper_visualize_Astart(eroded: Polygon = None,
         plot_point(ax, goal_point, color='red')
     plt.show(block=False)
 
+@clock
 def find_path(start: Point, goal: Point, free_space: Polygon):
     return find_path_visibility_graph(start, goal, free_space)
     #return find_path_Astar(start, goal, free_space)
\ No newline at end of file
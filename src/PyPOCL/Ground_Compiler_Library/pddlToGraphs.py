@@ -1,6 +1,6 @@
 from collections import defaultdict
 import copy
-from PyPOCL.deterministic_uuid import duuid4
+from PyPOCL.deterministic_uuid import duuid4, creation_order
 from PyPOCL.clockdeco import clock
 
 from PyPOCL.Ground_Compiler_Library.PlanElementGraph import Action, PlanElementGraph
@@ -171,7 +171,7 @@ def decorateElm(child, DG):
 		DG.edges.add(Edge(whichElm(arg1.key.name, DG), child_elm, label))
 	elif child.key == 'linked':
 		arg1, arg2 = child.children
-		dep = Literal(arg_name='link-condition' + str(duuid4())[19:23])
+		dep = Literal(arg_name='link-condition' + str(duuid4())[-4:])
 		Src = whichElm(arg1.key.name, DG)
 		Snk = whichElm(arg2.key.name, DG)
 		DG.CausalLinkGraph.addEdge(Src, Snk, dep)
@@ -222,7 +222,7 @@ def litFromArg(arg, DG):
 		arg = arg.children[0]
 	# arg 2 is written out
 	lit_name = arg.key
-	lit_elm = Literal(name=lit_name, arg_name=lit_name + str(duuid4())[19:23], num_args=len(arg.children), truth=neg)
+	lit_elm = Literal(name=lit_name, arg_name=lit_name + str(duuid4())[-4:], num_args=len(arg.children), truth=neg)
 	for i, ch in enumerate(arg.children):
 		e_i = whichElm(ch.key.name, DG)
 		DG.edges.add(Edge(lit_elm, e_i, i))
@@ -327,12 +327,14 @@ def domainToOperatorGraphs(domain, obj_types):
 
 	Returns:
 		Tuple(
-			set(Action) : operators
-		 	set(Action) : decomposable operators?
+			list(Action) : operators, in the order of the domain file
+		 	list(Action) : decomposable operators?
 			 )
 	"""
-	opGraphs = set()
-	dopGraphs = set()
+	# lists rather than sets, since Action hashes are not stable between runs and the order of the operators
+	# determines the step numbers
+	opGraphs = []
+	dopGraphs = []
 	for action in domain.actions:
 		op = Operator(name=action.name, num_args=len(action.parameters))
 		op_graph = Action(name=action.name, root_element=op)
@@ -364,9 +366,9 @@ def domainToOperatorGraphs(domain, obj_types):
 			# 			continue
 			# 		if d_elm.arg_name == step_elm.arg_name:
 			# 			op_graph.assign(step_elm, d_elm)
-			dopGraphs.add(op_graph)
+			dopGraphs.append(op_graph)
 		else:
-			opGraphs.add(op_graph)
+			opGraphs.append(op_graph)
 	return opGraphs, dopGraphs
 
 
@@ -429,9 +431,9 @@ def addNegativeInitStates(predicates, initAction, objects):
 
 	for p in predicates:
 
-		param_object_pairs = [[obj for obj in objs_by_type_dict[param.types[0]]] for param in p.parameters if not
-		p.parameters[0].types is None]
-		param_tuples = {i for i in itertools.product(*param_object_pairs)}
+		param_object_pairs = [sorted(objs_by_type_dict[param.types[0]], key=lambda obj: creation_order(obj.ID)) for param
+		in p.parameters if not p.parameters[0].types is None]
+		param_tuples = list(dict.fromkeys(itertools.product(*param_object_pairs)))
 
 		pred = Literal(name=p.name, arg_name='init_effect', num_args=len(
 			p.parameters), truth=False)
@@ -467,8 +469,8 @@ def parseDomAndProb(domain_file, problem_file):
 
 	Returns:
 		Tuple(
-			set(Action): operators
-			set(Action): decomposable operators
+			list(Action): operators
+			list(Action): decomposable operators
 			set(?): objects
 			_type_: object types
 			_type_: initial state
@@ -6,55 +6,69 @@ from PyPOCL.Ground_Compiler_Library.find_moveable_obstacles import find_movable_
 from PyPOCL.Flaws import Flaw, OPF, TCLF, GTF, GPTF, UGSV, UGGV, UGPV
 from PyPOCL.worldmodel import Domain, Problem
 from PyPOCL.deterministic_uuid import duuid4
+from PyPOCL import deterministic_uuid
 from PyPOCL.plan_utility import check_plan_correctness
-import math
-import graphviz
-from heapq import heappush, heappop
+from PyPOCL.search_strategies import Frontier, make_frontier
+from PyPOCL.clockdeco import Timings, clock, collect_timings, count, paused_timings, timer
+from PyPOCL.observers import ConsoleProgress, PlanGraph
+import contextlib
+import multiprocessing
+import os
+import pickle
 import time
 
 
 
-REPORT = 1
 RRP = 0
 VISUALIZE = 1
 if VISUALIZE:
 	from PyPOCL.plan_utility import visualize_plan, plan_to_dot
 	import matplotlib.pyplot as plt
 
-# graphviz colors:
-OPEN_NODE = 'cyan'
-CLOSED_NODE = 'white'
-LEAF_NODE = 'red'
-GOAL_NODE = 'green'
+PlanningReport = namedtuple("PlanningReport", ["planning_time", "expanded", "visited", "terminated", "plans_found", "assumption_failed", "duplicates", "validation_time", "timings"])
 
-PlanningReport = namedtuple("PlanningReport", ["planning_time", "expanded", "visited", "terminated", "plans_found", "assumption_failed"])
+# how thoroughly plans are checked for correctness when they are added to the frontier
+VALIDATION_LEVELS = ('off', 'incremental', 'full')
 
-class Frontier:
+class PendingRefinement:
+	"""A successor of a plan which is not created yet. It stands in for the successor in the frontier and is turned into
+	a plan when it is popped. Its cost is the cost of the successor, its heuristic is estimated with the heuristic of the
+	parent plan.
 
-	def __init__(self):
-		self._frontier = []
-
-	def __len__(self):
-		return len(self._frontier)
-
-	def __getitem__(self, position):
-		return self._frontier[position]
-
-	def pop(self):
-		return heappop(self._frontier)
-
-	def insert(self, plan):
-		heappush(self._frontier, plan)
-
-	def extend(self, itera):
-		for item in itera:
-			self.insert(item)
+	Attributes:
+		parent (GPlan): plan which is refined
+		resolver (str): 'add' (add a new step), 'reuse' (reuse an existing step) or 'init' (ground in the initial state)
+		choice (tuple): arguments of the resolver
+		cost (float): cost of the successor
+		heuristic (float): estimated heuristic of the successor
+		number (str): number of the successor, used in its name
+		order (int): creation order, breaks ties between pending refinements
+	"""
+	__slots__ = 'parent', 'resolver', 'choice', 'cost', 'heuristic', 'number', 'order'
+
+	def __init__(self, parent, resolver, choice, cost, heuristic, number, order):
+		self.parent = parent
+		self.resolver = resolver
+		self.choice = choice
+		self.cost = cost
+		self.heuristic = heuristic
+		self.number = number
+		self.order = order
+
+	def __lt__(self, other):
+		if self.cost + self.heuristic != other.cost + other.heuristic:
+			return (self.cost + self.heuristic) < (other.cost + other.heuristic)
+		elif self.cost != other.cost:
+			return self.cost < other.cost
+		elif self.heuristic != other.heuristic:
+			return self.heuristic < other.heuristic
+		elif isinstance(other, PendingRefinement):
+			return self.order < other.order
+		# plans go before pending refinements with the same priority
+		return False
 
 	def __repr__(self):
-		k = 'frontier plans\n'
-		for plan in self._frontier:
-			'{}:{} c={} h={} steps:\n{}\n'.format(k, str(plan.ID), plan.cost, plan.heuristic, plan.steps)
-		return k
+		return f'PendingRefinement({self.resolver} {self.number} of {self.parent.name})'
 
 
 class POCLPlanner:
@@ -68,18 +82,36 @@ class POCLPlanner:
         Grounded steps of the planning problem. The last two are the initial state and goal state respectively.
     ID : uuid
         unique identifier of the planner
-    h_step_dict : dict(?,?)
-        ???
-	h_lit_dict : dict(GLiteral: float)
-		cached mapping between predicates and their heuristic cost
+    h_step_dict : dict(int: float)
+        cached mapping between ground steps and their heuristic cost
+	h_lit_dict : dict(tuple(int, uuid): float)
+		cached mapping between the preconditions of ground steps and their heuristic cost
 	frontier : Frontier
-		frontier of partial plans to be explored
-	_h_visited : List(GLiteral)
-		list of predicates that have been visited by the heurisitic function
+		frontier of partial plans to be explored, its type is the search strategy
+	strategy : str
+		name of the search strategy, see search_strategies.SEARCH_STRATEGIES
+	detect_duplicates : bool
+		discard plans which are identical to a plan added to the frontier before
+	lazy_successors : bool
+		resolve open conditions with pending refinements, which are turned into plans when popped
+	validation : str
+		how plans are checked for correctness, one of VALIDATION_LEVELS
+	validation_time : float
+		time spent checking plans for correctness in seconds
+	timings : Timings
+		timers and counters of the search, None if the search is not timed
+	duplicates : int
+		number of discarded duplicate plans
+	_h_visited : set
+		preconditions and steps that are being evaluated by the heurisitic function
 	plan_num : int
 		number of plans opened
 	max_height : int
 		maximum height of the operators in the planner
+	flaw_order : int
+		order in which the flaw types are resolved, see FlawLib
+	h_weight : float
+		weight of the heuristic in the evaluation of a plan
 
     Methods
     -------
@@ -92,44 +124,77 @@ class POCLPlanner:
 	
 	Heuristic Methods
 	-------
+	precompute_heuristic():
 	h_condition():
 	h_step():
 	h_plan():
 	h_subplan():
 	"""
 
-	def __init__(self, domain: Domain, problem: Problem, log=False, plangraph_name=None) -> None:
+	def __init__(self, domain: Domain, problem: Problem, log=False, plangraph_name=None, flaw_order: int=0, h_weight: float=1, detect_duplicates: bool=False, lazy_successors: bool=False, validation: str='full', observers: list=None) -> None:
 		"""construct planner
 
 		Args:
 			domain (Domain): domain of the planning problem
 			problem (Problem): problem of the planning problem
+			plangraph_name (str): render the search graph to <plangraph_name>.dot and .svg, see observers.PlanGraph
+			flaw_order (int): order in which flaw types are resolved, see FlawLib
+			h_weight (float): weight of the heuristic in the plan evaluation cost + h_weight * heuristic
+			detect_duplicates (bool): discard plans with the same signature as a plan added to the frontier before. The
+				signature is a Weisfeiler-Lehman hash, which can in rare cases be equal for different plans, so duplicate
+				detection can make the search incomplete. Off by default.
+			lazy_successors (bool): add pending refinements to the frontier for the ways to resolve an open condition,
+				and only create a successor plan when its pending refinement is popped
+			validation (str): 'full' checks every plan added to the frontier for correctness, 'incremental' only checks
+				the parts of a plan which were changed by the refinement of its parent and 'off' checks nothing. Solutions
+				are checked in full unless validation is 'off'. The incremental check misses errors in the parts which did
+				not change, so it is only used when asked for. The checks only report errors, they do not prune plans.
+			observers (list(SearchObserver)): observers which are notified of the events of the search, see
+				PyPOCL.observers. Defaults to a ConsoleProgress. Without observers the search prints nothing.
 		"""	
 		self.ID = duuid4()
 		self.log = log # defines log level
-		self.save_plangraph = plangraph_name is not None # create a planning graph
-		if self.save_plangraph:
-			self.plangraph_name = plangraph_name
-			self.dot = graphviz.Digraph()
+		self.observers = [ConsoleProgress()] if observers is None else list(observers)
+		if plangraph_name is not None:
+			self.observers.append(PlanGraph(plangraph_name))
 
 		self.domain = domain
 		self.problem = problem
-
-		# get data from domain and problem
-		steplist = domain.operators
-		steplist.append(problem.init)  # add initial state
-		steplist.append(problem.goal)  # add goal state
-		self.gsteps = steplist
-		self.h_step_dict = dict()
-		self.h_lit_dict = dict()
+		self.flaw_order = flaw_order
+		if h_weight <= 0:
+			raise ValueError(f"heuristic weight must be positive, got {h_weight}")
+		self.h_weight = h_weight
+		if validation not in VALIDATION_LEVELS:
+			raise ValueError(f"unknown validation level {validation}, choose from {list(VALIDATION_LEVELS)}")
+		self.validation = validation
+		self.validation_time = 0
+
+		# get data from domain and problem. Initial state and goal are added last.
+		self.gsteps = domain.operators + [problem.init, problem.goal]
+		self._h_init = problem.init.effects
+		self._h_visited = set()
+		self.precompute_heuristic()
 
 		self._frontier = Frontier()
+		self.strategy = 'astar'
+		self._frontier_settings = ('astar', None, None, None) # arguments of make_frontier
+		self._successors = None # collects successor plans instead of inserting them when expanding in a worker
+		self.detect_duplicates = detect_duplicates
+		self._signatures = set() # transposition table with the signatures of all plans added to the frontier
+		self.duplicates = 0 # number of discarded duplicate plans
+		self.lazy_successors = lazy_successors
+		self._pending = 0 # number of pending refinements created
+		self._tasks = 0 # number of expansions sent to workers, numbers the blocks of integer IDs of the workers
+		self.materialized = 0 # number of pending refinements turned into plans
+		self.checkpoint_file = None
+		self.timings = None
+		self.timing_file = None
+		self._elapsed = 0
 		self.plan_num = 0
 		self.opened = 0 # number of opened plans
-		root_plan = GPlan.make_root_plan(domain, problem)
+		root_plan = GPlan.make_root_plan(domain, problem, flaw_order)
 		root_plan.log = log
 		self.insert(root_plan)
-		self._h_visited = []
 		self.max_height = self.gsteps[-3].height
 
 		self.assumption_failed = 0
@@ -147,8 +212,32 @@ class POCLPlanner:
 		return self._frontier.pop()
 
 	def insert(self, plan: GPlan, parent_plan: GPlan=None, label=None) -> None:
-		# check if the plan is correct
-		if not check_plan_correctness(plan):
+		"""evaluate a successor plan and add it to the frontier"""
+		if self._successors is None and self.is_duplicate(plan):
+			return
+		self.evaluate(plan, parent_plan)
+		self.plan_num += 1
+		count('plans')
+		if self._successors is not None:
+			self._successors.append((plan, label))
+			return
+		self.push(plan, parent_plan, label)
+
+	def evaluate(self, plan: GPlan, parent_plan: GPlan=None) -> None:
+		"""check the plan for correctness and compute its heuristic"""
+		if self.validation == 'incremental' and parent_plan is not None:
+			self.validate(plan, parent_plan)
+		elif self.validation != 'off':
+			self.validate(plan)
+		plan.heuristic = self.h_weight * self.h_plan(plan)
+
+	@clock
+	def validate(self, plan: GPlan, parent_plan: GPlan=None) -> None:
+		"""check the plan for correctness, or only the parts changed since the parent plan, and report errors"""
+		t_start = time.perf_counter()
+		correct = check_plan_correctness(plan, parent_plan)
+		self.validation_time += time.perf_counter() - t_start
+		if not correct:
 			if self.log:
 				plan.print()
 				print(f"plan.threats: {plan.flaws.threats}")
@@ -159,162 +248,413 @@ class POCLPlanner:
 					plan_to_dot(plan)
 					plt.pause(0.001)
 					print("\n\n\nWarning: inserted plan is not correct\n\n\n")
-		plan.heuristic = self.h_plan(plan)
-		self.log_message('>\tadd plan to frontier: {} with cost {} and heuristic {}\n'.format(plan.name, plan.cost, plan.heuristic))
-		if self.save_plangraph:
-			self.dot.node(f"{plan.ID}", f"plan_{self.opened}", style="filled", fillcolor=OPEN_NODE)
-			if parent_plan is not None:
-				self.dot.edge(f"{parent_plan.ID}", f"{plan.ID}", label=label)
+
+	def is_duplicate(self, plan: GPlan) -> bool:
+		"""check the plan against the transposition table and register it if it is new"""
+		if not self.detect_duplicates:
+			return False
+		signature = plan.signature()
+		if signature in self._signatures:
+			self.log_message('>\tdiscard duplicate plan: {}\n', plan.name)
+			self.duplicates += 1
+			count('duplicates')
+			return True
+		self._signatures.add(signature)
+		return False
+
+	def push(self, plan: GPlan, parent_plan: GPlan=None, label=None) -> None:
+		"""add an evaluated plan to the frontier"""
+		self.log_message('>\tadd plan to frontier: {} with cost {} and heuristic {}\n', plan.name, plan.cost, plan.heuristic)
+		if self.observers:
+			self.notify('child_inserted', plan, parent_plan, label)
 		self._frontier.insert(plan)
-		self.plan_num += 1
 		self.opened += 1
 
+	def set_strategy(self, strategy: str='astar', beam_width: int=10, max_resident: int=None, spill_dir: str=None) -> None:
+		"""change the search strategy. The plans in the frontier are moved to a frontier of the new strategy.
+
+		Args:
+			strategy (str): 'astar' (weighted A* with the heuristic weight of the planner), 'greedy' (greedy best
+				first), 'beam' (beam search) or 'dfbnb' (depth first branch and bound)
+			beam_width (int): number of plans per layer of the beam search
+			max_resident (int): maximum number of plans of the frontier in memory, the others are written to disk.
+				No limit if None. Only for 'astar' and 'greedy'.
+			spill_dir (str): directory in which the spilled plans are stored, a temporary directory by default
+		"""
+		settings = (strategy, beam_width if strategy == 'beam' else None, max_resident, spill_dir)
+		if settings == self._frontier_settings:
+			return
+		frontier = make_frontier(strategy, beam_width, max_resident, spill_dir)
+		frontier.extend(self._frontier)
+		self._frontier = frontier
+		self._frontier_settings = settings
+		self.strategy = strategy
+
 	# @clock
-	def solve(self, k: int=4, cutoff: int=60) -> List[GPlan]:
-		# find k solutions to problem
+	def solve(self, k: int=4, cutoff: int=60, workers: int=1, seed: int=0, strategy: str='astar', beam_width: int=10, max_resident: int=None, spill_dir: str=None, checkpoint_file: str=None, checkpoint_interval: float=60, timing: bool=False, timing_file: str=None) -> List[GPlan]:
+		"""find k solutions to the problem
+
+		Args:
+			k (int): number of solutions to find
+			cutoff (int): time limit in seconds. No limit if 0 or less.
+			workers (int): number of processes expanding plans. With more than one worker the best `workers` plans
+				of the frontier are expanded concurrently and their successors are returned to this frontier.
+			seed (int): seed for the IDs created by the workers. Runs with the same seed and the same number of workers
+				give the same result (given a fixed PYTHONHASHSEED).
+			strategy (str): search strategy, see set_strategy. With 'dfbnb' the search continues after k solutions
+				are found until the frontier is empty or the time is up, and the k cheapest solutions are returned.
+			beam_width (int): number of plans per layer of the beam search
+			max_resident (int): memory budget, the maximum number of plans of the frontier in memory. Plans with a
+				low priority are written to disk and read back when they are the best candidates.
+			spill_dir (str): directory in which the spilled plans are stored, a temporary directory by default
+			checkpoint_file (str): file to which the state of the search is written periodically. An interrupted
+				search can be continued from it with POCLPlanner.resume.
+			checkpoint_interval (float): time between checkpoints in seconds
+			timing (bool): time the search per flaw type, resolver and subsystem. The timings are in the PlanningReport.
+				With more than one worker the expansions in the workers are not timed.
+			timing_file (str): json file to which the timings are written after the search, implies timing
 
-		completed = []
-		expanded = 0
-		leaves = 0
-		tclf_visits = 0
+		Returns:
+			tuple(List(GPlan), PlanningReport): the plans found and statistics of the search
+		"""
+		self.prepare_search(k, cutoff, workers, seed, strategy, beam_width, max_resident, spill_dir, checkpoint_file, checkpoint_interval, timing, timing_file)
+		return self.run_search()
+
+	def prepare_search(self, k: int=4, cutoff: int=60, workers: int=1, seed: int=0, strategy: str='astar', beam_width: int=10, max_resident: int=None, spill_dir: str=None, checkpoint_file: str=None, checkpoint_interval: float=60, timing: bool=False, timing_file: str=None) -> None:
+		"""reset the statistics and store the arguments of the search, see solve"""
+		self.set_strategy(strategy, beam_width, max_resident, spill_dir)
+		self.completed = []
+		self.expanded = 0
+		self.leaves = 0
 		self.assumption_failed = 0
+		self.materialized = 0
+		self.validation_time = 0
+		self.checkpoint_file = checkpoint_file
+		self.checkpoint_interval = checkpoint_interval
+		self.timings = Timings('search') if timing or timing_file is not None else None
+		self.timing_file = timing_file
+		self._search_args = (k, cutoff, workers, seed)
+		self._elapsed = 0 # search time before the last checkpoint, when resumed
+
+	@staticmethod
+	def resume(checkpoint_file: str, cutoff: int=None) -> List[GPlan]:
+		"""continue a search from a checkpoint written by solve. The search continues from the state of the checkpoint and
+		keeps writing checkpoints to the same file. Sets are rebuilt when the checkpoint is loaded, so flaws and plans
+		which tie can be visited in another order than in an uninterrupted search.
+
+		Args:
+			checkpoint_file (str): checkpoint written by solve
+			cutoff (int): time limit in seconds, including the time spent before the checkpoint. Defaults to the time
+				limit of the interrupted search.
 
+		Returns:
+			tuple(List(GPlan), PlanningReport): the plans found and statistics of the whole search
+		"""
+		with open(checkpoint_file, 'rb') as f:
+			checkpoint = pickle.load(f)
+		planner = checkpoint['planner']
+		# continue with the IDs which would have been created after the checkpoint
+		deterministic_uuid.setstate(checkpoint['uuid_state'])
+		planner._elapsed = checkpoint['elapsed']
+		planner.checkpoint_file = checkpoint_file
+		if cutoff is not None:
+			k, _, workers, seed = planner._search_args
+			planner._search_args = (k, cutoff, workers, seed)
+		return planner.run_search()
+
+	def save_checkpoint(self, elapsed: float) -> None:
+		"""write the state of the search to the checkpoint file. The file is replaced at once, so an interruption while
+		writing leaves the previous checkpoint intact. Plans which the frontier spilled to disk are copied to the
+		directory <checkpoint_file>.runs instead of being read into memory."""
+		runs_dir = os.path.abspath(self.checkpoint_file + '.runs')
+		self._frontier.store_runs(runs_dir)
+		checkpoint = {
+			'planner': self,
+			'uuid_state': deterministic_uuid.getstate(),
+			'elapsed': elapsed,
+		}
+		tmp_file = self.checkpoint_file + '.tmp'
+		with open(tmp_file, 'wb') as f:
+			pickle.dump(checkpoint, f, protocol=pickle.HIGHEST_PROTOCOL)
+		os.replace(tmp_file, self.checkpoint_file)
+		self._frontier.remove_stored_runs(runs_dir)
+
+	def __getstate__(self):
+		state = self.__dict__.copy()
+		# figures cannot be saved in a checkpoint, a new one is created when the search is resumed
+		state.pop('geometry_fig', None)
+		return state
+
+	def run_search(self):
+		"""run the search with the arguments of solve"""
+		steps = self.run_search_iter()
+		while True:
+			try:
+				next(steps)
+			except StopIteration as stop:
+				return stop.value
+
+	def run_search_iter(self):
+		"""run the search with the arguments of solve, yielding the solutions as they are found"""
+		k, cutoff, workers, seed = self._search_args
 		if self.log and VISUALIZE:
 			self.geometry_fig = plt.figure()
 
-		t0 = time.time()
+		with contextlib.ExitStack() as stack:
+			if self.timings is not None:
+				stack.enter_context(collect_timings(self.timings))
+			try:
+				if workers <= 1:
+					result = yield from self.search(k, cutoff)
+				else:
+					pool = stack.enter_context(multiprocessing.Pool(workers, initializer=_init_worker, initargs=(self.domain, self.problem, self.log, self.flaw_order, self.h_weight, self.validation, deterministic_uuid.integer_ids())))
+					result = yield from self.search(k, cutoff, pool, workers, seed)
+			except BaseException as e:
+				# the caller closed the generator, or the search failed. search_finished is not notified.
+				if self.observers:
+					self.notify('search_aborted', None if isinstance(e, GeneratorExit) else e)
+				raise
+		if self.timing_file is not None:
+			self.timings.dump(self.timing_file)
+		return result
+
+	def solve_iter(self, k: int=4, cutoff: int=60, **kwargs):
+		"""find k solutions to the problem, and yield every solution as soon as it is found. The search is paused while
+		the caller handles a solution, this time does not count towards the time limit.
+
+		Args:
+			k (int): number of solutions to find
+			cutoff (int): time limit in seconds. No limit if 0 or less.
+			**kwargs: other arguments of solve
+
+		Yields:
+			tuple(GPlan, PlanningReport): a solution and the statistics of the search until it was found. With the
+				'dfbnb' strategy only solutions which are cheaper than the ones before are found.
+
+		Returns:
+			tuple(List(GPlan), PlanningReport): the result of solve, as value of the StopIteration
+		"""
+		self.prepare_search(k, cutoff, **kwargs)
+		return (yield from self.run_search_iter())
+
+	def search(self, k, cutoff, pool=None, workers=1, seed=0):
+		"""generator which expands plans until k solutions are found, the frontier is empty or the time is up. Yields every
+		solution with a PlanningReport and returns the plans found and a PlanningReport."""
+		t0 = time.time() - self._elapsed
 		t_report = time.time()
-		print('k={}'.format(str(k)))
-		print('time\texpanded\tvisited\tterminated\tdepth\tcost\ttrace')
+		t_checkpoint = time.time()
+		if self.observers:
+			self.notify('search_started', k)
 		while len(self) > 0:
-			if time.time() - t_report > 1: # report every second
-				elapsed = time.time() - t0
-				delay = str('%0.8f' % elapsed)
-				print(f'{delay}\t{expanded}\t{self.opened}\t{leaves}')
+			if self.observers and time.time() - t_report > 1: # report every second
+				self.notify('progress', time.time() - t0)
 				t_report = time.time()
 			if cutoff > 0 and time.time() - t0 > cutoff:
 				elapsed = time.time() - t0
 				delay = str('%0.8f' % elapsed)
-				print(f'timedout: {delay}\t {expanded}\t{self.opened}\t{leaves}')
-
-				if self.save_plangraph:
-					self.dot.render(filename=f"{self.plangraph_name}.dot", outfile=f"{self.plangraph_name}.svg")
-
-				planning_report = PlanningReport(delay, expanded, self.opened, leaves, len(completed), self.assumption_failed)
-				return [], planning_report
-
-			plan = self.pop()
-			expanded += 1
-			self.plan_num = 0 # reset branch counter
-
-			if self.save_plangraph:
-				self.dot.node(f"{plan.ID}", f"visited_{expanded}", style="filled", fillcolor=CLOSED_NODE)
-
-			if not plan.isInternallyConsistent():
-				# if plan.name[-3] == 'a':
-				# 	print('stop')
-				if self.save_plangraph:
-					self.dot.node(f"{plan.ID}", f"leaf_{leaves}", style="filled", fillcolor=LEAF_NODE)
-
-				self.log_message('prune {}'.format(plan.name))
-				if self.log:
-					plan.print()
-					if VISUALIZE:
-						visualize_plan(plan, fig=self.geometry_fig)
-						plan_to_dot(plan)
-						plt.pause(0.001)
-				leaves += 1
+				if self.observers:
+					self.notify('timeout', elapsed)
+				planning_report = PlanningReport(delay, self.expanded, self.opened, self.leaves, len(self.completed), self.assumption_failed, self.duplicates, self.validation_time, self.timings)
+				return self.finish_search(self.best_completed(k), planning_report)
+			if self.checkpoint_file is not None and time.time() - t_checkpoint > self.checkpoint_interval:
+				self.save_checkpoint(time.time() - t0)
+				t_checkpoint = time.time()
+
+			# select the plans to expand and their flaws
+			batch = []
+			while len(self) > 0 and len(batch) < workers:
+				plan = self.pop()
+				if isinstance(plan, PendingRefinement):
+					self.materialize(plan)
+					continue
+				flaw = self.select_flaw(plan, t0)
+				if flaw is not None:
+					batch.append((plan, flaw))
+					continue
+				if not plan.solved:
+					continue
+				t_pause = time.time()
+				planning_report = PlanningReport(str('%0.8f' % (t_pause - t0)), self.expanded, len(self)+self.expanded, self.leaves, len(self.completed), self.assumption_failed, self.duplicates, self.validation_time, self.timings)
+				with paused_timings():
+					yield plan, planning_report
+				# the time the caller spent handling the solution is not planning time
+				t0 += time.time() - t_pause
+				if len(self.completed) == k and not self._frontier.exhaustive:
+					elapsed = time.time() - t0
+					delay = str('%0.8f' % elapsed)
+					planning_report = PlanningReport(delay, self.expanded, len(self)+self.expanded, self.leaves, len(self.completed), self.assumption_failed, self.duplicates, self.validation_time, self.timings)
+					return self.finish_search(self.completed, planning_report)
+
+			if pool is None:
+				for plan, flaw in batch:
+					with timer(type(flaw).__name__):
+						branched = self.expand(plan, flaw)
+					if not branched:
+						self.mark_leaf(plan)
 				continue
 
-			# debugging:
-			# plan_schemata = Counter(step.schema for step in plan.steps)
-			# Counter(plan_schemata)
-			# for item, value in plan_schemata.items():
-			# 	if value > 3:
-			# 		print('check here')
-			# if len(plan_schemata) > len(set(plan_schemata)):
-			# 	print('check here')
+			# expand in the workers. Results are handled in the order of the batch to keep the search deterministic.
+			tasks = [(plan, flaw, f'{seed}-{self.expanded}-{i}', self._tasks + i) for i, (plan, flaw) in enumerate(batch)]
+			self._tasks += len(tasks)
+			for (plan, _), result in zip(batch, pool.map(_expand_in_worker, tasks)):
+				branched, successors, assumption_failed, validation_time = result
+				self.assumption_failed += assumption_failed
+				self.validation_time += validation_time
+				if not branched:
+					self.mark_leaf(plan)
+				for successor, label in successors:
+					if not self.is_duplicate(successor):
+						self.push(successor, plan, label)
 
-			self.log_message('Plan {} selected cost={} heuristic={}'.format(plan.name, plan.cost, plan.heuristic))
+		# frontier is empty
+		elapsed = time.time() - t0
+		delay = str('%0.8f' % elapsed)
+		planning_report = PlanningReport(delay, self.expanded, len(self)+self.expanded, self.leaves, len(self.completed), self.assumption_failed, self.duplicates, self.validation_time, self.timings)
+		if self._frontier.exhaustive and len(self.completed) > 0:
+			return self.finish_search(self.best_completed(k), planning_report)
+		return self.finish_search([], planning_report)
+
+	def finish_search(self, plans: List[GPlan], planning_report: PlanningReport) -> tuple:
+		"""notify the observers that the search returns"""
+		if self.observers:
+			self.notify('search_finished', plans, planning_report)
+		return plans, planning_report
+
+	def best_completed(self, k: int) -> List[GPlan]:
+		"""the k cheapest solutions found by an exhaustive search strategy, nothing for the other strategies"""
+		if not self._frontier.exhaustive:
+			return []
+		return sorted(self.completed, key=lambda plan: plan.cost)[:k]
+
+	@clock
+	def select_flaw(self, plan: GPlan, t0: float) -> Flaw:
+		"""visit a plan popped from the frontier and select the flaw to resolve next.
+
+		Returns:
+			Flaw: the selected flaw (removed from the plan), or None if the plan is pruned or complete.
+		"""
+		self.expanded += 1
+		self.plan_num = 0 # reset branch counter
+		if self.observers:
+			self.notify('node_popped', plan)
+
+		if not plan.isInternallyConsistent():
+			# if plan.name[-3] == 'a':
+			# 	print('stop')
+			self.log_message('prune {}', plan.name)
 			if self.log:
 				plan.print()
 				if VISUALIZE:
 					visualize_plan(plan, fig=self.geometry_fig)
 					plan_to_dot(plan)
 					plt.pause(0.001)
+			self.mark_leaf(plan)
+			return None
+
+		# debugging:
+		# plan_schemata = Counter(step.schema for step in plan.steps)
+		# Counter(plan_schemata)
+		# for item, value in plan_schemata.items():
+		# 	if value > 3:
+		# 		print('check here')
+		# if len(plan_schemata) > len(set(plan_schemata)):
+		# 	print('check here')
+
+		self.log_message('Plan {} selected cost={} heuristic={}', plan.name, plan.cost, plan.heuristic)
+		if self.log:
+			plan.print()
+			if VISUALIZE:
+				visualize_plan(plan, fig=self.geometry_fig)
+				plan_to_dot(plan)
+				plt.pause(0.001)
+
+		plan.update_flaws()
+
+		if len(plan.flaws) == 0:
+			plan.solved = True
+			if self.validation == 'incremental':
+				# solutions are checked in full
+				self.validate(plan)
+			# success
+			self.completed.append(plan)
+			self._frontier.solution_found(plan)
+			if self.observers:
+				self.notify('solution_found', plan, time.time() - t0)
+			return None
+
+		# Select Flaw
+		flaw = plan.flaws.next()
+		plan.name += '[' + str(flaw.flaw_type)[0] + ']'
+		self.log_message('{} selected : {}\n', flaw.name, flaw)
+		if self.observers:
+			self.notify('flaw_selected', plan, flaw)
+		return flaw
+
+	def mark_leaf(self, plan: GPlan) -> None:
+		"""register a plan which is pruned or has no successors"""
+		if self.observers:
+			self.notify('node_pruned', plan)
+		self.leaves += 1
+
+	def expand(self, plan: GPlan, flaw: Flaw) -> bool:
+		"""create the successors of a plan by resolving one of its flaws. Successors are added with insert.
 
-			plan.update_flaws()
-
-			if len(plan.flaws) == 0:
-				plan.solved = True
-				# success
-				elapsed = time.time() - t0
-				delay = str('%0.8f' % elapsed)
-				completed.append(plan)
-
-				trace = math.floor(len(plan.name.split('['))/2)
-				print('{}\t{}\t{}\t{}\t{}\t{}\t{}'.format(delay, expanded, len(self) + expanded, leaves, str(plan.depth), plan.cost, trace))
-				if REPORT:
-					print(f"solution {len(completed)} found at {expanded} nodes expanded and {len(self)+expanded} nodes visited and {leaves} branches terminated")
-					plan.print()
-				if self.save_plangraph:
-					self.dot.node(f"{plan.ID}", f"goal_{len(completed)}", style="filled", fillcolor=GOAL_NODE)
-
-				if len(completed) == k:
-					if self.save_plangraph:
-						self.dot.render(filename=f"{self.plangraph_name}.dot", outfile=f"{self.plangraph_name}.svg")
-					planning_report = PlanningReport(delay, expanded, len(self)+expanded, leaves, len(completed), self.assumption_failed)
-					return completed, planning_report
-				continue
-
-			# Select Flaw
-			flaw = plan.flaws.next()
-			plan.name += '[' + str(flaw.flaw_type)[0] + ']'
-			self.log_message('{} selected : {}\n'.format(flaw.name, flaw))
-
-			if isinstance(flaw, TCLF):
-				tclf_visits += 1
-				self.resolve_threat(plan, flaw)
-			elif isinstance(flaw, GTF):
-				self.resolve_geometric_threat(plan, flaw)
-			elif isinstance(flaw, GPTF):
-				self.resolve_geometric_path_threat(plan, flaw)
-			elif isinstance(flaw, UGSV):
-				if not self.ground_variable(plan, flaw):
-					if self.save_plangraph:
-						self.dot.node(f"{plan.ID}", f"leaf_{leaves}", style="filled", fillcolor=LEAF_NODE)
-					self.log_message(f"could not ground symbolic arg {flaw.arg}. pruning")
-					leaves += 1
-			elif isinstance(flaw, UGGV):
-				successor_plans = self.ground_geometric_variable(plan, flaw)
-				if len(successor_plans) == 0:
-					if self.save_plangraph:
-						self.dot.node(f"{plan.ID}", f"leaf_{leaves}", style="filled", fillcolor=LEAF_NODE)
-					self.log_message(f"could not resolve geometric arg {flaw.arg}. pruning")
-					leaves += 1
-				else:
-					for sp in successor_plans:
-						self.insert(sp, plan, 'UGGV: ground')
-			elif isinstance(flaw, UGPV):
-				if not self.ground_path_variable(plan, flaw):
-					if self.save_plangraph:
-						self.dot.node(f"{plan.ID}", f"leaf_{leaves}", style="filled", fillcolor=LEAF_NODE)
-					self.log_message(f"could not ground symbolic arg {flaw.arg}. pruning")
-					leaves += 1
-			elif isinstance(flaw, OPF):
+		Returns:
+			bool: False if the flaw could not be resolved and the plan is a leaf.
+		"""
+		if isinstance(flaw, TCLF):
+			self.resolve_threat(plan, flaw)
+		elif isinstance(flaw, GTF):
+			self.resolve_geometric_threat(plan, flaw)
+		elif isinstance(flaw, GPTF):
+			self.resolve_geometric_path_threat(plan, flaw)
+		elif isinstance(flaw, UGSV):
+			if not self.ground_variable(plan, flaw):
+				self.log_message("could not ground symbolic arg {}. pruning", flaw.arg)
+				return False
+		elif isinstance(flaw, UGGV):
+			successor_plans = self.ground_geometric_variable(plan, flaw)
+			if len(successor_plans) == 0:
+				self.log_message("could not resolve geometric arg {}. pruning", flaw.arg)
+				return False
+			for sp in successor_plans:
+				self.insert(sp, plan, 'UGGV: ground')
+		elif isinstance(flaw, UGPV):
+			if not self.ground_path_variable(plan, flaw):
+				self.log_message("could not ground symbolic arg {}. pruning", flaw.arg)
+				return False
+		elif isinstance(flaw, OPF):
+			if self.lazy_successors and self._successors is None:
+				self.defer_open_condition(plan, flaw)
+			else:
 				self.add_step(plan, flaw)
 				self.reuse_step(plan, flaw)
 				self.ground_in_init(plan, flaw)
-			else:
-				raise ValueError(f"Unknown flaw type. Dont know how to resolve: flaw: {flaw} of type {type(flaw)}")
+		else:
+			raise ValueError(f"Unknown flaw type. Dont know how to resolve: flaw: {flaw} of type {type(flaw)}")
+		return True
 
-		# frontier is empty
-		print(f'FAIL: No more plans to visit with {expanded} nodes expanded')
-		elapsed = time.time() - t0
-		delay = str('%0.8f' % elapsed)
-		planning_report = PlanningReport(delay, expanded, len(self)+expanded, leaves, len(completed), self.assumption_failed)
-		return [], planning_report
+	def expand_isolated(self, plan: GPlan, flaw: Flaw, seed, task: int=None) -> tuple:
+		"""expand a plan independent of earlier expansions, as done in a worker process. The IDs are created from the
+		seed, or in the block of integer IDs of the task, see deterministic_uuid.seed. Without a task, integer IDs
+		continue from the counter of this process.
 
+		Returns:
+			tuple(bool, list(tuple(GPlan, str)), int): whether the plan branched, the evaluated successors with their
+				labels and the number of failed assumptions.
+		"""
+		deterministic_uuid.seed(seed, task)
+		self.plan_num = 0
+		self.assumption_failed = 0
+		self.validation_time = 0
+		self._successors = []
+		try:
+			branched = self.expand(plan, flaw)
+			return branched, self._successors, self.assumption_failed
+		finally:
+			self._successors = None
+
+	@clock
 	def add_step(self, plan: GPlan, flaw: Flaw) -> None:
 		"""add a new step to resolve a flaw in the plan. Will add one or more plans to the
 
@@ -322,9 +662,8 @@ class POCLPlanner:
 			plan (GPlan): plan which is incremented
 			flaw (Flaw): flaw of that plan to be resolved (must be open precondition)
 		"""
-
 		consumer, precondition = flaw.flaw
-		candidates = consumer.cndt_map[precondition.ID]
+		candidates = self.add_step_candidates(flaw)
 
 		if len(candidates) == 0:
 			return
@@ -333,6 +672,13 @@ class POCLPlanner:
 		consumer_index = plan.index(consumer)
 		precondition_index = consumer.preconds.index(precondition)
 		for candidate_operator, candidate_effect in candidates:
+			self.add_new_step(plan, consumer_index, precondition_index, candidate_operator, candidate_effect, str(self.plan_num))
+
+	def add_step_candidates(self, flaw: Flaw) -> list:
+		"""ground steps with an effect which can resolve the open condition, as tuples (step number, effect index)"""
+		consumer, precondition = flaw.flaw
+		candidates = []
+		for candidate_operator, candidate_effect in consumer.cndt_map[precondition.ID]:
 
 			if RRP:
 				# the Recursive Repair Policty: only let steps with <= height repair open conditions.
@@ -342,38 +688,61 @@ class POCLPlanner:
 			# cannot add a step which is the inital step
 			if not self.gsteps[candidate_operator].instantiable:
 				continue
-			# clone plan and new step
+			candidates.append((candidate_operator, candidate_effect))
+		return candidates
+
+	def add_step_cost(self, candidate_operator: int) -> float:
+		"""cost of adding an instance of a ground step to a plan"""
+		height = self.gsteps[candidate_operator].height
+		return ((self.max_height*self.max_height)+1) - (height*height)
+		# return self.max_height + 1 - height
+		# return 1
+
+	def add_new_step(self, plan: GPlan, consumer_index: int, precondition_index: int, candidate_operator: int, candidate_effect: int, number: str) -> None:
+		"""add an instance of a ground step to a copy of the plan, which supports the precondition of the consumer"""
+		# clone plan and new step
+		new_plan = plan.instantiate(number + '[a] ')
+
+		# use indices befoer inserting new steps
+		new_plan_consumer = new_plan[consumer_index]
+		new_plan_precondition = new_plan_consumer.preconds[precondition_index]
+
+		# instantiate new step
+		new_step = self.gsteps[candidate_operator].instantiate()
+
+		# pass depth to new Added step.
+		new_step.depth = new_plan_consumer.depth
+
+		# recursively insert new step and substeps into plan, adding orderings and flaws
+		new_plan.insert(new_step)
+		new_plan_effect = new_step.effects[candidate_effect]
+		
+		# resolve s_need with the new step
+		if not new_plan.resolve(new_step, new_plan_consumer, new_plan_effect, new_plan_precondition):
+			return
+		self.log_message('Add step {} to plan {} to satisfy precondition {} of {} with effect {}.', new_step, new_plan.name, new_plan_precondition, new_plan_consumer, new_plan_effect)
 
-			new_plan = plan.instantiate(str(self.plan_num) + '[a] ')
+		new_plan.cost += self.add_step_cost(candidate_operator)
 
-			# use indices befoer inserting new steps
-			new_plan_consumer = new_plan[consumer_index]
-			new_plan_precondition = new_plan_consumer.preconds[precondition_index]
-
-			# instantiate new step
-			new_step = self.gsteps[candidate_operator].instantiate()
+		# insert our new mutated plan into the frontier
+		self.insert(new_plan, plan, 'OPF: add_step')
 
-			# pass depth to new Added step.
-			new_step.depth = new_plan_consumer.depth
-
-			# recursively insert new step and substeps into plan, adding orderings and flaws
-			new_plan.insert(new_step)
-			new_plan_effect = new_step.effects[candidate_effect]
-			
-			# resolve s_need with the new step
-			if not new_plan.resolve(new_step, new_plan_consumer, new_plan_effect, new_plan_precondition):
-				continue
-			self.log_message(f'Add step {new_step} to plan {new_plan.name} to satisfy precondition {new_plan_precondition} of {new_plan_consumer} with effect {new_plan_effect}.')
+	@clock
+	def reuse_step(self, plan: GPlan, flaw: Flaw) -> None:
+		consumer, precondition = flaw.flaw
 
-			new_plan.cost += ((self.max_height*self.max_height)+1) - (new_step.height*new_step.height)
-			# new_plan.cost += self.max_height + 1 - new_step.height
-			# new_plan.cost += 1
-			# self.max_height + 1 - new_step.height
+		choices = self.reuse_step_choices(plan, flaw)
+		if len(choices) == 0:
+			return
 
-			# insert our new mutated plan into the frontier
-			self.insert(new_plan, plan, 'OPF: add_step')
+		# consumer indices
+		consumer_index = plan.index(consumer)
+		precondition_index = consumer.preconds.index(precondition)
+		for candidate_action, effect_nr in choices:
+			self.reuse_existing_step(plan, consumer_index, precondition_index, plan.index(candidate_action), effect_nr, str(self.plan_num))
 
-	def reuse_step(self, plan: GPlan, flaw: Flaw) -> None:
+	def reuse_step_choices(self, plan: GPlan, flaw: Flaw) -> list:
+		"""steps of the plan with an effect which can resolve the open condition, as tuples (step, effect index)"""
 		consumer, precondition = flaw.flaw
 
 		choices = []
@@ -384,32 +753,64 @@ class POCLPlanner:
 				for stepnr, effnr in consumer.cndt_map[precondition.ID]:
 					if stepnr == step.stepnum:
 						choices.append((step, effnr))
-		if len(choices) == 0:
+		return choices
+
+	def reuse_existing_step(self, plan: GPlan, consumer_index: int, precondition_index: int, provider_index: int, effect_nr: int, number: str) -> None:
+		"""support the precondition of the consumer with an effect of a step in a copy of the plan"""
+		# clone plan and new step
+		new_plan = plan.instantiate(number + '[r] ')
+
+		# use indices before inserting new steps
+		new_plan_consumer = new_plan[consumer_index]
+		new_plan_precondition = new_plan_consumer.preconds[precondition_index]
+
+		# use index to find old step
+		new_plan_provider = new_plan.steps[provider_index]
+		new_plan_effect = new_plan_provider.effects[effect_nr]
+		
+		# resolve open condition with old step
+		if not new_plan.resolve(new_plan_provider, new_plan_consumer, new_plan_effect, new_plan_precondition):
 			return
+		self.log_message('Reuse step {} to plan {} to satisfy precondition {} of {} with effect {}.', new_plan_provider, new_plan.name, new_plan_precondition, new_plan_consumer, new_plan_effect)
 
-		# consumer indices
+		# insert mutated plan into frontier
+		self.insert(new_plan, plan, 'OPF: reuse step')
+
+	def defer_open_condition(self, plan: GPlan, flaw: Flaw) -> None:
+		"""add a pending refinement to the frontier for every way to resolve an open condition, instead of the
+		successor plans. The successors are created when the pending refinements are popped, see materialize.
+		"""
+		consumer, precondition = flaw.flaw
 		consumer_index = plan.index(consumer)
 		precondition_index = consumer.preconds.index(precondition)
-		for candidate_action, effect_nr in choices:
-			# clone plan and new step
-			new_plan = plan.instantiate(str(self.plan_num) + '[r] ')
 
-			# use indices before inserting new steps
-			new_plan_consumer = new_plan[consumer_index]
-			new_plan_precondition = new_plan_consumer.preconds[precondition_index]
-
-			# use index to find old step
-			new_plan_provider = new_plan.steps[plan.index(candidate_action)]
-			new_plan_effect = new_plan_provider.effects[effect_nr]
-			
-			# resolve open condition with old step
-			if not new_plan.resolve(new_plan_provider, new_plan_consumer, new_plan_effect, new_plan_precondition):
-				continue
-			self.log_message(f'Reuse step {new_plan_provider} to plan {new_plan.name} to satisfy precondition {new_plan_precondition} of {consumer} with effect {new_plan_effect}.')
-
-			# insert mutated plan into frontier
-			self.insert(new_plan, plan, 'OPF: reuse step')
+		choices = []
+		for candidate_operator, candidate_effect in self.add_step_candidates(flaw):
+			choices.append(('add', (consumer_index, precondition_index, candidate_operator, candidate_effect), plan.cost + self.add_step_cost(candidate_operator)))
+		for candidate_action, effect_nr in self.reuse_step_choices(plan, flaw):
+			choices.append(('reuse', (consumer_index, precondition_index, plan.index(candidate_action), effect_nr), plan.cost))
+		if plan.dummy.init.stepnum in [tup[0] for tup in consumer.cndt_map[precondition.ID]]:
+			choices.append(('init', (flaw,), plan.cost))
+
+		for number, (resolver, choice, cost) in enumerate(choices):
+			pending = PendingRefinement(plan, resolver, choice, cost, plan.heuristic, str(number), self._pending)
+			self._pending += 1
+			self.log_message('>\tadd pending refinement to frontier: {} with cost {}\n', pending, cost)
+			self._frontier.insert(pending)
+
+	@clock
+	def materialize(self, pending: PendingRefinement) -> None:
+		"""create the successor of a pending refinement. It is evaluated and added to the frontier like any other
+		successor, so it is only expanded when it is the best plan."""
+		self.materialized += 1
+		if pending.resolver == 'add':
+			self.add_new_step(pending.parent, *pending.choice, pending.number)
+		elif pending.resolver == 'reuse':
+			self.reuse_existing_step(pending.parent, *pending.choice, pending.number)
+		else:
+			self.ground_in_init(pending.parent, *pending.choice)
 
+	@clock
 	def ground_in_init(self, plan: GPlan, flaw: Flaw) -> None:
 		"""Similar to reuse step. But specifically for grounding an unsupported condition in the initial state.
 
@@ -452,7 +853,7 @@ class POCLPlanner:
 			# check that provided condition can be codesignated with the required(consumed) condition
 			if not new_plan.resolve(new_plan_provider, new_plan_consumer, init_pos_effect, new_plan_precondition):
 				return
-			self.log_message(f'Ground {new_plan_precondition} of {consumer} in the initial state with effect {init_pos_effect}.')
+			self.log_message('Ground {} of {} in the initial state with effect {}.', new_plan_precondition, consumer, init_pos_effect)
 			# immediately ground the startarea of consumer
 			if consumer != new_plan.dummy.goal:
 				uggvflaw = UGGV(precondition.Args[1])
@@ -474,10 +875,11 @@ class POCLPlanner:
 				new_plan_effect = new_plan_provider.effects[effect_nr]
 				# resolve open condition with old step
 				if new_plan.resolve(new_plan_provider, new_plan_consumer, new_plan_effect, new_plan_precondition):
-					self.log_message(f'Ground {new_plan_precondition} of {consumer} in the initial state with effect {new_plan_effect}.')
+					self.log_message('Ground {} of {} in the initial state with effect {}.', new_plan_precondition, consumer, new_plan_effect)
 					# insert mutated plan into frontier
 					self.insert(new_plan, plan, 'OPF: reuse init')
 
+	@clock
 	def resolve_threat(self, plan: GPlan, tclf: TCLF) -> None:
 		threat_index = plan.index(tclf.threat)
 		src_index = plan.index(tclf.link.source)
@@ -495,7 +897,7 @@ class POCLPlanner:
 		threat.update_choices(new_plan)
 		if new_plan.isInternallyConsistent():
 			self.insert(new_plan, plan, 'TCLF: promote')
-			self.log_message('promote {} in front of {} in plan {}'.format(threat, sink, new_plan.name))
+			self.log_message('promote {} in front of {} in plan {}', threat, sink, new_plan.name)
 
 
 		# Demotion
@@ -510,8 +912,9 @@ class POCLPlanner:
 		threat.update_choices(new_plan)
 		if new_plan.isInternallyConsistent():
 			self.insert(new_plan, plan, 'TCLF: demote')
-			self.log_message('demotion {} behind {} in plan {}'.format(threat, source, new_plan.name))
+			self.log_message('demotion {} behind {} in plan {}', threat, source, new_plan.name)
 	
+	@clock
 	def resolve_geometric_threat(self, plan: GPlan, gtf: GTF) -> None:
 		# find out if the threatening area is a static object or not.
 		threat_source, threat_sink = GPlan.find_place_in_plan(plan, gtf.threat)
@@ -576,7 +979,7 @@ class POCLPlanner:
 			new_plan.variableBindings.add_codesignation(new_goal_object, threatening_obj)
 			new_plan.variableBindings.geometric_vb.add_disjunction(threatened_area, new_goal_area)
 
-			self.log_message(f'Add step {new_step} to plan {new_plan.name} to satisfy area conflict of {new_plan_consumer}.')
+			self.log_message('Add step {} to plan {} to satisfy area conflict of {}.', new_step, new_plan.name, new_plan_consumer)
 
 			new_plan.cost += ((self.max_height*self.max_height)+1) - (new_step.height*new_step.height)
 
@@ -604,7 +1007,7 @@ class POCLPlanner:
 		sink_2.update_choices(new_plan) # check if needed and/or if the same should be done for source_1
 		if new_plan.isInternallyConsistent():
 			self.insert(new_plan, plan, 'GTF: promote')
-			self.log_message('promote {} in front of {} in plan {}'.format(sink_2, source_1, new_plan.name))
+			self.log_message('promote {} in front of {} in plan {}', sink_2, source_1, new_plan.name)
 
 
 		# Demotion place 2 after 1
@@ -619,8 +1022,9 @@ class POCLPlanner:
 		sink_1.update_choices(new_plan) #TODO check if needed?
 		if new_plan.isInternallyConsistent():
 			self.insert(new_plan, plan, 'GTF: demote')
-			self.log_message('demotion {} behind {} in plan {}'.format(sink_1, source_2, new_plan.name))
+			self.log_message('demotion {} behind {} in plan {}', sink_1, source_2, new_plan.name)
 	
+	@clock
 	def resolve_geometric_path_threat(self, plan: GPlan, gptf: GPTF) -> None:
 		# find out if the threatening area is a static object or not.
 		threat_source, threat_sink = GPlan.find_place_in_plan(plan, gptf.threat)
@@ -690,7 +1094,7 @@ class POCLPlanner:
 			new_plan.variableBindings.add_codesignation(new_goal_object, threatening_obj)
 			new_plan.variableBindings.geometric_vb.add_disjunction(threatened_path, new_goal_area)
 
-			self.log_message(f'Add step {new_step} to plan {new_plan.name} to satisfy area conflict of {new_plan_consumer}.')
+			self.log_message('Add step {} to plan {} to satisfy area conflict of {}.', new_step, new_plan.name, new_plan_consumer)
 
 			new_plan.cost += ((self.max_height*self.max_height)+1) - (new_step.height*new_step.height)
 
@@ -721,7 +1125,7 @@ class POCLPlanner:
 		sink_2.update_choices(new_plan) # check if needed and/or if the same should be done for source_1
 		if new_plan.isInternallyConsistent():
 			self.insert(new_plan, plan, 'GTF: promote')
-			self.log_message('promote {} in front of {} in plan {}'.format(sink_2, source_1, new_plan.name))
+			self.log_message('promote {} in front of {} in plan {}', sink_2, source_1, new_plan.name)
 
 
 		# Demotion place 2 after 1
@@ -736,8 +1140,9 @@ class POCLPlanner:
 		sink_1.update_choices(new_plan) #TODO check if needed?
 		if new_plan.isInternallyConsistent():
 			self.insert(new_plan, plan, 'GTF: demote')
-			self.log_message('demotion {} behind {} in plan {}'.format(sink_1, source_2, new_plan.name))
+			self.log_message('demotion {} behind {} in plan {}', sink_1, source_2, new_plan.name)
 	
+	@clock
 	def ground_variable(self, plan: GPlan, flaw: UGSV):
 		""" create branch plans by grounding a symbolic variable.
 
@@ -754,7 +1159,7 @@ class POCLPlanner:
 		arg = flaw.arg
 		if plan.variableBindings.is_ground(arg):
 			obj = plan.variableBindings.symbolic_vb.get_const(arg)
-			self.log_message(f'Variable {arg} is already ground to object {obj}.')
+			self.log_message('Variable {} is already ground to object {}.', arg, obj)
 			new_plan = plan.instantiate(str(self.plan_num) + '[ag] ')
 			self.insert(new_plan, plan, 'UGSV: already ground')
 			return True
@@ -767,11 +1172,12 @@ class POCLPlanner:
 			new_plan = plan.instantiate(str(self.plan_num) + '[g] ')
 			if not new_plan.variableBindings.add_codesignation(arg, obj): # due to the geometric consequences of grounding variables can_codesignate is no longer complete.
 				continue
-			self.log_message(f'Grounding variable {arg} to object {obj}.')
+			self.log_message('Grounding variable {} to object {}.', arg, obj)
 			self.insert(new_plan, plan, f'UGSV: ground variable')
 			grounding_success = True
 		return grounding_success
 		
+	@clock
 	def ground_geometric_variable(self, plan: GPlan, flaw: UGSV) -> List[GPlan]:
 		""" create branch plans by grounding a geometric variable. Will create only one branch at most.
 
@@ -788,19 +1194,19 @@ class POCLPlanner:
 		# ground the geometric variable
 		arg = flaw.arg
 		if plan.variableBindings.geometric_vb.is_ground(arg):
-			self.log_message(f'Variable {arg} is already ground. This should not happen!')
+			self.log_message('Variable {} is already ground. This should not happen!', arg)
 			new_plan = plan.instantiate(str(self.plan_num) + '[ag] ')
 			successor_plans.append(new_plan)
 			return successor_plans
 		new_plan = plan.instantiate(str(self.plan_num) + '[g] ')
 		new_plan.set_disjunctions(arg)
 		if new_plan.variableBindings.geometric_vb.resolve(arg):
-			self.log_message(f'Grounding variable {arg}.')
+			self.log_message('Grounding variable {}.', arg)
 			successor_plans.append(new_plan)
 			return successor_plans
 		else:
 			offending_areas = new_plan.variableBindings.geometric_vb.disjunctions[arg]
-			self.log_message(f"could not ground variable {arg}, it conflicts with areas: {offending_areas}")
+			self.log_message("could not ground variable {}, it conflicts with areas: {}", arg, offending_areas)
 			new_new_plan = plan.instantiate(str(self.plan_num) + '[g] ')
 			new_new_plan.clear_disjunctions(arg)
 			if new_new_plan.variableBindings.geometric_vb.resolve(arg):
@@ -814,11 +1220,12 @@ class POCLPlanner:
 						if new_new_plan.variableBindings.geometric_vb.intersect(area, arg):
 							return [] # there is no way to resolve this
 
-				self.log_message(f"grounding variable {arg}. Moving areas {moved_areas}")
+				self.log_message("grounding variable {}. Moving areas {}", arg, moved_areas)
 				successor_plans.append(new_new_plan)
 				return successor_plans
 			return []
 	
+	@clock
 	def ground_path_variable(self, plan: GPlan, flaw: UGPV):
 		""" create branch plans by grounding a path variable.
 
@@ -835,7 +1242,7 @@ class POCLPlanner:
 		new_plan = plan.instantiate(str(self.plan_num) + '[g] ')
 		new_plan.set_disjunctions_path(arg)
 		if new_plan.variableBindings.geometric_vb.resolve_path(arg):
-			self.log_message(f'Grounding path variable {arg}.')
+			self.log_message('Grounding path variable {}.', arg)
 			self.insert(new_plan, plan, 'UGPV: ground')
 			return True
 		movable_obstacle_sets = find_movable_obstacles(new_plan, arg)
@@ -860,23 +1267,35 @@ class POCLPlanner:
 				new_new_plan.variableBindings.geometric_vb.resolve_path(arg)
 				self.assumption_failed += 1
 				continue
-			self.log_message(f"grounding path variable {arg}. Moving areas {obst_set}")	
+			self.log_message("grounding path variable {}. Moving areas {}", arg, obst_set)	
 			self.insert(new_new_plan, plan, 'UGPV: ground with threats')
 		return True
 
 	# Heuristic Methods #
 
-	def h_condition(self, plan: GPlan, stepnum: int, precond: GLiteral) -> float:
-		if precond.is_static:
-			return 0
-		if precond in plan.init:
+	def precompute_heuristic(self) -> None:
+		"""compute the heuristic cost of all preconditions of the ground steps. These only depend on the ground steps and
+		the initial state, so they are shared by all plans. The goal is evaluated first, as cycles between steps are cut
+		off at the first condition that is revisited, this gives the costs seen from the goal."""
+		self.h_step_dict = dict()
+		self.h_lit_dict = dict()
+		for stepnum in reversed(range(len(self.gsteps))):
+			step = self.gsteps[stepnum]
+			for pre in step.preconds:
+				self._h_visited = set()
+				self.h_condition(stepnum, pre)
+
+	def h_condition(self, stepnum: int, precond: GLiteral) -> float:
+		key = (stepnum, precond.ID)
+		if key in self.h_lit_dict:
+			return self.h_lit_dict[key]
+		if precond.is_static or precond in self._h_init:
+			self.h_lit_dict[key] = 0
 			return 0
-		if precond in self.h_lit_dict.keys():
-			return self.h_lit_dict[precond]
-		if precond in self._h_visited:
+		if key in self._h_visited:
 			return 0
 
-		self._h_visited.append(precond)
+		self._h_visited.add(key)
 
 		min_so_far = float('inf')
 		# if the following is true, then we have an "sub-init" step in our mist
@@ -888,64 +1307,83 @@ class POCLPlanner:
 				continue
 			if not self.gsteps[cndt].height == 0:
 				continue
-			cndt_heuristic = self.h_step(plan, cndt)
+			cndt_heuristic = self.h_step(cndt)
 			if cndt_heuristic < min_so_far:
 				min_so_far = cndt_heuristic
 
-		self.h_lit_dict[precond] = min_so_far
+		self.h_lit_dict[key] = min_so_far
 		return min_so_far
 
-	def h_step(self, plan: GPlan, stepnum: int) -> float:
-		if stepnum in self.h_step_dict.keys():
+	def h_step(self, stepnum: int) -> float:
+		if stepnum in self.h_step_dict:
 			return self.h_step_dict[stepnum]
-		if stepnum == plan.dummy.init.stepnum:
+		if stepnum == self.problem.init.stepnum:
 			return 1
 		if stepnum in self._h_visited:
 			return 1
 
-		self._h_visited.append(stepnum)
+		self._h_visited.add(stepnum)
 		sumo = 1
 		for pre in self.gsteps[stepnum].preconds:
-			sumo += self.h_condition(plan, stepnum, pre)
+			sumo += self.h_condition(stepnum, pre)
 
 		if self.gsteps[stepnum].height > 0:
-			sumo += self.h_subplan(plan, self.gsteps[stepnum])
+			sumo += self.h_subplan(self.gsteps[stepnum])
 
 		self.h_step_dict[stepnum] = sumo
 		return sumo
 
+	@clock
 	def h_plan(self, plan: GPlan) -> float:
+		"""sum the cached heuristic cost of the open conditions of the plan which have no existing step to support them"""
 		sumo = 0
-
-		self._h_visited = []
-		self.h_lit_dict = dict()
-		# flaw_gen = plan.flaws.OC_gen()
+		self._h_visited = set()
 		for flaw in plan.flaws.OC_gen():
-			# num_flaws += 1
-			# exists_choice = False
-			# if len(flaw.s_need.choices) > 0:
-			# 	exists_choice = True
-
-
 			if len(flaw.s_need.choices) == 0:
-				sumo += self.h_condition(plan, flaw.s_need.stepnum, flaw.p)
-
+				sumo += self.h_condition(flaw.s_need.stepnum, flaw.p)
 		return sumo
 
-	def h_subplan(self, plan, abstract_step):
+	def h_subplan(self, abstract_step):
 		sumo = 0
 		for sub_step in abstract_step.sub_steps:
 			for pre in sub_step.open_preconds:
-				if pre in abstract_step.preconds or pre in plan.init:
+				if pre in abstract_step.preconds or pre in self._h_init:
 					continue
-				sumo += self.h_condition(plan, sub_step.stepnum, pre)
+				sumo += self.h_condition(sub_step.stepnum, pre)
 		for pre in abstract_step.dummy.final.open_preconds:
-			if pre in abstract_step.preconds or pre in plan.init:
+			if pre in abstract_step.preconds or pre in self._h_init:
 				continue
-			sumo += self.h_condition(plan, abstract_step.dummy.final.stepnum, pre)
+			sumo += self.h_condition(abstract_step.dummy.final.stepnum, pre)
 		return sumo
 
 	# logging
-	def log_message(self, message):
+	def log_message(self, message, *args):
+		"""print a message if logging is on. The message is formatted with the args only when it is printed."""
 		if self.log:
-			print(message)
\ No newline at end of file
+			print(message.format(*args) if args else message)
+
+	# observers
+	def add_observer(self, observer) -> None:
+		"""notify an observer of the events of the search, see PyPOCL.observers"""
+		self.observers.append(observer)
+
+	def notify(self, event: str, *args) -> None:
+		"""call the method of an event on every observer. Callers check that there are observers first, such that a
+		search without observers does not pay for the call."""
+		for observer in self.observers:
+			getattr(observer, event)(self, *args)
+
+
+# parallel expansion #
+_worker_planner = None
+
+def _init_worker(domain: Domain, problem: Problem, log, flaw_order, h_weight, validation, integer_ids) -> None:
+	global _worker_planner
+	# workers started with spawn do not inherit the kind of IDs
+	deterministic_uuid.use_integer_ids(integer_ids)
+	_worker_planner = POCLPlanner(domain, problem, log, flaw_order=flaw_order, h_weight=h_weight, validation=validation, observers=[])
+
+def _expand_in_worker(task):
+	plan, flaw, seed, task_number = task
+	branched, successors, assumption_failed = _worker_planner.expand_isolated(plan, flaw, seed, task_number)
+	return branched, successors, assumption_failed, _worker_planner.validation_time
\ No newline at end of file
@@ -0,0 +1,243 @@
+"""
+    Run a batch of planning problems in parallel and write the results to a csv file.
+
+    Every problem is solved in its own worker process, of which at most `workers` run at the same time. A worker which
+    exceeds the time limit or the memory limit is killed, such that a crash or a runaway call only loses its own problem.
+    Each worker sends its result through its own pipe, so a worker which is killed while sending can only break its own
+    pipe, and a result which arrives after its worker was killed is never read.
+    The problems are loaded through the cache of compiled problems, so a problem is compiled only once for all workers
+    and batches which run it.
+
+    usage: python -m PyPOCL.batch [batch_dir] [--domain FILE] [--csv FILE] [--workers N] [--timeout S] ...
+"""
+from collections import namedtuple
+import argparse
+import contextlib
+import csv
+import multiprocessing
+import multiprocessing.connection
+import os
+import time
+import traceback
+
+from PyPOCL.PyDPOCL import POCLPlanner
+from PyPOCL.worldmodel import load_domain_and_problem
+from PyPOCL.plan_utility import check_plan, plan_to_json, visualize_plan, plan_to_dot
+
+BatchProblem = namedtuple("BatchProblem", ["testname", "problem", "worldmodel"])
+BatchJob = namedtuple("BatchJob", ["iteration", "testname", "problem", "worldmodel"])
+
+FIELDNAMES = ["iteration", "testname", "status", "plan_file", "planning_time", "expanded", "visited", "terminated", "plans_found", "assumption_failed", "duplicates", "nr_objects", "nr_goals"]
+# columns which are copied from the PlanningReport
+REPORT_FIELDS = ["planning_time", "expanded", "visited", "terminated", "plans_found", "assumption_failed", "duplicates"]
+# status of a problem in the csv file
+STATUSES = ["success", "faulty_plan", "no_plan_found", "error", "timeout", "out_of_memory"]
+
+DEFAULT_DOMAIN = 'domains/manipulation-domain/manipulation-domain.pddl'
+DEFAULT_BATCH_DIR = 'domains/manipulation-domain-batch/'
+DEFAULT_CSV = 'test_results/random_batch_test_results.csv'
+KILL_GRACE = 5 # seconds a worker gets after the time limit to report the result of the planner
+
+def find_problems(batch_dir: str) -> list:
+    """find the problems test_0, test_1, ... in a batch directory. Stops at the first missing problem or worldmodel file.
+
+    Returns:
+        list(BatchProblem): the problems in order
+    """
+    problems = []
+    while True:
+        testname = f"test_{len(problems)}"
+        problem_file = os.path.join(batch_dir, testname + "_problem.pddl")
+        worldmodel_file = os.path.join(batch_dir, testname + "_worldmodel.json")
+        if not os.path.isfile(problem_file) or not os.path.isfile(worldmodel_file):
+            return problems
+        problems.append(BatchProblem(testname, problem_file, worldmodel_file))
+
+def _resident_memory(pid: int) -> int:
+    """resident memory of a process in bytes, None if it cannot be read (only supported on linux)"""
+    try:
+        with open(f"/proc/{pid}/statm") as f:
+            return int(f.read().split()[1]) * os.sysconf('SC_PAGE_SIZE')
+    except (OSError, ValueError, IndexError):
+        return None
+
+def _row(job: BatchJob, status: str, planning_report=None, plan_file: str="", nr_objects=0, nr_goals=0) -> dict:
+    """csv row of a problem, the statistics are 0 if the planner did not report"""
+    row = {field: 0 for field in FIELDNAMES}
+    row.update(iteration=job.iteration, testname=job.testname, status=status, plan_file=plan_file, nr_objects=nr_objects, nr_goals=nr_goals)
+    if planning_report is not None:
+        for field in REPORT_FIELDS:
+            row[field] = getattr(planning_report, field)
+    return row
+
+def _run_job(job: BatchJob, domain_file: str, k: int, cutoff: int, plan_dir: str, verbose: bool, connection) -> None:
+    """solve one problem and send the csv rows of the result through the connection"""
+    nr_objects = nr_goals = 0
+    try:
+        with contextlib.ExitStack() as stack:
+            if not verbose:
+                devnull = stack.enter_context(open(os.devnull, 'w'))
+                stack.enter_context(contextlib.redirect_stdout(devnull))
+            domain, problem = load_domain_and_problem(domain_file, job.problem, job.worldmodel)
+            nr_objects = len([o for o in problem.objects if o.typ=='physical_item'])
+            nr_goals = len(problem.goal.preconds)
+
+            planner = POCLPlanner(domain, problem)
+            plans, planning_report = planner.solve(k=k, cutoff=cutoff)
+
+            rows = []
+            if len(plans) == 0:
+                rows.append(_row(job, "no_plan_found", planning_report, nr_objects=nr_objects, nr_goals=nr_goals))
+            for i, plan in enumerate(plans):
+                status = "success" if check_plan(plan) else "faulty_plan"
+                plan_file = ""
+                if plan_dir is not None:
+                    plan_path = os.path.join(plan_dir, domain.name, f"{problem.name}-plan_{i}")
+                    os.makedirs(os.path.dirname(plan_path), exist_ok=True)
+                    plan_file = f"{plan_path}.json"
+                    plan_to_json(plan, plan_file)
+                    plan_to_dot(plan, f"{plan_path}.dot", f"{plan_path}.svg", show=False)
+                    visualize_plan(plan, show=False, filepath=f"{plan_path}.png")
+                rows.append(_row(job, status, planning_report, plan_file, nr_objects, nr_goals))
+        connection.send((job.iteration, rows))
+    except MemoryError:
+        connection.send((job.iteration, [_row(job, "out_of_memory", nr_objects=nr_objects, nr_goals=nr_goals)]))
+    except Exception:
+        print(f"error while running {job.testname}:\n{traceback.format_exc()}")
+        connection.send((job.iteration, [_row(job, "error", nr_objects=nr_objects, nr_goals=nr_goals)]))
+    finally:
+        connection.close()
+
+def run_batch(domain_file: str, problems: list, csv_filename: str, workers: int=None, timeout: float=600,
+              memory_limit: float=None, k: int=1, repeats: int=1, resume: bool=False, plan_dir: str=None,
+              verbose: bool=False) -> dict:
+    """Solve a batch of problems in parallel, and write a csv row for every result as soon as it arrives.
+
+    Args:
+        domain_file (str): pddl file of the domain of all problems
+        problems (list(BatchProblem)): problems to solve
+        csv_filename (str): csv file to write the results to, with the columns FIELDNAMES
+        workers (int): number of problems solved at the same time. Defaults to the number of cpus.
+        timeout (float): time limit of the planner per problem in seconds. A worker which has not reported KILL_GRACE
+            seconds after the time limit, counted from its start, is killed.
+        memory_limit (float): memory limit per problem in MB. A worker which uses more memory is killed. No limit if None.
+        k (int): number of plans to find for each problem
+        repeats (int): number of times each problem is solved
+        resume (bool): append to an existing csv file and skip the iterations which are already in it
+        plan_dir (str): directory to save the plans in. The plans are not saved if None.
+        verbose (bool): show the output of the workers
+
+    Returns:
+        dict(str: int): number of results with each status, including the results of earlier runs when resumed
+    """
+    if workers is None:
+        workers = os.cpu_count()
+    if workers < 1:
+        raise ValueError(f"number of workers must be at least 1, got {workers}")
+    if timeout <= 0:
+        raise ValueError(f"time limit must be positive, got {timeout}")
+
+    jobs = [BatchJob(repeat * len(problems) + i, *problem) for repeat in range(repeats) for i, problem in enumerate(problems)]
+    counts = {status: 0 for status in STATUSES}
+    finished = set()
+    if resume and os.path.isfile(csv_filename):
+        with open(csv_filename, newline="") as csvfile:
+            for row in csv.DictReader(csvfile):
+                finished.add(int(row["iteration"]))
+                counts[row["status"]] = counts.get(row["status"], 0) + 1
+        print(f"Resuming after {len(finished)} finished iterations.")
+    pending = [job for job in jobs if job.iteration not in finished]
+    pending.reverse() # jobs are popped from the end
+    print(f"Going to run {len(pending)} problems with {workers} workers.")
+
+    if os.path.dirname(csv_filename):
+        os.makedirs(os.path.dirname(csv_filename), exist_ok=True)
+    running = {} # iteration: (process, job, start time, receiving end of the pipe of the worker)
+    with open(csv_filename, mode="a" if finished else "w", newline="") as csvfile:
+        writer = csv.DictWriter(csvfile, fieldnames=FIELDNAMES)
+        if not finished:
+            writer.writeheader()
+
+        def start(job):
+            receiver, sender = multiprocessing.Pipe(duplex=False)
+            process = multiprocessing.Process(target=_run_job, args=(job, domain_file, k, timeout, plan_dir, verbose, sender), daemon=True)
+            process.start()
+            # the worker holds the only sending end, so the pipe is closed when the worker exits
+            sender.close()
+            running[job.iteration] = (process, job, time.time(), receiver)
+
+        def write(iteration, rows):
+            if iteration not in running:
+                # the worker was killed or written off before its result arrived
+                return
+            process, job, t_start, receiver = running.pop(iteration)
+            receiver.close()
+            process.join(KILL_GRACE)
+            if process.is_alive():
+                process.kill()
+                process.join()
+            for row in rows:
+                writer.writerow(row)
+                counts[row["status"]] += 1
+            csvfile.flush()
+            print(f"{job.testname} (iteration {iteration}): {', '.join(row['status'] for row in rows)} after {time.time() - t_start:.1f}s")
+
+        def kill(iteration, status):
+            process, job, _, _ = running[iteration]
+            process.kill()
+            write(iteration, [_row(job, status)])
+
+        try:
+            while len(pending) > 0 or len(running) > 0:
+                while len(pending) > 0 and len(running) < workers:
+                    start(pending.pop())
+
+                # a pipe is ready when the worker sent its result, or when the worker exited without one
+                receivers = {receiver: iteration for iteration, (_, _, _, receiver) in running.items()}
+                for receiver in multiprocessing.connection.wait(list(receivers), timeout=0.2):
+                    iteration = receivers[receiver]
+                    try:
+                        write(*receiver.recv())
+                    except (EOFError, OSError):
+                        process, job, _, _ = running[iteration]
+                        process.join(KILL_GRACE)
+                        print(f"worker of {job.testname} exited with code {process.exitcode} without a result")
+                        write(iteration, [_row(job, "error")])
+
+                for iteration, (process, job, t_start, _) in list(running.items()):
+                    if time.time() - t_start > timeout + KILL_GRACE:
+                        kill(iteration, "timeout")
+                    elif memory_limit is not None and (_resident_memory(process.pid) or 0) > memory_limit * 1e6:
+                        kill(iteration, "out_of_memory")
+        finally:
+            for process, _, _, _ in running.values():
+                process.kill()
+                process.join()
+
+    for status, count in counts.items():
+        print(f"{count} {status}")
+    return counts
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(prog="python -m PyPOCL.batch", description="Solve a batch of planning problems in parallel.")
+    parser.add_argument('batch_dir', nargs='?', default=DEFAULT_BATCH_DIR, help="directory with the problems test_N_problem.pddl and test_N_worldmodel.json")
+    parser.add_argument('--domain', default=DEFAULT_DOMAIN, help="pddl file of the domain")
+    parser.add_argument('--csv', default=DEFAULT_CSV, help="csv file to write the results to")
+    parser.add_argument('--workers', type=int, default=None, help="number of problems solved at the same time, defaults to the number of cpus")
+    parser.add_argument('--timeout', type=float, default=600, help="time limit per problem in seconds")
+    parser.add_argument('--memory-limit', type=float, default=None, help="memory limit per problem in MB")
+    parser.add_argument('-k', type=int, default=1, help="number of plans to find for each problem")
+    parser.add_argument('--repeats', type=int, default=1, help="number of times each problem is solved")
+    parser.add_argument('--resume', action='store_true', help="skip the iterations which are already in the csv file")
+    parser.add_argument('--plan-dir', default=None, help="directory to save the plans in")
+    parser.add_argument('--verbose', action='store_true', help="show the output of the planners")
+    args = parser.parse_args(argv)
+
+    problems = find_problems(args.batch_dir)
+    if len(problems) == 0:
+        parser.error(f"no problems found in {args.batch_dir}")
+    return run_batch(args.domain, problems, args.csv, args.workers, args.timeout, args.memory_limit, args.k,
+                     args.repeats, args.resume, args.plan_dir, args.verbose)
+
+if __name__ == '__main__':
+    main()
@@ -1,43 +1,177 @@
-import time
+"""
+	Hierarchical timers and counters. Functions decorated with @clock are timed while timings are collected, nested
+	calls are timed as children of the calling timer. When no timings are collected, a clocked function only costs an
+	extra function call.
+
+	usage:
+		with collect_timings() as timings:
+			...
+		print(timings)
+		timings.dump('timings.json')
+"""
+import contextlib
 import functools
+import json
+from time import perf_counter
 
-def clock(func):
+_timings = None # Timings which are being collected, None if timing is off
 
-	@functools.wraps(func)
-	def clocked(*args,**kwargs):
-		t0 = time.time()
-		result = func(*args,**kwargs)
-		elapsed = time.time() - t0
-		name = func.__name__
-		# arg_lst = []
-		# if args:
-		# 	arg_lst.append(', '.join(repr(arg) for arg in args))
-		# if kwargs:
-		# 	pairs = ['%s=%r' %(k,w) for k,w in sorted(kwargs.items())]
-		# 	arg_lst.append(', '.join(pairs))
-		# arg_str = ', '.join(arg_lst)
-		print('[%0.8fs] %s' % (elapsed, name))
-		#print('[%0.8fs] %s(%s) -> %r ' % (elapsed, name))#, arg_str, result))
-		return result
-	return clocked
+class TimerNode:
+	"""total time and number of calls of a timer, with the timers started inside it as children"""
+	__slots__ = 'name', 'time', 'calls', 'counters', 'children'
+
+	def __init__(self, name):
+		self.name = name
+		self.time = 0.0
+		self.calls = 0
+		self.counters = {}
+		self.children = {}
+
+	def child(self, name):
+		node = self.children.get(name)
+		if node is None:
+			node = self.children[name] = TimerNode(name)
+		return node
+
+	@property
+	def self_time(self):
+		"""time which is not spent in the children"""
+		return self.time - sum(child.time for child in self.children.values())
+
+	def to_dict(self):
+		return {
+			'name': self.name,
+			'time': self.time,
+			'self_time': self.self_time,
+			'calls': self.calls,
+			'counters': dict(self.counters),
+			'children': [child.to_dict() for child in sorted(self.children.values(), key=lambda c: -c.time)],
+		}
+
+	def lines(self, depth=0):
+		counters = ''.join(f' {name}={value}' for name, value in self.counters.items())
+		yield f"{'  '*depth + self.name:<50}{self.time:>10.4f}{self.self_time:>10.4f}{self.calls:>10}{counters}"
+		for child in sorted(self.children.values(), key=lambda c: -c.time):
+			yield from child.lines(depth + 1)
+
+class Timings:
+	"""Tree of timers. The root is the time during which the timings were collected.
+
+	Attributes:
+		root (TimerNode): timer of the whole collection, its children are the outermost clocked calls
+	"""
+	def __init__(self, name='total'):
+		self.root = TimerNode(name)
+		self._stack = [self.root]
+
+	def start(self, name):
+		"""start a timer inside the current timer, returns the start time"""
+		node = self._stack[-1].child(name)
+		self._stack.append(node)
+		return perf_counter()
 
+	def stop(self, t_start):
+		"""stop the current timer"""
+		node = self._stack.pop()
+		node.time += perf_counter() - t_start
+		node.calls += 1
 
+	def count(self, name, n=1):
+		"""increase a counter of the current timer"""
+		counters = self._stack[-1].counters
+		counters[name] = counters.get(name, 0) + n
 
-def clockArgs(func):
+	def find(self, *path):
+		"""the timer with a path of names below the root, None if it was never started"""
+		node = self.root
+		for name in path:
+			node = node.children.get(name)
+			if node is None:
+				return None
+		return node
+
+	def to_dict(self):
+		return self.root.to_dict()
+
+	def dump(self, filename):
+		"""write the timings to a json file"""
+		with open(filename, 'w') as f:
+			json.dump(self.to_dict(), f, indent=1)
+
+	def __str__(self):
+		header = f"{'timer':<50}{'time [s]':>10}{'self [s]':>10}{'calls':>10}"
+		return '\n'.join([header, *self.root.lines()])
+
+	def __getstate__(self):
+		# a running timer cannot be continued after loading
+		return {'root': self.root}
+
+	def __setstate__(self, state):
+		self.root = state['root']
+		self._stack = [self.root]
+
+def active_timings():
+	"""the Timings which are being collected, None if timing is off"""
+	return _timings
+
+@contextlib.contextmanager
+def collect_timings(timings=None):
+	"""collect the timings of the clocked functions which are called in the block, in a new Timings or in one which
+	is continued. Nested blocks collect into the Timings of the innermost block."""
+	global _timings
+	if timings is None:
+		timings = Timings()
+	previous = _timings
+	_timings = timings
+	t_start = perf_counter()
+	try:
+		yield timings
+	finally:
+		timings.root.time += perf_counter() - t_start
+		timings.root.calls += 1
+		_timings = previous
+
+@contextlib.contextmanager
+def paused_timings():
+	"""do not collect timings in the block"""
+	global _timings
+	previous = _timings
+	_timings = None
+	try:
+		yield
+	finally:
+		_timings = previous
+
+@contextlib.contextmanager
+def timer(name):
+	"""time a block as a timer with the given name"""
+	timings = _timings
+	if timings is None:
+		yield
+		return
+	t_start = timings.start(name)
+	try:
+		yield
+	finally:
+		timings.stop(t_start)
+
+def count(name, n=1):
+	"""increase a counter of the current timer, if timings are collected"""
+	if _timings is not None:
+		_timings.count(name, n)
+
+def clock(func):
+	"""time a function under its name while timings are collected"""
+	name = func.__name__
 
 	@functools.wraps(func)
-	def clocked(*args,**kwargs):
-		t0 = time.time()
-		result = func(*args,**kwargs)
-		elapsed = time.time() - t0
-		name = func.__name__
-		arg_lst = []
-		if args:
-			arg_lst.append(', '.join(repr(arg) for arg in args))
-		if kwargs:
-			pairs = ['%s=%r' %(k,w) for k,w in sorted(kwargs.items())]
-			arg_lst.append(', '.join(pairs))
-		arg_str = ', '.join(arg_lst)
-		print('[%0.8fs] %s(%s) -> %r ' % (elapsed, name, arg_str, result))
-		return result
+	def clocked(*args, **kwargs):
+		timings = _timings
+		if timings is None:
+			return func(*args, **kwargs)
+		t_start = timings.start(name)
+		try:
+			return func(*args, **kwargs)
+		finally:
+			timings.stop(t_start)
 	return clocked
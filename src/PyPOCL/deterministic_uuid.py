@@ -1,14 +1,110 @@
+import contextlib
 import random
 import uuid
 
 # Set a fixed seed for repeatability across executions
 _rng = random.Random(42)
+_initial_rng_state = _rng.getstate()
+# next integer ID. None if uuids are used as IDs
+_next_integer = None
+# number of IDs created in this process
+_created = 0
+# position of every ID created while positions are recorded, in the order of creation. None if not recorded.
+_positions = None
+# integer IDs of tasks which run in other processes, see seed(). The IDs below TASK_IDS_START belong to the main process.
+TASK_IDS_START = 1 << 40
+TASK_BLOCK_SIZE = 1 << 20 # IDs per task
+
+class IntegerID(int):
+    """Small integer used as ID instead of a uuid. Hashing and comparing is done as for an int, which is much cheaper
+    than for a uuid. It is printed as the uuid with the same value, such that saved plans look the same in both modes."""
+    __slots__ = ()
+
+    def __str__(self):
+        # same as str(uuid.UUID(int=self)), without creating the uuid
+        h = '%032x' % self
+        return f'{h[:8]}-{h[8:12]}-{h[12:16]}-{h[16:20]}-{h[20:]}'
+
+    def __repr__(self):
+        return f"IntegerID({int(self)})"
 
 def duuid4(): # deterministic uuid4
-    # Generate a deterministic 128-bit integer
-    return uuid.UUID(int=_rng.getrandbits(128))
+    global _next_integer, _created
+    _created += 1
+    if _next_integer is not None:
+        _next_integer += 1
+        ID = IntegerID(_next_integer - 1)
+    else:
+        # Generate a deterministic 128-bit integer
+        ID = uuid.UUID(int=_rng.getrandbits(128))
+    if _positions is not None:
+        _positions[ID] = len(_positions)
+    return ID
+
+def use_integer_ids(enabled=True):
+    """Switch between uuids and integers from a counter as IDs. Should be called before the problem is compiled, such
+    that all IDs are of the same kind."""
+    global _next_integer
+    if not enabled:
+        _next_integer = None
+    elif _next_integer is None:
+        _next_integer = 0
+
+def integer_ids():
+    """True if integers are used as IDs"""
+    return _next_integer is not None
+
+def created():
+    """number of IDs created in this process, e.g. to find how many IDs a computation creates"""
+    return _created
+
+@contextlib.contextmanager
+def record_positions():
+    """record the position of the IDs created in the block in the order of creation, see creation_order."""
+    global _positions
+    previous = _positions
+    if previous is None:
+        _positions = {}
+    try:
+        yield
+    finally:
+        _positions = previous
+
+def creation_order(ID):
+    """Sort key of an ID created while positions are recorded. Sets of elements are ordered by the values of their
+    IDs, sorting them with this key gives an order which only depends on the order in which the IDs were created.
+    IDs which were not recorded come first."""
+    if _positions is None:
+        return -1
+    return _positions.get(ID, -1)
+
+def seed(value, task=None):
+    """Reseed the generator, e.g. to make the IDs created in a worker process independent of its history.
+
+    With integer IDs the value does not matter. Without a task the counter continues where it is, as restarting it
+    would hand out the IDs of the loaded problem again. A task which creates IDs in another process passes its number
+    instead, and counts in its own block of TASK_BLOCK_SIZE IDs from TASK_IDS_START. The IDs of different tasks and of
+    the main process then never collide, and stay small and dense within each block.
+    """
+    global _next_integer
+    _rng.seed(value)
+    if _next_integer is not None and task is not None:
+        _next_integer = TASK_IDS_START + task * TASK_BLOCK_SIZE
+
+def getstate():
+    return _rng.getstate(), _next_integer
+
+def initial_state():
+    """state of the generator when this module is loaded, for the current kind of IDs"""
+    return _initial_rng_state, (0 if _next_integer is not None else None)
+
+def setstate(state):
+    """Restore a state from getstate(), e.g. to continue after IDs which were created when a cached problem was compiled."""
+    global _next_integer
+    rng_state, _next_integer = state
+    _rng.setstate(rng_state)
 
 if __name__ == '__main__':
     # Example usage:
     for _ in range(3):
-        print(duuid4())
\ No newline at end of file
+        print(duuid4())
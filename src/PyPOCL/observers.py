@@ -0,0 +1,185 @@
+"""
+    Observers of the search of the POCLPlanner. The planner notifies its observers of the events of the search by calling
+    the method of the event on each observer. An observer only overrides the methods of the events it is interested in.
+    When a planner has no observers, an event costs a single check of the observer list.
+
+    usage:
+        planner = POCLPlanner(domain, problem, observers=[ConsoleProgress(), JsonTrace('trace.jsonl')])
+        planner.add_observer(PlanGraph('plangraph'))
+"""
+import json
+import math
+import time
+
+import graphviz
+
+# graphviz colors:
+OPEN_NODE = 'cyan'
+CLOSED_NODE = 'white'
+LEAF_NODE = 'red'
+GOAL_NODE = 'green'
+
+class SearchObserver:
+    """Base class of the observers of a search. The methods are called with the planner and do nothing by default."""
+
+    def search_started(self, planner, k: int) -> None:
+        """the search for k solutions starts, or continues from a checkpoint"""
+
+    def progress(self, planner, elapsed: float) -> None:
+        """called about every second during the search"""
+
+    def node_popped(self, planner, plan) -> None:
+        """a plan is taken from the frontier to be visited"""
+
+    def node_pruned(self, planner, plan) -> None:
+        """a visited plan is inconsistent or has no successors"""
+
+    def flaw_selected(self, planner, plan, flaw) -> None:
+        """the flaw of a visited plan which is resolved next is selected"""
+
+    def child_inserted(self, planner, plan, parent_plan, label) -> None:
+        """a plan is added to the frontier. The parent plan and label are None for the root plan."""
+
+    def solution_found(self, planner, plan, elapsed: float) -> None:
+        """a visited plan has no flaws"""
+
+    def timeout(self, planner, elapsed: float) -> None:
+        """the time limit is reached, the search stops"""
+
+    def search_finished(self, planner, plans, planning_report) -> None:
+        """the search returns the plans found"""
+
+    def search_aborted(self, planner, exception) -> None:
+        """the search stops without returning, because the generator of solve_iter is closed (exception is None) or
+        the search raised the exception"""
+
+class ConsoleProgress(SearchObserver):
+    """print the progress of the search, the solutions and the reason the search stops
+
+    Args:
+        print_plans (bool): print every solution found
+    """
+    def __init__(self, print_plans: bool=True):
+        self.print_plans = print_plans
+        self.timed_out = False
+
+    def search_started(self, planner, k):
+        self.timed_out = False
+        print(f'k={k}')
+        print('time\texpanded\tvisited\tterminated\tdepth\tcost\ttrace')
+
+    def progress(self, planner, elapsed):
+        print(f"{elapsed:0.8f}\t{planner.expanded}\t{planner.opened}\t{planner.leaves}\tfrontier: {planner._frontier.resident} in memory, {planner._frontier.on_disk} on disk")
+
+    def solution_found(self, planner, plan, elapsed):
+        visited = len(planner) + planner.expanded
+        trace = math.floor(len(plan.name.split('['))/2)
+        print(f'{elapsed:0.8f}\t{planner.expanded}\t{visited}\t{planner.leaves}\t{plan.depth}\t{plan.cost}\t{trace}')
+        if self.print_plans:
+            print(f"solution {len(planner.completed)} found at {planner.expanded} nodes expanded and {visited} nodes visited and {planner.leaves} branches terminated")
+            plan.print()
+
+    def timeout(self, planner, elapsed):
+        self.timed_out = True
+        print(f'timedout: {elapsed:0.8f}\t {planner.expanded}\t{planner.opened}\t{planner.leaves}')
+
+    def search_finished(self, planner, plans, planning_report):
+        if len(plans) == 0 and not self.timed_out:
+            print(f'FAIL: No more plans to visit with {planner.expanded} nodes expanded')
+
+class JsonTrace(SearchObserver):
+    """write every event of the search as a json object on its own line of a file. Each object has the name of the event,
+    the time since the search started and the ID, name, cost and heuristic of the plan of the event.
+
+    Args:
+        filename (str): file to write the trace to. The file is replaced when the search starts, and appended to when
+            the search continues from a checkpoint.
+    """
+    def __init__(self, filename: str):
+        self.filename = filename
+        self._file = None
+        self._t0 = None
+
+    def _write(self, event: str, plan=None, **fields) -> None:
+        record = {'event': event, 'time': round(time.time() - self._t0, 6)}
+        if plan is not None:
+            record.update(plan=str(plan.ID), name=plan.name, cost=plan.cost, heuristic=plan.heuristic)
+        record.update(fields)
+        self._file.write(json.dumps(record, default=str) + '\n')
+
+    def search_started(self, planner, k):
+        # the root plan is inserted when the planner is constructed, before the trace is opened
+        resumed = planner._elapsed > 0
+        self._file = open(self.filename, 'a' if resumed else 'w')
+        self._t0 = time.time() - planner._elapsed
+        self._write('search_started', k=k, resumed=resumed)
+
+    def node_popped(self, planner, plan):
+        self._write('node_popped', plan, expanded=planner.expanded)
+
+    def node_pruned(self, planner, plan):
+        self._write('node_pruned', plan)
+
+    def flaw_selected(self, planner, plan, flaw):
+        self._write('flaw_selected', plan, flaw=flaw.name, flaw_type=type(flaw).__name__)
+
+    def child_inserted(self, planner, plan, parent_plan, label):
+        if self._file is None:
+            return
+        self._write('child_inserted', plan, parent=str(parent_plan.ID) if parent_plan is not None else None, label=label)
+
+    def solution_found(self, planner, plan, elapsed):
+        self._write('solution_found', plan, depth=plan.depth, solutions=len(planner.completed))
+
+    def timeout(self, planner, elapsed):
+        self._write('timeout', expanded=planner.expanded, visited=planner.opened)
+
+    def search_finished(self, planner, plans, planning_report):
+        self._write('search_finished', plans=len(plans), expanded=planning_report.expanded, visited=planning_report.visited)
+        self._file.close()
+        self._file = None
+
+    def search_aborted(self, planner, exception):
+        if self._file is None:
+            return
+        self._write('search_aborted', expanded=planner.expanded, visited=planner.opened, error=repr(exception) if exception is not None else None)
+        self._file.close()
+        self._file = None
+
+    def __getstate__(self):
+        # the file is reopened when a search is continued from a checkpoint
+        state = self.__dict__.copy()
+        state['_file'] = None
+        return state
+
+class PlanGraph(SearchObserver):
+    """draw the search graph with graphviz. Every plan added to the frontier is a node with an edge from its parent, colored
+    by what happened to the plan. The graph is rendered to <name>.dot and <name>.svg when the search stops, also when it
+    is aborted.
+
+    Args:
+        name (str): path of the rendered files, without extension
+    """
+    def __init__(self, name: str):
+        self.name = name
+        self.dot = graphviz.Digraph()
+
+    def child_inserted(self, planner, plan, parent_plan, label):
+        self.dot.node(f"{plan.ID}", f"plan_{planner.opened}", style="filled", fillcolor=OPEN_NODE)
+        if parent_plan is not None:
+            self.dot.edge(f"{parent_plan.ID}", f"{plan.ID}", label=label)
+
+    def node_popped(self, planner, plan):
+        self.dot.node(f"{plan.ID}", f"visited_{planner.expanded}", style="filled", fillcolor=CLOSED_NODE)
+
+    def node_pruned(self, planner, plan):
+        self.dot.node(f"{plan.ID}", f"leaf_{planner.leaves}", style="filled", fillcolor=LEAF_NODE)
+
+    def solution_found(self, planner, plan, elapsed):
+        self.dot.node(f"{plan.ID}", f"goal_{len(planner.completed)}", style="filled", fillcolor=GOAL_NODE)
+
+    def search_finished(self, planner, plans, planning_report):
+        self.dot.render(filename=f"{self.name}.dot", outfile=f"{self.name}.svg")
+
+    def search_aborted(self, planner, exception):
+        self.dot.render(filename=f"{self.name}.dot", outfile=f"{self.name}.svg")
@@ -1,6 +1,7 @@
 from PyPOCL.GPlan import GPlan
 from PyPOCL.worldmodel import Domain, Problem
 from PyPOCL.Ground_Compiler_Library.Element import Operator
+from PyPOCL.clockdeco import clock
 
 import graphviz
 from shapely import within, LineString, Polygon, MultiPolygon, overlaps, difference
@@ -43,8 +44,71 @@ def check_plan_completeness(plan: GPlan) -> bool:
                 return False    
     return True
 
-def check_plan_correctness(plan: GPlan) -> bool:
-    """Check if the plan is correct. The plan may be incomplete."""
+def changed_since(plan: GPlan, parent: GPlan) -> tuple:
+    """Find the parts of a plan which were changed by the refinement of its parent plan.
+
+    Args:
+        plan (GPlan): refined plan
+        parent (GPlan): plan which was refined
+
+    Returns:
+        tuple(set, set, set, set): IDs of the steps which were added, ordered or of which a variable was bound, the
+            causal links which were added, and the areas and paths which were assigned or belong to a changed step.
+    """
+    steps = {step.ID for step in plan.steps}.difference(step.ID for step in parent.steps)
+    for edge in plan.OrderingGraph.edges.difference(parent.OrderingGraph.edges):
+        steps.add(edge.source.ID)
+        steps.add(edge.sink.ID)
+    links = plan.CausalLinkGraph.edges.difference(parent.CausalLinkGraph.edges)
+    for edge in links:
+        steps.add(edge.source.ID)
+        steps.add(edge.sink.ID)
+
+    # variables which were grounded or codesignated with another variable
+    variables = set()
+    sym_vb = plan.variableBindings.symbolic_vb
+    parent_sym_vb = parent.variableBindings.symbolic_vb
+    for var in parent_sym_vb.variables:
+        group = sym_vb.group_mapping[var]
+        parent_group = parent_sym_vb.group_mapping[var]
+        if sym_vb.const[group] != parent_sym_vb.const[parent_group] \
+                or len(sym_vb.group_members[group]) != len(parent_sym_vb.group_members[parent_group]):
+            variables.add(var)
+    geo_vb = plan.variableBindings.geometric_vb
+    parent_geo_vb = parent.variableBindings.geometric_vb
+    areas = set()
+    for var, placeloc in geo_vb.placelocs.items():
+        parent_placeloc = parent_geo_vb.placelocs.get(var)
+        if parent_placeloc is None or placeloc.area_assigned is not parent_placeloc.area_assigned:
+            areas.add(var)
+    paths = set()
+    for var, path in geo_vb.paths.items():
+        parent_path = parent_geo_vb.paths.get(var)
+        if parent_path is None or path.area_assigned is not parent_path.area_assigned:
+            paths.add(var)
+    variables.update(areas, paths)
+
+    for step in plan.steps:
+        if step.ID in steps or not variables.isdisjoint(step.Args):
+            steps.add(step.ID)
+            if step.schema == 'movemono':
+                areas.update(step.Args[2:4])
+            paths.update(arg for arg in step.Args if arg in geo_vb.paths)
+    return steps, links, areas, paths
+
+@clock
+def check_plan_correctness(plan: GPlan, parent: GPlan=None) -> bool:
+    """Check if the plan is correct. The plan may be incomplete.
+
+    If the parent plan is given, the check is incremental: only the causal links, steps, areas and paths which the
+    refinement of the parent changed (see changed_since) are checked, against the whole plan. The parent is assumed to
+    be correct. An error which the refinement causes in an unchanged part of the plan is missed, e.g. when a new
+    ordering puts an unchanged step between the steps of an unchanged causal link that it threatens.
+    """
+    if parent is None:
+        touched_steps = links = areas = paths = None
+    else:
+        touched_steps, links, areas, paths = changed_since(plan, parent)
     if not plan.isInternallyConsistent():
         print("Plan is not internally consistent")
         return False
@@ -54,7 +118,12 @@ def check_plan_correctness(plan: GPlan) -> bool:
     # check that no causal links are threatened
     for edge in plan.CausalLinkGraph.edges:
         threatening_operators = [t[0] for t in  edge.sink.threat_map[edge.label.sink.ID]]
-        for step in plan.steps:
+        if touched_steps is None or edge in links or edge.source.ID in touched_steps or edge.sink.ID in touched_steps:
+            candidates = plan.steps
+        else:
+            # an unchanged causal link can only be threatened by a changed step
+            candidates = [step for step in plan.steps if step.ID in touched_steps]
+        for step in candidates:
             if not step.stepnum in threatening_operators:
                 continue
             if step == edge.source or step == edge.sink:
@@ -78,6 +147,8 @@ def check_plan_correctness(plan: GPlan) -> bool:
 
     # check that place locations are large enough for the objects
     for area_id in plan.variableBindings.geometric_vb.variables:
+        if areas is not None and area_id not in areas:
+            continue
         placeloc = plan.variableBindings.geometric_vb.placelocs[area_id]
         area = placeloc.area_assigned
         if area is None:
@@ -92,6 +163,8 @@ def check_plan_correctness(plan: GPlan) -> bool:
 
     # check that all reach constraints of steps are satisfied in the assigned area
     for step in plan.steps:
+        if touched_steps is not None and step.ID not in touched_steps:
+            continue
         for rc in step.reach_constraints:
             # check that the reach constraint is satisfied in the assigned area
             area = plan.variableBindings.geometric_vb.get_assigned_area(rc[0])
@@ -115,11 +188,17 @@ def check_plan_correctness(plan: GPlan) -> bool:
             continue
         area_arg = step.Args[3]
         area_list.append(area_arg)
-    
-    i = 0
-    j = 1
+    # the same area can be in the list multiple times
+    area_indices = {}
+    for i, area_arg in enumerate(area_list):
+        area_indices.setdefault(area_arg, []).append(i)
+    geo_vb = plan.variableBindings.geometric_vb
+
     for i in range(len(area_list)):
         area_arg_i = area_list[i]
+        if areas is not None and area_arg_i not in areas:
+            # two unchanged areas do not overlap, the refinement can only order them
+            continue
         # find geometric area
         if area_arg_i in plan.variableBindings.initial_positions.values(): # if the link is grounded in the initial condition, the source area is not a variable.
             area_i = plan.variableBindings.geometric_vb.defined_areas[area_arg_i]
@@ -129,11 +208,17 @@ def check_plan_correctness(plan: GPlan) -> bool:
                 continue
         buffered_area_i = area_i.buffer(-MARGIN_OF_ERROR)
 
+        # check overlap with other areas, only areas near area i can overlap with it
+        candidates = [j for area_arg in geo_vb.query_areas(buffered_area_i, 'overlaps') for j in area_indices.get(area_arg, [])]
+        # pairs of changed areas are checked once, unchanged areas are only checked against changed areas
+        candidates = sorted(j for j in candidates if j > i or (areas is not None and area_list[j] not in areas))
+        if len(candidates) == 0:
+            continue
+
         # find place of path in the plan
         source_i, sink_i = GPlan.find_place_in_plan(plan, area_arg_i)
-       
-        # check overlap with other areas
-        for j in range(i+1, len(area_list)):
+
+        for j in candidates:
             area_arg_j = area_list[j]
 
             # find place in plan
@@ -178,7 +263,12 @@ def check_plan_correctness(plan: GPlan) -> bool:
         # check overlap with areas
         
         # check areas
+        nearby = geo_vb.query_areas(buffered_area, 'overlaps')
         for area_arg in area_list:
+            if area_arg not in nearby:
+                continue
+            if paths is not None and pathvar not in paths and area_arg not in areas:
+                continue
             source, sink = GPlan.find_place_in_plan(plan, area_arg)
             if pathstep == source or pathstep == sink:
                 continue
@@ -256,7 +346,7 @@ def check_plan_execution(plan: GPlan) -> bool:
 
     closed_list = [plan.dummy.init]
     # create a state object
-    state = plan.variableBindings.initial_positions
+    state = dict(plan.variableBindings.initial_positions)
 
     while True:
         # determine which steps can be executed
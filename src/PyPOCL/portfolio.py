@@ -0,0 +1,95 @@
+from collections import namedtuple
+import contextlib
+import multiprocessing
+import os
+import queue
+import time
+
+from PyPOCL.PyDPOCL import POCLPlanner
+from PyPOCL.worldmodel import Domain, Problem
+
+PortfolioConfig = namedtuple("PortfolioConfig", ["name", "flaw_order", "h_weight", "strategy"], defaults=["astar"])
+PortfolioReport = namedtuple("PortfolioReport", ["planning_time", "winner", "planning_report", "reports"])
+
+DEFAULT_PORTFOLIO = [
+    PortfolioConfig("symbolic-first", flaw_order=0, h_weight=1),
+    PortfolioConfig("classic", flaw_order=1, h_weight=1),
+    PortfolioConfig("symbolic-first-weighted", flaw_order=0, h_weight=3),
+    PortfolioConfig("classic-weighted", flaw_order=1, h_weight=3),
+    PortfolioConfig("symbolic-first-greedy", flaw_order=0, h_weight=1, strategy="greedy"),
+]
+
+def _run_config(index: int, config: PortfolioConfig, domain: Domain, problem: Problem, k: int, cutoff: int, results, verbose: bool) -> None:
+    """solve the problem with one configuration and put the result on the results queue"""
+    try:
+        with contextlib.ExitStack() as stack:
+            if not verbose:
+                devnull = stack.enter_context(open(os.devnull, 'w'))
+                stack.enter_context(contextlib.redirect_stdout(devnull))
+            planner = POCLPlanner(domain, problem, flaw_order=config.flaw_order, h_weight=config.h_weight)
+            plans, planning_report = planner.solve(k=k, cutoff=cutoff, strategy=config.strategy)
+        results.put((index, plans, planning_report, None))
+    except Exception as e:
+        results.put((index, [], None, repr(e)))
+
+def solve_portfolio(domain: Domain, problem: Problem, configs=None, k: int=1, cutoff: int=60, verbose: bool=False):
+    """Solve a problem with several planner configurations in parallel. The first configuration to find a solution
+    wins, the other processes are terminated.
+
+    Args:
+        domain (Domain): domain of the planning problem
+        problem (Problem): problem of the planning problem
+        configs (list(PortfolioConfig)): configurations to race. Defaults to DEFAULT_PORTFOLIO.
+        k (int): number of solutions each configuration searches for
+        cutoff (int): time limit in seconds for each configuration
+        verbose (bool): show the progress output of the planners
+
+    Returns:
+        tuple(list(GPlan), PortfolioReport): the plans of the winning configuration (empty if no configuration found a plan)
+            and a report with the winning configuration and the PlanningReport of each finished configuration.
+    """
+    if configs is None:
+        configs = DEFAULT_PORTFOLIO
+    if len(configs) == 0:
+        raise ValueError("portfolio contains no configurations")
+
+    t0 = time.time()
+    results = multiprocessing.Queue()
+    processes = [multiprocessing.Process(target=_run_config, args=(i, config, domain, problem, k, cutoff, results, verbose), daemon=True)
+                 for i, config in enumerate(configs)]
+    for process in processes:
+        process.start()
+
+    reports = {}
+    winner = None
+    plans = []
+    try:
+        while len(reports) < len(configs):
+            try:
+                index, found_plans, planning_report, error = results.get(timeout=1)
+            except queue.Empty:
+                # a process which died without reporting will never finish
+                if all(not process.is_alive() for process in processes) and results.empty():
+                    break
+                continue
+            if error is not None:
+                print(f"configuration {configs[index].name} failed: {error}")
+            reports[configs[index].name] = planning_report
+            if len(found_plans) > 0:
+                winner = configs[index]
+                plans = found_plans
+                break
+    finally:
+        for process in processes:
+            if process.is_alive():
+                process.terminate()
+        for process in processes:
+            process.join()
+
+    planning_time = time.time() - t0
+    winning_report = reports[winner.name] if winner is not None else None
+    if winner is not None:
+        print(f"configuration {winner.name} found a solution in {planning_time:.3f}s")
+    else:
+        print(f"FAIL: no configuration found a solution in {planning_time:.3f}s")
+    return plans, PortfolioReport(planning_time, winner, winning_report, reports)
@@ -0,0 +1,346 @@
+"""
+    Search strategies of the planner. A strategy is a frontier which decides the order in which the plans are expanded.
+    Plans are evaluated before they are inserted, so plan.cost and plan.heuristic are set. The heuristic is already
+    multiplied with the heuristic weight of the planner.
+"""
+from heapq import heapify, heappop, heappush, nsmallest
+import copy
+import os
+import pickle
+import shutil
+import tempfile
+
+class Frontier:
+    """Best-first search on cost + heuristic, ties are broken with GPlan.__lt__. This is A*, or weighted A* if the
+    planner has a heuristic weight larger than 1.
+
+    With a memory budget the frontier keeps at most max_resident plans in memory. When the budget is exceeded, the worse
+    half of the plans is written to disk as a sorted run, of which only the best plan stays in memory. A run is read
+    back when its best plan is the best plan of the frontier, so the plans are expanded in the same order as without a
+    budget, apart from the order of plans which compare equal.
+
+    The spilled runs are not read back when the frontier is saved in a checkpoint. store_runs copies them next to the
+    checkpoint first, and the saved frontier refers to the copies.
+
+    Args:
+        max_resident (int): maximum number of plans in memory, no limit if None
+        spill_dir (str): directory in which the spilled plans are stored, a temporary directory by default
+
+    Attributes:
+        exhaustive (bool): the search continues after k solutions are found, until the frontier is empty or the time
+            is up. The best k solutions are returned.
+        pruned (int): number of plans discarded by the strategy
+        spills (int): number of runs written to disk
+        reloads (int): number of runs read from disk
+    """
+    exhaustive = False
+
+    def __init__(self, max_resident=None, spill_dir=None):
+        if max_resident is not None and max_resident < 2:
+            raise ValueError(f"frontier must be able to hold at least 2 plans, got {max_resident}")
+        self._frontier = []
+        self.pruned = 0
+        self.max_resident = max_resident
+        self.spill_dir = spill_dir
+        self._store = None
+        self._runs = [] # heap of spilled runs, ordered by their best entry
+        self._spilled = 0 # number of entries in the spilled runs
+        self.spills = 0
+        self.reloads = 0
+
+    def __len__(self):
+        return len(self._frontier) + self._spilled
+
+    def __getitem__(self, position):
+        if len(self._runs) > 0:
+            return list(self)[position]
+        return self._plan(self._frontier[position])
+
+    def __iter__(self):
+        for entry in self._frontier:
+            yield self._plan(entry)
+        for run in self._runs:
+            yield self._plan(run.head)
+            for entry in run.load():
+                yield self._plan(entry)
+
+    @property
+    def resident(self):
+        """number of plans in memory"""
+        return len(self) - self.on_disk
+
+    @property
+    def on_disk(self):
+        """number of plans written to disk"""
+        return self._spilled - len(self._runs)
+
+    def _entry(self, plan):
+        """heap entry of a plan"""
+        return plan
+
+    def _plan(self, entry):
+        """plan of a heap entry"""
+        return entry
+
+    def pop(self):
+        if len(self._runs) > 0 and (len(self._frontier) == 0 or self._runs[0].head < self._frontier[0]):
+            self._reload(heappop(self._runs))
+        return self._plan(heappop(self._frontier))
+
+    def insert(self, plan):
+        heappush(self._frontier, self._entry(plan))
+        if self.max_resident is not None and len(self._frontier) > self.max_resident:
+            self._spill()
+
+    def extend(self, itera):
+        for item in itera:
+            self.insert(item)
+
+    def _spill(self):
+        """write the worse half of the plans in memory to disk"""
+        if self._store is None:
+            self._store = tempfile.TemporaryDirectory(prefix='pypocl_frontier_', dir=self.spill_dir)
+        entries = sorted(self._frontier) # a sorted list is a heap
+        keep = self.max_resident // 2
+        self._frontier = entries[:keep]
+        run = _SpilledRun(entries[keep], os.path.join(self._store.name, f'run{self.spills}.pkl'), entries[keep+1:])
+        heappush(self._runs, run)
+        self._spilled += run.size
+        self.spills += 1
+
+    def _reload(self, run):
+        """move the plans of a spilled run back into memory"""
+        self._frontier.append(run.head)
+        self._frontier.extend(run.load())
+        heapify(self._frontier)
+        if run.path != run.checkpoint_path:
+            os.remove(run.path)
+        self._spilled -= run.size
+        self.reloads += 1
+
+    def solution_found(self, plan):
+        """called when a plan without flaws is popped"""
+        pass
+
+    def store_runs(self, directory):
+        """copy the spilled runs which are not yet in a directory into it, such that the frontier can be saved without
+        reading them into memory. Runs are only copied once, as they do not change."""
+        for run in self._runs:
+            if run.checkpoint_path is not None and os.path.dirname(run.checkpoint_path) == directory:
+                continue
+            os.makedirs(directory, exist_ok=True)
+            fd, path = tempfile.mkstemp(prefix='run', suffix='.pkl', dir=directory)
+            os.close(fd)
+            shutil.copyfile(run.path, path)
+            run.checkpoint_path = path
+
+    def remove_stored_runs(self, directory):
+        """remove the files of a directory written by store_runs which are no longer spilled runs of the frontier"""
+        if not os.path.isdir(directory):
+            return
+        keep = {run.checkpoint_path for run in self._runs}
+        for name in os.listdir(directory):
+            path = os.path.join(directory, name)
+            if path not in keep:
+                os.remove(path)
+        if len(keep) == 0:
+            os.rmdir(directory)
+
+    def __getstate__(self):
+        state = self.__dict__.copy()
+        state['_store'] = None
+        if all(run.checkpoint_path is not None for run in self._runs):
+            # the saved frontier reads the runs from the files written by store_runs
+            state['_runs'] = [run.stored() for run in self._runs]
+        else:
+            # spilled plans are included, such that the frontier can be saved without its files
+            entries = list(self._frontier)
+            for run in self._runs:
+                entries.append(run.head)
+                entries.extend(run.load())
+            heapify(entries)
+            state.update(_frontier=entries, _runs=[], _spilled=0)
+        return state
+
+    def __repr__(self):
+        return f'{type(self).__name__} with {len(self)} plans'
+
+
+class _SpilledRun:
+    """sorted heap entries stored in a file, except for the best one. checkpoint_path is the copy of the file written by
+    Frontier.store_runs, or None."""
+    __slots__ = 'head', 'path', 'size', 'checkpoint_path'
+
+    def __init__(self, head, path, entries):
+        self.head = head
+        self.path = path
+        self.size = len(entries) + 1
+        self.checkpoint_path = None
+        with open(path, 'wb') as f:
+            pickle.dump(entries, f, protocol=pickle.HIGHEST_PROTOCOL)
+
+    def stored(self):
+        """the run read from its copy in the checkpoint"""
+        run = copy.copy(self)
+        run.path = self.checkpoint_path
+        return run
+
+    def load(self):
+        with open(self.path, 'rb') as f:
+            return pickle.load(f)
+
+    def __lt__(self, other):
+        return self.head < other.head
+
+
+class GreedyFrontier(Frontier):
+    """Greedy best-first search on the heuristic only, ties are broken with GPlan.__lt__. Finds a solution with fewer
+    expansions when the heuristic is informative, but the solution can be more expensive."""
+
+    def _entry(self, plan):
+        return plan.heuristic, plan
+
+    def _plan(self, entry):
+        return entry[1]
+
+
+class BeamFrontier(Frontier):
+    """Beam search. The successors of the plans in one layer form the next layer, of which only the best `width`
+    plans (on cost + heuristic) are kept. Plans in a layer are expanded best first. Incomplete, since a plan which
+    is needed for the solution can fall out of the beam.
+
+    Args:
+        width (int): maximum number of plans per layer
+    """
+
+    def __init__(self, width=10):
+        super().__init__()
+        if width < 1:
+            raise ValueError(f"beam width must be at least 1, got {width}")
+        self.width = width
+        self._next_layer = []
+
+    def __len__(self):
+        return len(self._frontier) + len(self._next_layer)
+
+    def __getitem__(self, position):
+        return list(self)[position]
+
+    def __iter__(self):
+        yield from self._frontier
+        yield from self._next_layer
+
+    def pop(self):
+        if len(self._frontier) == 0:
+            self._frontier = nsmallest(self.width, self._next_layer)
+            heapify(self._frontier)
+            self.pruned += len(self._next_layer) - len(self._frontier)
+            self._next_layer = []
+        return heappop(self._frontier)
+
+    def insert(self, plan):
+        self._next_layer.append(plan)
+
+
+class DepthFirstBnBFrontier(Frontier):
+    """Depth-first branch and bound. The successors of the last expanded plan are expanded first, best first. Once a
+    solution is found, plans whose cost + heuristic is not lower than the cost of the best solution are pruned. The
+    search continues until the frontier is empty or the time is up, so the solutions improve over time.
+
+    The plan space is infinite, since steps can be added forever, so a plain depth-first search does not have to find
+    a solution. Therefore plans whose cost + heuristic exceeds a threshold are deferred. When no plan below the
+    threshold remains, the threshold is raised to the lowest cost + heuristic of the deferred plans. The first solution
+    is then as good as the one of A*, and the best solution is optimal if the frontier is emptied and the heuristic
+    does not overestimate.
+
+    Attributes:
+        bound (float): cost of the best solution found
+        threshold (float): plans with a higher cost + heuristic are deferred
+    """
+    exhaustive = True
+
+    def __init__(self):
+        super().__init__()
+        self._successors = []
+        self._deferred = []
+        self.bound = float('inf')
+        self.threshold = None
+
+    def __len__(self):
+        return len(self._frontier) + len(self._successors) + len(self._deferred)
+
+    def __getitem__(self, position):
+        return list(self)[position]
+
+    def __iter__(self):
+        yield from self._frontier
+        yield from self._successors
+        yield from self._deferred
+
+    def pop(self):
+        # successors of the last expanded plan go on top of the stack, the best one last
+        self._successors.sort(reverse=True)
+        self._frontier.extend(self._successors)
+        self._successors = []
+        if len(self._frontier) == 0:
+            self.threshold = _f(self._deferred[0])
+            while len(self._deferred) > 0 and _f(self._deferred[0]) <= self.threshold:
+                self._frontier.append(heappop(self._deferred))
+            self._frontier.reverse()
+        return self._frontier.pop()
+
+    def insert(self, plan):
+        if self.threshold is None:
+            self.threshold = _f(plan)
+        if _f(plan) >= self.bound:
+            self.pruned += 1
+        elif _f(plan) > self.threshold:
+            heappush(self._deferred, plan)
+        else:
+            self._successors.append(plan)
+
+    def solution_found(self, plan):
+        if plan.cost >= self.bound:
+            return
+        self.bound = plan.cost
+        n_plans = len(self)
+        self._frontier = [p for p in self._frontier if _f(p) < self.bound]
+        self._successors = [p for p in self._successors if _f(p) < self.bound]
+        self._deferred = [p for p in self._deferred if _f(p) < self.bound]
+        heapify(self._deferred)
+        self.pruned += n_plans - len(self)
+
+
+def _f(plan):
+    return plan.cost + plan.heuristic
+
+
+SEARCH_STRATEGIES = {
+    'astar': Frontier,
+    'greedy': GreedyFrontier,
+    'beam': BeamFrontier,
+    'dfbnb': DepthFirstBnBFrontier,
+}
+
+def make_frontier(strategy='astar', beam_width=10, max_resident=None, spill_dir=None):
+    """create an empty frontier for a search strategy
+
+    Args:
+        strategy (str): one of SEARCH_STRATEGIES. Weighted A* is 'astar' with a heuristic weight larger than 1.
+        beam_width (int): number of plans per layer of the beam search
+        max_resident (int): maximum number of plans in memory, the others are written to disk. Only for 'astar' and
+            'greedy', the other strategies keep few plans.
+        spill_dir (str): directory in which the spilled plans are stored, a temporary directory by default
+
+    Returns:
+        Frontier: the frontier
+    """
+    if strategy not in SEARCH_STRATEGIES:
+        raise ValueError(f"unknown search strategy {strategy}, choose from {list(SEARCH_STRATEGIES)}")
+    if max_resident is not None and strategy not in ('astar', 'greedy'):
+        raise ValueError(f"search strategy {strategy} does not support a memory budget")
+    if strategy == 'beam':
+        return BeamFrontier(beam_width)
+    if strategy == 'dfbnb':
+        return DepthFirstBnBFrontier()
+    return SEARCH_STRATEGIES[strategy](max_resident, spill_dir)
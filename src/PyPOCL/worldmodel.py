@@ -1,17 +1,29 @@
 import os
 import json
+import glob
+import hashlib
+import io
+import pickle
+import tempfile
+import uuid
 from collections import namedtuple
 from shapely import Polygon, intersects, difference, within, box
 from dataclasses import dataclass
-from PyPOCL.deterministic_uuid import duuid4
+from PyPOCL import deterministic_uuid
+from PyPOCL.deterministic_uuid import duuid4, IntegerID, creation_order
 
-from PyPOCL.Ground_Compiler_Library.GElm import GLiteral, Operator
+from PyPOCL.Ground_Compiler_Library.GElm import GLiteral, Operator, StepTables
 from PyPOCL.Ground_Compiler_Library import Ground, precompile
 from PyPOCL.Ground_Compiler_Library.Element import Argument
 
 Domain = namedtuple('Domain', ['name', 'conditions', 'object_types', 'operators'])
 Problem = namedtuple('Problem', ['name', 'domain', 'objects', 'object_dimensions', 'base_area', 'areas', 'initial_positions', 'init', 'goal', 'robot_reach'])
 
+# directory in which compiled problems are stored, the user cache directory unless PYPOCL_CACHE_DIR is set
+CACHE_DIR = os.environ.get('PYPOCL_CACHE_DIR') or os.path.join(os.environ.get('XDG_CACHE_HOME') or os.path.expanduser('~/.cache'), 'pypocl')
+CACHE_SIZE = 64 # maximum number of compiled problems in the cache, the least recently used ones are removed
+_source_hash = None
+
 def just_compile(domain_file, problem_file):
 	GL = Ground.GLib(domain_file, problem_file)
 	ground_step_list = precompile.deelementize_ground_library(GL)
@@ -66,7 +78,7 @@ def load_worldmodel(file, objects):
     robot_reach_mapping = {} # mapping between a robot argument and an area argument representing its reach
 
     # link areas to their arguments
-    area_objects = [a for a in objects if a.typ=='area']
+    area_objects = [a for a in sorted(objects, key=lambda a: creation_order(a.ID)) if a.typ=='area']
     for a in area_objects:
         area_mapping[a] = areas[a.name]
         if a.name == base_area:
@@ -75,7 +87,7 @@ def load_worldmodel(file, objects):
              base_area_arg = a
 
     # link objects to their arguments
-    physical_objects = [a for a in objects if a.typ=='physical_item']
+    physical_objects = [a for a in sorted(objects, key=lambda a: creation_order(a.ID)) if a.typ=='physical_item']
     for o in physical_objects:
         object_dimensions[o] = (geo_objects[o.name].width, geo_objects[o.name].length)
         # create arguments to represent the initial positions of the object
@@ -97,7 +109,7 @@ def load_worldmodel(file, objects):
         area_mapping[area_arg] = object_poly
 
     # link robots to their reach
-    robot_objects = [a for a in objects if a.typ=='robot']
+    robot_objects = [a for a in sorted(objects, key=lambda a: creation_order(a.ID)) if a.typ=='robot']
     for r in robot_objects:
         reach_area = [a for a in area_objects if a.name == robot_reach[r.name]]
         robot_reach_mapping[r] = reach_area[0] 
@@ -211,49 +223,194 @@ def create_collision_free_goal_state(goal_state, area_mapping, object_area_mappi
 
 def pre_process_operators(operators):
 		"""pre processes operators with the relations between them.
-		updates properties cndts, cndt_map, threat_map, and threats
+		updates the tables with properties cndts, cndt_map, threat_map, and threats
 
 		Args:
 			operators (List(Operator)): list of operators, including the initial and goal state.
 		"""
-		
+		# index the effects of all operators by predicate name, in the order of operators and effects
+		effect_index = dict()
+		for op2 in operators:
+			for eff_i, eff in enumerate(op2.effects):
+				effect_index.setdefault(eff.name, []).append((op2.stepnumber, eff_i, eff.truth))
+
 		for op1 in operators:
-			# clear existing data
-			op1.cndts = []
-			op1.cndt_map = dict()
-			op1.threats = []
-			op1.threat_map = dict()
+			# replace existing data. The tables are shared by all instances of op1
+			tables = StepTables([], dict(), [], dict())
+			cndts = set()
+			threats = set()
 
 			for pre in op1.preconds:
-				print('... Processing antecedents for {} \t\tof step {}'.format(pre, op1))
-				op1.cndt_map[pre.ID] = []
-				op1.threat_map[pre.ID] = []
-				for op2 in operators:
-					for eff_i in range(len(op2.effects)):
-						eff = op2.effects[eff_i]
-						if eff.name != pre.name:
-							continue # effect is not based on the same predicate as the precondition
-						if eff.truth != pre.truth: # the effect undoes the precondition. Add to threat list
-							if op2.stepnumber not in op1.threats:
-								op1.threats.append(op2.stepnumber)
-							op1.threat_map[pre.ID].append((op2.stepnumber, eff_i))
-						else: # the effect is identical and therefore fulfills the precondition
-							if op2.stepnumber not in op1.cndts:
-								op1.cndts.append(op2.stepnumber)
-							op1.cndt_map[pre.ID].append((op2.stepnumber, eff_i))
-
-
-def load_domain_and_problem(domain_file, problem_file, worldmodel_file):
+				tables.cndt_map[pre.ID] = []
+				tables.threat_map[pre.ID] = []
+				for stepnumber, eff_i, truth in effect_index.get(pre.name, []):
+					if truth != pre.truth: # the effect undoes the precondition. Add to threat list
+						if stepnumber not in threats:
+							threats.add(stepnumber)
+							tables.threats.append(stepnumber)
+						tables.threat_map[pre.ID].append((stepnumber, eff_i))
+					else: # the effect is identical and therefore fulfills the precondition
+						if stepnumber not in cndts:
+							cndts.add(stepnumber)
+							tables.cndts.append(stepnumber)
+						tables.cndt_map[pre.ID].append((stepnumber, eff_i))
+			op1.tables = tables
+
+
+def compiler_source_hash():
+    """hash of the source code of the compiler, such that cached problems are not used after the code changed"""
+    global _source_hash
+    if _source_hash is None:
+        package_dir = os.path.dirname(os.path.abspath(__file__))
+        h = hashlib.sha256()
+        for file in sorted(glob.glob(os.path.join(package_dir, '*.py')) + glob.glob(os.path.join(package_dir, 'Ground_Compiler_Library', '**', '*.py'), recursive=True)):
+            with open(file, 'rb') as f:
+                h.update(f.read())
+        _source_hash = h.hexdigest()
+    return _source_hash
+
+def problem_cache_key(domain_file, problem_file, worldmodel_file):
+    """key of a compiled problem, based on the contents and names of the files, the source code of the compiler and the
+    kind of IDs which are created"""
+    h = hashlib.sha256(compiler_source_hash().encode())
+    h.update(b'integer ids' if deterministic_uuid.integer_ids() else b'uuids')
+    for file in [domain_file, problem_file, worldmodel_file]:
+        if file is None:
+            h.update(b'None')
+            continue
+        h.update(os.path.basename(file).encode())
+        with open(file, 'rb') as f:
+            h.update(hashlib.sha256(f.read()).digest())
+    return h.hexdigest()
+
+def load_domain_and_problem(domain_file, problem_file, worldmodel_file, use_cache=True):
     """
-    Create a domain with the given initial and goal states.
+    Create a domain with the given initial and goal states. Compiled problems are cached in CACHE_DIR, such that
+    loading the same files again only unpickles the result.
 
     Args:
-        init (str): Initial state of the domain.
-        goal (str): Goal state of the domain.
+        domain_file (str): pddl file of the domain.
+        problem_file (str): pddl file of the problem.
+        worldmodel_file (str): json file of the worldmodel. None if the problem has no geometric variables.
+        use_cache (bool): use and update the cache of compiled problems. The result is the same without the cache.
 
     Returns:
-        Domain: A named tuple representing the domain with init and goal states.
+        tuple(Domain, Problem): named tuples representing the domain and the problem with init and goal states.
     """
+    cache_file = None
+    if use_cache:
+        cache_file = os.path.join(CACHE_DIR, problem_cache_key(domain_file, problem_file, worldmodel_file) + '.pickle')
+    if cache_file is not None and os.path.exists(cache_file):
+        uuid_state = deterministic_uuid.getstate()
+        try:
+            with open(cache_file, 'rb') as f:
+                domain, problem = _load_compiled(f)
+            os.utime(cache_file) # mark as recently used
+            return domain, problem
+        except Exception as e:
+            deterministic_uuid.setstate(uuid_state)
+            print(f"could not load cached problem {cache_file}: {e}")
+
+    compiled = _compile_canonical(domain_file, problem_file, worldmodel_file)
+    if cache_file is not None:
+        try:
+            os.makedirs(CACHE_DIR, exist_ok=True)
+            # write to a temporary file first, such that other processes never read a partial file
+            fd, tmp_file = tempfile.mkstemp(dir=CACHE_DIR, suffix='.tmp')
+            with os.fdopen(fd, 'wb') as f:
+                f.write(compiled)
+            os.replace(tmp_file, cache_file)
+            _prune_cache()
+        except Exception as e:
+            print(f"could not cache compiled problem: {e}")
+    return _load_compiled(io.BytesIO(compiled))
+
+def _compile_canonical(domain_file, problem_file, worldmodel_file):
+    """Compile a problem starting from the initial state of the ID generator, such that the pickled problem does not
+    depend on the IDs which were created before. The compiled problem only depends on the order in which its IDs are
+    created, see compile_domain_and_problem, so _load_compiled can replace them by new ones.
+
+    Returns:
+        bytes: the number of IDs created while compiling and the pickled domain and problem, see _load_compiled
+    """
+    uuid_state = deterministic_uuid.getstate()
+    deterministic_uuid.setstate(deterministic_uuid.initial_state())
+    n_created = deterministic_uuid.created()
+    try:
+        domain, problem = compile_domain_and_problem(domain_file, problem_file, worldmodel_file)
+        n_ids = deterministic_uuid.created() - n_created
+    finally:
+        deterministic_uuid.setstate(uuid_state)
+    f = io.BytesIO()
+    pickle.dump(n_ids, f)
+    _IDPickler(f, _created_ids(deterministic_uuid.initial_state(), n_ids)).dump((domain, problem))
+    return f.getvalue()
+
+def _load_compiled(f):
+    """load a problem pickled by _compile_canonical. The IDs of the problem are created now, so the IDs and the state
+    of the generator afterwards are the same as when the problem is compiled now."""
+    n_ids = pickle.load(f)
+    ids = [duuid4() for _ in range(n_ids)]
+    return _IDUnpickler(f, ids).load()
+
+def _created_ids(uuid_state, n):
+    """the first n IDs the generator creates from a state, in the order they are created. Keeps the current state."""
+    current_state = deterministic_uuid.getstate()
+    deterministic_uuid.setstate(uuid_state)
+    ids = [duuid4() for _ in range(n)]
+    deterministic_uuid.setstate(current_state)
+    return ids
+
+class _IDPickler(pickle.Pickler):
+    """pickles the IDs created while compiling as their position in the order they were created"""
+    def __init__(self, file, ids):
+        super().__init__(file, protocol=pickle.HIGHEST_PROTOCOL)
+        self._positions = {ID: i for i, ID in enumerate(ids)}
+
+    def persistent_id(self, obj):
+        if type(obj) is uuid.UUID or type(obj) is IntegerID:
+            return self._positions.get(obj)
+        return None
+
+class _IDUnpickler(pickle.Unpickler):
+    """replaces the IDs pickled by _IDPickler by the IDs at the same position in a new list"""
+    def __init__(self, file, ids):
+        super().__init__(file)
+        self._ids = ids
+
+    def persistent_load(self, pid):
+        return self._ids[pid]
+
+def _prune_cache():
+    """remove the least recently used compiled problems until the cache holds at most CACHE_SIZE"""
+    entries = []
+    for name in os.listdir(CACHE_DIR):
+        if name.endswith('.pickle'):
+            path = os.path.join(CACHE_DIR, name)
+            try:
+                entries.append((os.path.getmtime(path), path))
+            except OSError: # removed by another process
+                pass
+    entries.sort()
+    for _, path in entries[:max(0, len(entries) - CACHE_SIZE)]:
+        try:
+            os.remove(path)
+        except OSError:
+            pass
+
+def compile_domain_and_problem(domain_file, problem_file, worldmodel_file):
+    """
+    Compile a domain and problem from the pddl files and the worldmodel, without using the cache.
+
+    Returns:
+        tuple(Domain, Problem): named tuples representing the domain and the problem with init and goal states.
+    """
+    # the compiler iterates over sets of elements in the order in which their IDs were created, such that the compiled
+    # problem only depends on the number of IDs created before, not on their values
+    with deterministic_uuid.record_positions():
+        return _compile_domain_and_problem(domain_file, problem_file, worldmodel_file)
+
+def _compile_domain_and_problem(domain_file, problem_file, worldmodel_file):
     ground_steps, objects, object_types = just_compile(domain_file, problem_file)
     operators = ground_steps[:-2]  # all except init and goal
     init_state = ground_steps[-2]  # second last step is the initial state
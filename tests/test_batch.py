@@ -0,0 +1,72 @@
+import csv
+import os
+import shutil
+import tempfile
+import time
+import unittest
+from unittest import mock
+
+from PyPOCL import batch
+
+def _hang(job, domain_file, k, cutoff, plan_dir, verbose, connection):
+    time.sleep(60)
+
+def _crash(job, domain_file, k, cutoff, plan_dir, verbose, connection):
+    os._exit(1)
+
+def _report_and_hang(job, domain_file, k, cutoff, plan_dir, verbose, connection):
+    connection.send((job.iteration, [batch._row(job, "success")]))
+    time.sleep(60)
+
+class TestBatch(unittest.TestCase):
+    def setUp(self):
+        self.tmp_dir = tempfile.mkdtemp()
+        self.csv_file = os.path.join(self.tmp_dir, "results.csv")
+        self.problems = batch.find_problems("domains/manipulation-domain-batch")[2:4]
+
+    def tearDown(self):
+        shutil.rmtree(self.tmp_dir)
+
+    def read_rows(self):
+        with open(self.csv_file, newline="") as f:
+            return list(csv.DictReader(f))
+
+    def test_run_and_resume(self):
+        counts = batch.run_batch(batch.DEFAULT_DOMAIN, self.problems, self.csv_file, workers=2, timeout=30, repeats=2)
+        self.assertEqual(counts["success"], 4)
+        rows = self.read_rows()
+        self.assertEqual(sorted(int(row["iteration"]) for row in rows), [0, 1, 2, 3])
+        self.assertEqual(list(rows[0].keys()), batch.FIELDNAMES)
+        self.assertTrue(all(int(row["expanded"]) > 0 for row in rows))
+
+        # only the new repeat is solved
+        counts = batch.run_batch(batch.DEFAULT_DOMAIN, self.problems, self.csv_file, workers=2, timeout=30, repeats=3, resume=True)
+        self.assertEqual(counts["success"], 6)
+        self.assertEqual(sorted(int(row["iteration"]) for row in self.read_rows()), list(range(6)))
+
+    def test_timeout(self):
+        with mock.patch.object(batch, "_run_job", _hang), mock.patch.object(batch, "KILL_GRACE", 0):
+            t0 = time.time()
+            counts = batch.run_batch(batch.DEFAULT_DOMAIN, self.problems, self.csv_file, workers=2, timeout=0.5)
+        self.assertLess(time.time() - t0, 30)
+        self.assertEqual(counts["timeout"], 2)
+        self.assertEqual([row["status"] for row in self.read_rows()], ["timeout", "timeout"])
+
+    def test_worker_without_result(self):
+        with mock.patch.object(batch, "_run_job", _crash):
+            counts = batch.run_batch(batch.DEFAULT_DOMAIN, self.problems, self.csv_file, workers=2, timeout=30)
+        self.assertEqual(counts["error"], 2)
+        self.assertEqual([row["status"] for row in self.read_rows()], ["error", "error"])
+
+    def test_worker_hangs_after_result(self):
+        # the result is written once, and the worker is killed instead of waited for
+        with mock.patch.object(batch, "_run_job", _report_and_hang), mock.patch.object(batch, "KILL_GRACE", 0.5):
+            t0 = time.time()
+            counts = batch.run_batch(batch.DEFAULT_DOMAIN, self.problems, self.csv_file, workers=2, timeout=0.5)
+        self.assertLess(time.time() - t0, 30)
+        self.assertEqual(counts["success"], 2)
+        self.assertEqual(counts["timeout"], 0)
+        self.assertEqual(len(self.read_rows()), 2)
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,106 @@
+import os
+import shutil
+import tempfile
+import pickle
+import unittest
+from unittest import mock
+
+from PyPOCL.PyDPOCL import POCLPlanner
+from PyPOCL.worldmodel import load_domain_and_problem
+from PyPOCL.plan_utility import check_plan
+from PyPOCL import deterministic_uuid
+from PyPOCL.search_strategies import _SpilledRun
+
+class Interrupted(Exception):
+    pass
+
+class InterruptedPlanner(POCLPlanner):
+    """planner which is interrupted after a number of expansions"""
+    interrupt_at = None
+
+    def select_flaw(self, plan, t0):
+        if InterruptedPlanner.interrupt_at is not None and self.expanded >= InterruptedPlanner.interrupt_at:
+            raise Interrupted()
+        return super().select_flaw(plan, t0)
+
+class ResidentCheckpointPlanner(InterruptedPlanner):
+    """planner which records the number of plans in memory while a checkpoint is written, and fails if a spilled run
+    is read back"""
+    peak_resident = 0
+
+    def save_checkpoint(self, elapsed):
+        with mock.patch.object(_SpilledRun, 'load', side_effect=AssertionError("spilled run read while checkpointing")):
+            super().save_checkpoint(elapsed)
+        ResidentCheckpointPlanner.peak_resident = max(ResidentCheckpointPlanner.peak_resident, self._frontier.resident)
+
+class TestCheckpoint(unittest.TestCase):
+    def setUp(self):
+        domain_name = "manipulation-domain"
+        self.domain_file = f"tests/benchmarks/{domain_name}/domain.pddl"
+        self.problem_file = f"tests/benchmarks/{domain_name}/problem.pddl"
+        self.worldmodel_file = f"tests/benchmarks/{domain_name}/worldmodel.json"
+        self.tmp_dir = tempfile.mkdtemp()
+        self.checkpoint_file = os.path.join(self.tmp_dir, "search.pkl")
+        self.uuid_state = deterministic_uuid.getstate()
+
+    def tearDown(self):
+        InterruptedPlanner.interrupt_at = None
+        deterministic_uuid.setstate(self.uuid_state)
+        shutil.rmtree(self.tmp_dir)
+
+    def make_planner(self):
+        deterministic_uuid.seed(0)
+        domain, problem = load_domain_and_problem(self.domain_file, self.problem_file, self.worldmodel_file)
+        return InterruptedPlanner(domain, problem)
+
+    def test_resume(self):
+        plans, report = self.make_planner().solve(k=3, cutoff=60)
+
+        InterruptedPlanner.interrupt_at = 20
+        with self.assertRaises(Interrupted):
+            self.make_planner().solve(k=3, cutoff=60, checkpoint_file=self.checkpoint_file, checkpoint_interval=0)
+        self.assertTrue(os.path.exists(self.checkpoint_file))
+        self.assertFalse(os.path.exists(self.checkpoint_file + '.tmp'))
+
+        InterruptedPlanner.interrupt_at = None
+        resumed_plans, resumed_report = POCLPlanner.resume(self.checkpoint_file)
+        self.assertEqual(len(resumed_plans), 3)
+        for plan in resumed_plans:
+            self.assertTrue(check_plan(plan), "Plan is not valid")
+        self.assertEqual([plan.cost for plan in resumed_plans], [plan.cost for plan in plans])
+        # expansions before the checkpoint are counted
+        self.assertGreater(resumed_report.expanded, 20)
+
+    def test_resume_memory_bounded(self):
+        InterruptedPlanner.interrupt_at = 10
+        with self.assertRaises(Interrupted):
+            self.make_planner().solve(k=1, cutoff=60, max_resident=2, checkpoint_file=self.checkpoint_file, checkpoint_interval=0)
+
+        InterruptedPlanner.interrupt_at = None
+        plans, _ = POCLPlanner.resume(self.checkpoint_file)
+        self.assertEqual(len(plans), 1)
+        self.assertTrue(check_plan(plans[0]), "Plan is not valid")
+
+    def test_checkpoint_keeps_runs_on_disk(self):
+        InterruptedPlanner.interrupt_at = 10
+        deterministic_uuid.seed(0)
+        domain, problem = load_domain_and_problem(self.domain_file, self.problem_file, self.worldmodel_file)
+        with self.assertRaises(Interrupted):
+            ResidentCheckpointPlanner(domain, problem).solve(k=1, cutoff=60, max_resident=2, checkpoint_file=self.checkpoint_file, checkpoint_interval=0)
+        # a run is loaded when it holds the best plan, the budget is exceeded by at most one run
+        self.assertLessEqual(ResidentCheckpointPlanner.peak_resident, 2 + 2)
+
+        with open(self.checkpoint_file, 'rb') as f:
+            frontier = pickle.load(f)['planner']._frontier
+        self.assertGreater(len(frontier._runs), 0)
+        self.assertLessEqual(len(frontier._frontier), 2)
+        self.assertEqual({run.path for run in frontier._runs},
+                         {os.path.join(self.checkpoint_file + '.runs', name) for name in os.listdir(self.checkpoint_file + '.runs')})
+
+        InterruptedPlanner.interrupt_at = None
+        plans, _ = POCLPlanner.resume(self.checkpoint_file)
+        self.assertEqual(len(plans), 1)
+        self.assertTrue(check_plan(plans[0]), "Plan is not valid")
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,99 @@
+import pickle
+import unittest
+
+from PyPOCL.Flaws import Flaw, Flawque
+
+class TestFlawque(unittest.TestCase):
+    def make_flaw(self, i, criteria=0, risks=0):
+        flaw = Flaw((i,), f'flaw_{i}')
+        flaw.criteria = criteria
+        flaw.risks = risks
+        return flaw
+
+    def test_highest_criteria_first(self):
+        que = Flawque('reusable')
+        flaws = [self.make_flaw(i, criteria=c) for i, c in enumerate([1, 3, 2, 3])]
+        que.update(flaws)
+        # ties are resolved newest first
+        self.assertEqual([que.pop() for _ in range(len(flaws))], [flaws[3], flaws[1], flaws[2], flaws[0]])
+
+    def test_unsafe_ordered_by_risks(self):
+        que = Flawque('unsafe')
+        flaws = [self.make_flaw(i, risks=r) for i, r in enumerate([1, 2, 1, 2])]
+        que.update(flaws)
+        # ties are resolved oldest first
+        self.assertEqual([que.pop() for _ in range(len(flaws))], [flaws[1], flaws[3], flaws[0], flaws[2]])
+
+    def test_membership_and_removal(self):
+        que = Flawque('reusable')
+        flaws = [self.make_flaw(i, criteria=i) for i in range(5)]
+        que.update(flaws)
+        que.remove(flaws[4])
+        que.remove(flaws[1])
+        que.remove(self.make_flaw(6)) # not in the queue
+        self.assertNotIn(flaws[4], que)
+        self.assertIn(flaws[3], que)
+        self.assertEqual(len(que), 3)
+        self.assertEqual(set(que), {flaws[0], flaws[2], flaws[3]})
+        self.assertEqual(que.peek(), flaws[3])
+        self.assertEqual([que.pop() for _ in range(3)], [flaws[3], flaws[2], flaws[0]])
+
+    def test_reprioritize(self):
+        que = Flawque('ungrounded_geometric_variables')
+        flaws = [self.make_flaw(i, criteria=i) for i in range(3)]
+        que.update(flaws)
+        flaws[0].criteria = 10
+        que.reprioritize(flaws[0])
+        self.assertEqual(len(que), 3)
+        self.assertEqual([que.pop() for _ in range(3)], [flaws[0], flaws[2], flaws[1]])
+
+    def test_copy_is_independent(self):
+        que = Flawque('reusable')
+        flaws = [self.make_flaw(i, criteria=i) for i in range(3)]
+        que.update(flaws)
+        que.remove(flaws[0])
+        que_copy = que.copy({})
+        self.assertEqual(len(que_copy), 2)
+        que_copy.pop()
+        self.assertEqual(len(que), 2)
+        self.assertEqual(que.pop(), flaws[2])
+
+    def test_pickle(self):
+        que = Flawque('reusable')
+        que.update(self.make_flaw(i, criteria=i) for i in range(3))
+        que_copy = pickle.loads(pickle.dumps(que))
+        flaw = que_copy.peek()
+        self.assertIn(flaw, que_copy)
+        que_copy.remove(flaw)
+        self.assertEqual(len(que_copy), 2)
+
+    def test_heap_order(self):
+        n = 1000
+        flaws = [self.make_flaw(i, criteria=(i * 7919) % 101) for i in range(n)]
+        que = Flawque('reusable')
+        que.update(flaws)
+        for flaw in flaws[::3]:
+            que.remove(flaw)
+        for flaw in flaws[1::3]:
+            flaw.criteria = (flaw.criteria * 31) % 101
+            que.reprioritize(flaw)
+        popped = [que.pop() for _ in range(len(que))]
+        self.assertEqual(set(popped), set(flaws) - set(flaws[::3]))
+        keys = [(flaw.criteria, flaw.tiebreaker) for flaw in popped]
+        self.assertEqual(keys, sorted(keys, reverse=True))
+        self.assertEqual(len(que), 0)
+
+    def test_removed_entries_are_compacted(self):
+        que = Flawque('reusable')
+        flaws = [self.make_flaw(i, criteria=i) for i in range(100)]
+        que.update(flaws)
+        for flaw in flaws[:90]:
+            que.remove(flaw)
+        # removed flaws stay in the heap until there are too many of them
+        self.assertLessEqual(len(que._heap), 2 * len(que) + 16)
+        self.assertEqual(len(que), 10)
+        self.assertEqual(que.peek(), flaws[99])
+        self.assertEqual(set(que), set(flaws[90:]))
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,32 @@
+import unittest
+
+from PyPOCL.PyDPOCL import POCLPlanner
+from PyPOCL.worldmodel import load_domain_and_problem
+
+class TestHeuristic(unittest.TestCase):
+    def setUp(self):
+        domain_file = "tests/benchmarks/ark-domain/domain.pddl"
+        problem_file = "tests/benchmarks/ark-domain/problem.pddl"
+        self.domain, self.problem = load_domain_and_problem(domain_file, problem_file, None)
+
+    def test_heuristic_is_independent_of_history(self):
+        planner = POCLPlanner(self.domain, self.problem)
+        root = planner.pop()
+        root.update_flaws()
+        _, successors, _ = planner.expand_isolated(root, root.flaws.next(), 0)
+        values = [planner.h_plan(plan) for plan, _ in successors]
+
+        # evaluate the same plans in reverse order with a fresh planner
+        other_planner = POCLPlanner(self.domain, self.problem)
+        other_values = [other_planner.h_plan(plan) for plan, _ in reversed(successors)]
+        self.assertEqual(values, list(reversed(other_values)))
+        self.assertEqual(planner.h_lit_dict, other_planner.h_lit_dict)
+
+    def test_goal_preconditions_are_cached(self):
+        planner = POCLPlanner(self.domain, self.problem)
+        goal = self.problem.goal
+        for pre in goal.preconds:
+            self.assertIn((goal.stepnum, pre.ID), planner.h_lit_dict)
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,81 @@
+import json
+import os
+import shutil
+import tempfile
+import unittest
+from uuid import UUID
+
+from PyPOCL import deterministic_uuid
+from PyPOCL.deterministic_uuid import IntegerID
+from PyPOCL.PyDPOCL import POCLPlanner
+from PyPOCL.worldmodel import load_domain_and_problem
+from PyPOCL.plan_utility import check_plan, plan_to_json
+
+class TestIntegerIDs(unittest.TestCase):
+    def setUp(self):
+        self.state = deterministic_uuid.getstate()
+        deterministic_uuid.use_integer_ids()
+        self.tmp_dir = tempfile.mkdtemp()
+
+    def tearDown(self):
+        deterministic_uuid.setstate(self.state)
+        shutil.rmtree(self.tmp_dir)
+
+    def test_counter(self):
+        first = deterministic_uuid.duuid4()
+        second = deterministic_uuid.duuid4()
+        self.assertIsInstance(first, IntegerID)
+        self.assertEqual(second, first + 1)
+        self.assertEqual(str(first), str(UUID(int=first)))
+
+        # reseeding without a task keeps the counter, tasks count in their own blocks
+        deterministic_uuid.seed(0)
+        self.assertEqual(deterministic_uuid.duuid4(), second + 1)
+        deterministic_uuid.seed(0, task=2)
+        a = deterministic_uuid.duuid4()
+        self.assertEqual(a, deterministic_uuid.TASK_IDS_START + 2 * deterministic_uuid.TASK_BLOCK_SIZE)
+        self.assertEqual(deterministic_uuid.duuid4(), a + 1)
+        deterministic_uuid.seed(0, task=3)
+        self.assertEqual(deterministic_uuid.duuid4(), a + deterministic_uuid.TASK_BLOCK_SIZE)
+
+    def test_solve(self):
+        benchmark_dir = "tests/benchmarks/manipulation-domain"
+        domain, problem = load_domain_and_problem(os.path.join(benchmark_dir, "domain.pddl"),
+                                                  os.path.join(benchmark_dir, "problem.pddl"),
+                                                  os.path.join(benchmark_dir, "worldmodel.json"), use_cache=False)
+        self.assertTrue(all(isinstance(op.ID, IntegerID) for op in domain.operators))
+
+        planner = POCLPlanner(domain, problem)
+        plans, _ = planner.solve(k=1, cutoff=60)
+        self.assertEqual(len(plans), 1)
+        self.assertTrue(check_plan(plans[0]))
+        self.assertTrue(all(isinstance(step.ID, IntegerID) for step in plans[0].steps))
+
+        # the IDs of parallel expansions are dense per task
+        deterministic_uuid.seed(0)
+        domain, problem = load_domain_and_problem(os.path.join(benchmark_dir, "domain.pddl"),
+                                                  os.path.join(benchmark_dir, "problem.pddl"),
+                                                  os.path.join(benchmark_dir, "worldmodel.json"), use_cache=False)
+        planner = POCLPlanner(domain, problem, observers=[])
+        parallel_plans, _ = planner.solve(k=1, cutoff=60, workers=2)
+        self.assertTrue(check_plan(parallel_plans[0]))
+        max_id = deterministic_uuid.TASK_IDS_START + planner._tasks * deterministic_uuid.TASK_BLOCK_SIZE
+        self.assertTrue(all(step.ID < max_id for step in parallel_plans[0].steps))
+
+        # an isolated expansion in this process does not reuse the IDs of the problem
+        planner = POCLPlanner(domain, problem, observers=[])
+        root = planner[0]
+        branched, successors, _ = planner.expand_isolated(root, root.flaws.next(), 0)
+        self.assertTrue(branched)
+        self.assertGreater(len(successors), 0)
+
+        # saved plans contain uuids
+        plan_file = os.path.join(self.tmp_dir, "plan.json")
+        plan_to_json(plans[0], plan_file)
+        with open(plan_file) as f:
+            plan_dict = json.load(f)
+        for step in plan_dict["steps"]:
+            UUID(step["ID"])
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,40 @@
+import unittest
+
+from PyPOCL.PyDPOCL import POCLPlanner, PendingRefinement
+from PyPOCL.worldmodel import load_domain_and_problem
+from PyPOCL.plan_utility import check_plan
+
+class TestLazySuccessors(unittest.TestCase):
+    def setUp(self):
+        domain_name = "manipulation-domain"
+        self.domain, self.problem = load_domain_and_problem(f"tests/benchmarks/{domain_name}/domain.pddl",
+                                                            f"tests/benchmarks/{domain_name}/problem.pddl",
+                                                            f"tests/benchmarks/{domain_name}/worldmodel.json")
+
+    def test_lazy_solve(self):
+        planner = POCLPlanner(self.domain, self.problem)
+        plans, _ = planner.solve(k=3, cutoff=30)
+        lazy_planner = POCLPlanner(self.domain, self.problem, lazy_successors=True)
+        lazy_plans, _ = lazy_planner.solve(k=3, cutoff=30)
+
+        self.assertEqual(len(lazy_plans), 3)
+        for plan in lazy_plans:
+            self.assertTrue(check_plan(plan), "Plan is not valid")
+        self.assertEqual(sorted(plan.cost for plan in lazy_plans), sorted(plan.cost for plan in plans))
+        # only some of the pending refinements are turned into plans
+        self.assertGreater(lazy_planner.materialized, 0)
+        self.assertLess(lazy_planner.materialized, lazy_planner._pending)
+
+    def test_plans_before_pending(self):
+        planner = POCLPlanner(self.domain, self.problem)
+        root = planner.pop()
+        pending = PendingRefinement(root, 'reuse', (), root.cost, root.heuristic, '0', 0)
+        self.assertTrue(root < pending)
+        self.assertFalse(pending < root)
+        cheaper = PendingRefinement(root, 'reuse', (), root.cost - 1, root.heuristic, '1', 1)
+        self.assertTrue(cheaper < root)
+        self.assertFalse(root < cheaper)
+        self.assertTrue(pending < PendingRefinement(root, 'reuse', (), root.cost, root.heuristic, '2', 2))
+
+if __name__ == '__main__':
+    unittest.main()
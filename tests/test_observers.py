@@ -0,0 +1,130 @@
+import contextlib
+import io
+import json
+import os
+import shutil
+import tempfile
+import unittest
+from collections import Counter
+from unittest import mock
+
+from PyPOCL.observers import SearchObserver, JsonTrace, PlanGraph
+from PyPOCL.PyDPOCL import POCLPlanner
+from PyPOCL.worldmodel import load_domain_and_problem
+
+class EventCounter(SearchObserver):
+    """counts the events of a search"""
+    def __init__(self):
+        self.events = Counter()
+
+def _counting(event):
+    def method(self, planner, *args):
+        self.events[event] += 1
+    return method
+
+for _event in ['search_started', 'progress', 'node_popped', 'node_pruned', 'flaw_selected', 'child_inserted',
+               'solution_found', 'timeout', 'search_finished', 'search_aborted']:
+    setattr(EventCounter, _event, _counting(_event))
+
+class Failure(Exception):
+    pass
+
+class FailingObserver(SearchObserver):
+    """makes the search fail at the first flaw"""
+    def flaw_selected(self, planner, plan, flaw):
+        raise Failure()
+
+class TestObservers(unittest.TestCase):
+    def setUp(self):
+        benchmark_dir = "tests/benchmarks/manipulation-domain"
+        self.domain, self.problem = load_domain_and_problem(os.path.join(benchmark_dir, "domain.pddl"),
+                                                            os.path.join(benchmark_dir, "problem.pddl"),
+                                                            os.path.join(benchmark_dir, "worldmodel.json"))
+        self.tmp_dir = tempfile.mkdtemp()
+
+    def tearDown(self):
+        shutil.rmtree(self.tmp_dir)
+
+    def test_events(self):
+        counter = EventCounter()
+        output = io.StringIO()
+        with contextlib.redirect_stdout(output):
+            planner = POCLPlanner(self.domain, self.problem, observers=[counter])
+            plans, report = planner.solve(k=1, cutoff=60)
+        self.assertEqual(output.getvalue(), "")
+        self.assertEqual(len(plans), 1)
+        events = counter.events
+        self.assertEqual(events['search_started'], 1)
+        self.assertEqual(events['node_popped'], report.expanded)
+        self.assertGreater(events['flaw_selected'], 0)
+        self.assertLessEqual(events['flaw_selected'] + events['solution_found'], events['node_popped'])
+        self.assertEqual(events['node_pruned'], report.terminated)
+        self.assertEqual(events['solution_found'], 1)
+        self.assertEqual(events['timeout'], 0)
+        self.assertEqual(events['search_finished'], 1)
+        self.assertEqual(events['search_aborted'], 0)
+        # including the root plan, which is inserted when the planner is constructed
+        self.assertEqual(events['child_inserted'], planner.opened)
+
+    def test_default_console(self):
+        output = io.StringIO()
+        with contextlib.redirect_stdout(output):
+            POCLPlanner(self.domain, self.problem).solve(k=1, cutoff=60)
+        self.assertTrue(output.getvalue().startswith('k=1\n'))
+        self.assertIn('solution 1 found', output.getvalue())
+
+    def test_json_trace(self):
+        trace_file = os.path.join(self.tmp_dir, "trace.jsonl")
+        with contextlib.redirect_stdout(io.StringIO()):
+            _, report = POCLPlanner(self.domain, self.problem, observers=[JsonTrace(trace_file)]).solve(k=1, cutoff=60)
+        with open(trace_file) as f:
+            records = [json.loads(line) for line in f]
+        self.assertEqual(records[0]['event'], 'search_started')
+        self.assertEqual(records[-1]['event'], 'search_finished')
+        self.assertEqual(records[-1]['expanded'], report.expanded)
+        popped = [record for record in records if record['event'] == 'node_popped']
+        self.assertEqual(len(popped), report.expanded)
+        solution = next(record for record in records if record['event'] == 'solution_found')
+        self.assertIn(solution['plan'], {record['plan'] for record in records if record['event'] == 'child_inserted'})
+
+    def test_plangraph(self):
+        name = os.path.join(self.tmp_dir, "plangraph")
+        with contextlib.redirect_stdout(io.StringIO()), mock.patch('graphviz.Digraph.render') as render:
+            planner = POCLPlanner(self.domain, self.problem, plangraph_name=name)
+            _, report = planner.solve(k=1, cutoff=60)
+        render.assert_called_once_with(filename=f"{name}.dot", outfile=f"{name}.svg")
+        source = planner.observers[-1].dot.source
+        self.assertIn('goal_1', source)
+        self.assertIn(f'visited_{report.expanded}', source)
+
+    def test_aborted(self):
+        # the generator of solve_iter is closed after the first solution
+        counter = EventCounter()
+        trace_file = os.path.join(self.tmp_dir, "trace.jsonl")
+        trace = JsonTrace(trace_file)
+        name = os.path.join(self.tmp_dir, "plangraph")
+        with contextlib.redirect_stdout(io.StringIO()), mock.patch('graphviz.Digraph.render') as render:
+            planner = POCLPlanner(self.domain, self.problem, observers=[counter, trace], plangraph_name=name)
+            solutions = planner.solve_iter(k=2, cutoff=60)
+            next(solutions)
+            solutions.close()
+        render.assert_called_once_with(filename=f"{name}.dot", outfile=f"{name}.svg")
+        self.assertEqual(counter.events['search_aborted'], 1)
+        self.assertEqual(counter.events['search_finished'], 0)
+        self.assertIsNone(trace._file)
+        with open(trace_file) as f:
+            records = [json.loads(line) for line in f]
+        self.assertEqual(records[-1]['event'], 'search_aborted')
+        self.assertIsNone(records[-1]['error'])
+
+        # the search raises
+        with contextlib.redirect_stdout(io.StringIO()), self.assertRaises(Failure):
+            POCLPlanner(self.domain, self.problem, observers=[trace, FailingObserver()]).solve(k=1, cutoff=60)
+        self.assertIsNone(trace._file)
+        with open(trace_file) as f:
+            records = [json.loads(line) for line in f]
+        self.assertEqual(records[-1]['event'], 'search_aborted')
+        self.assertEqual(records[-1]['error'], 'Failure()')
+
+if __name__ == '__main__':
+    unittest.main()
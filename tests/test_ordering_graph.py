@@ -0,0 +1,57 @@
+import unittest
+
+from PyPOCL.Ground_Compiler_Library.Element import Element
+from PyPOCL.Ground_Compiler_Library.Graph import Edge
+from PyPOCL.Ground_Compiler_Library.OrderingGraph import OrderingGraph
+
+class TestOrderingGraph(unittest.TestCase):
+    def setUp(self):
+        self.elms = [Element(ID=i, name=str(i)) for i in range(5)]
+
+    def test_transitive_path(self):
+        a, b, c, d, e = self.elms
+        og = OrderingGraph()
+        og.addEdge(a, b)
+        og.addEdge(c, d)
+        self.assertFalse(og.isPath(a, d))
+        # connecting the two chains orders everything before b before everything after c
+        og.addEdge(b, c)
+        self.assertTrue(og.isPath(a, d))
+        self.assertTrue(og.isPath(b, d))
+        self.assertFalse(og.isPath(d, a))
+        # elements are always ordered with respect to themselves
+        self.assertTrue(og.isPath(e, e))
+        self.assertFalse(og.isPath(a, e))
+        self.assertFalse(og.detectCycle())
+
+    def test_cycle_detection(self):
+        a, b, c, _, _ = self.elms
+        og = OrderingGraph()
+        og.addEdge(a, b)
+        og.addEdge(b, c)
+        self.assertTrue(og.isInternallyConsistent())
+        og.addEdge(c, a)
+        self.assertTrue(og.detectCycle())
+        self.assertFalse(og.isInternallyConsistent())
+
+    def test_copy_is_independent(self):
+        a, b, c, _, _ = self.elms
+        og = OrderingGraph()
+        og.addEdge(a, b)
+        og_copy = og.copy()
+        og_copy.addEdge(b, c)
+        og_copy.addEdge(c, a)
+        self.assertTrue(og_copy.isPath(a, c))
+        self.assertTrue(og_copy.detectCycle())
+        self.assertFalse(og.isPath(a, c))
+        self.assertFalse(og.detectCycle())
+
+    def test_edges_added_directly(self):
+        a, b, c, _, _ = self.elms
+        og = OrderingGraph(Elements={a, b, c}, Edges={Edge(a, b, '<')})
+        self.assertTrue(og.isPath(a, b))
+        og.edges.add(Edge(b, c, '<'))
+        self.assertTrue(og.isPath(a, c))
+
+if __name__ == '__main__':
+    unittest.main()
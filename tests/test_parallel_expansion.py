@@ -0,0 +1,36 @@
+import unittest
+
+from PyPOCL.PyDPOCL import POCLPlanner
+from PyPOCL.worldmodel import load_domain_and_problem
+from PyPOCL.plan_utility import check_plan
+from PyPOCL import deterministic_uuid
+
+class TestParallelExpansion(unittest.TestCase):
+    def setUp(self):
+        domain_name = "manipulation-domain"
+        self.domain_file = f"tests/benchmarks/{domain_name}/domain.pddl"
+        self.problem_file = f"tests/benchmarks/{domain_name}/problem.pddl"
+        self.worldmodel_file = f"tests/benchmarks/{domain_name}/worldmodel.json"
+
+    def solve(self, workers, seed):
+        # the IDs of the domain and root plan depend on what was generated before
+        deterministic_uuid.seed(0)
+        domain, problem = load_domain_and_problem(self.domain_file, self.problem_file, self.worldmodel_file)
+        planner = POCLPlanner(domain, problem)
+        return planner.solve(k=1, cutoff=30, workers=workers, seed=seed)
+
+    def test_parallel_solve(self):
+        plans, _ = self.solve(workers=2, seed=0)
+        self.assertGreater(len(plans), 0, "No plans found")
+        for plan in plans:
+            self.assertTrue(check_plan(plan), "Plan is not valid")
+
+    def test_same_seed_same_search(self):
+        plans_a, report_a = self.solve(workers=2, seed=3)
+        plans_b, report_b = self.solve(workers=2, seed=3)
+        self.assertEqual(report_a.expanded, report_b.expanded)
+        self.assertEqual(report_a.visited, report_b.visited)
+        self.assertEqual(plans_a[0].name, plans_b[0].name)
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,42 @@
+import unittest
+
+from shapely import Point, Polygon, LineString, box, difference
+from PyPOCL.Ground_Compiler_Library import pathPlanner
+from PyPOCL.Ground_Compiler_Library.pathPlanner import create_visibility_graph, get_visibility_graph, find_path
+
+class TestPathPlanner(unittest.TestCase):
+    def setUp(self):
+        pathPlanner.clear_visibility_graph_cache()
+        # square with a wall in the middle, which must be passed on the top
+        self.free_space = difference(box(0, 0, 1, 1), box(0.45, 0, 0.55, 0.8))
+
+    def test_visibility_graph(self):
+        visibility_graph, points = create_visibility_graph(self.free_space)
+        # compare with testing every pair of vertices separately
+        for i, p1 in enumerate(points):
+            for j, p2 in enumerate(points):
+                if i == j:
+                    continue
+                visible = self.free_space.covers(LineString([p1, p2]))
+                self.assertEqual(j in visibility_graph[i], visible, f"visibility between {p1} and {p2}")
+
+    def test_cache(self):
+        graph = get_visibility_graph(self.free_space)
+        same_space = difference(box(0, 0, 1, 1), box(0.45, 0, 0.55, 0.8))
+        self.assertIs(get_visibility_graph(same_space), graph)
+        other_space = difference(box(0, 0, 1, 1), box(0.45, 0, 0.55, 0.7))
+        self.assertIsNot(get_visibility_graph(other_space), graph)
+
+    def test_find_path(self):
+        visibility_graph, points = get_visibility_graph(self.free_space)
+        n_points = len(points)
+        path = find_path(Point(0.2, 0.2), Point(0.8, 0.2), self.free_space)
+        self.assertIsNotNone(path)
+        self.assertTrue(self.free_space.covers(path))
+        self.assertGreaterEqual(max(y for _, y in path.coords), 0.8)
+        # start and goal are not added to the cached graph
+        self.assertEqual(len(points), n_points)
+        self.assertTrue(all(j < n_points for neighbors in visibility_graph.values() for j in neighbors))
+
+if __name__ == '__main__':
+    unittest.main()
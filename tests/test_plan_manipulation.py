@@ -36,5 +36,41 @@ class TestPlanManipulation(unittest.TestCase):
         for a in action.Args:
             self.assertIn(a, new_plan.variableBindings)
 
+    def test_instantiate_shares_tables(self):
+        op = [o for o in self.operators if o.schema=='movemono'][0]
+        action1 = op.instantiate()
+        action2 = op.instantiate()
+
+        # the candidate and threat tables are shared with the operator
+        self.assertIs(action1.tables, op.tables)
+        self.assertIs(action2.cndt_map, op.cndt_map)
+
+        # the arguments and the conditions refering to them are not
+        self.assertNotEqual(action1.ID, action2.ID)
+        for a1, a2, a in zip(action1.Args, action2.Args, op.Args):
+            self.assertNotEqual(a1.ID, a2.ID)
+            self.assertNotEqual(a1.ID, a.ID)
+        for pre in action1.preconds:
+            for arg in pre.Args:
+                self.assertIn(arg, action1.Args)
+        self.assertIs(action1.open_preconds[0], action1.preconds[0])
+
+    def test_sibling(self):
+        # the dummy steps of a decomposition refer to each other as siblings, other steps have no sibling
+        op = [o for o in self.operators if o.schema=='movemono'][0]
+        d_i = op.instantiate()
+        d_f = op.instantiate()
+        self.assertFalse(hasattr(d_i, 'sibling'))
+        d_i.sibling = d_f
+        d_f.sibling = d_i
+        self.assertIs(d_i.copy().sibling, d_f)
+        self.assertIs(d_f.instantiate().sibling, d_i)
+
+    def test_insert_decomp(self):
+        op = [o for o in self.operators if o.schema=='movemono'][0]
+        new_plan = self.root_plan.instantiate('1[a]')
+        with self.assertRaises(DeprecationWarning):
+            new_plan.insert_decomp(op.instantiate())
+
 if __name__ == '__main__':
     unittest.main()
\ No newline at end of file
@@ -0,0 +1,68 @@
+import unittest
+
+from PyPOCL.PyDPOCL import POCLPlanner
+from PyPOCL.worldmodel import load_domain_and_problem
+
+class TestPlanSignature(unittest.TestCase):
+    def setUp(self):
+        domain_file = "tests/benchmarks/ark-domain/domain.pddl"
+        problem_file = "tests/benchmarks/ark-domain/problem.pddl"
+        domain, self.problem = load_domain_and_problem(domain_file, problem_file, None)
+        self.planner = POCLPlanner(domain, self.problem)
+        self.root = self.planner.pop()
+        self.root.update_flaws()
+
+    def resolve(self, plan, precondition):
+        """resolve the open precondition in all possible ways"""
+        flaw = next(f for f in plan.flaws.flaws if f.p.ID == precondition.ID)
+        for flaw_set in plan.flaws.typs:
+            if flaw in flaw_set:
+                flaw_set.remove(flaw)
+        _, successors, _ = self.planner.expand_isolated(plan, flaw, 0)
+        return [successor for successor, _ in successors]
+
+    def test_copy_has_same_signature(self):
+        self.assertEqual(self.root.signature(), self.root.instantiate('').signature())
+
+    def test_resolution_order_gives_same_signatures(self):
+        goal_a, goal_b = self.root.goal[:2]
+        a_then_b = set()
+        for plan in self.resolve(self.root.instantiate(''), goal_a):
+            a_then_b.update(p.signature() for p in self.resolve(plan, goal_b))
+        b_then_a = set()
+        for plan in self.resolve(self.root.instantiate(''), goal_b):
+            b_then_a.update(p.signature() for p in self.resolve(plan, goal_a))
+        # the same plans are found independent of the order in which the goals are resolved
+        self.assertGreater(len(a_then_b & b_then_a), 0)
+        # adding a step changes the plan
+        self.assertNotIn(self.root.signature(), a_then_b)
+
+    def test_constraint_targets_change_signature(self):
+        # a plan with a variable which can be bound to several objects
+        def candidates(plan):
+            sym_vb = plan.variableBindings.symbolic_vb
+            for step in plan.steps:
+                for arg in step.Args:
+                    if arg in sym_vb.group_mapping and sym_vb.const[sym_vb.group_mapping[arg]] is None:
+                        objects = [obj for obj in self.problem.objects if obj.typ == arg.typ]
+                        if len(objects) >= 2:
+                            yield plan, arg, objects
+        plan, var, characters = next(candidate for plan in self.resolve(self.root.instantiate(''), self.root.goal[1])
+                                     for candidate in candidates(plan))
+
+        # the same plan with the variable constrained to differ from another object
+        plans = []
+        for obj in characters[:2]:
+            new_plan = plan.instantiate('')
+            self.assertTrue(new_plan.variableBindings.symbolic_vb.add_non_codesignation(var, obj))
+            plans.append(new_plan)
+        self.assertNotEqual(plans[0].signature(), plans[1].signature())
+        self.assertNotEqual(plans[0].signature(), plan.signature())
+
+        # the constraint is part of the signature, not the order in which it was added
+        other = plan.instantiate('')
+        other.variableBindings.symbolic_vb.add_non_codesignation(characters[0], var)
+        self.assertEqual(other.signature(), plans[0].signature())
+
+if __name__ == '__main__':
+    unittest.main()
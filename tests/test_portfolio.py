@@ -0,0 +1,25 @@
+import unittest
+
+from PyPOCL.portfolio import PortfolioConfig, solve_portfolio
+from PyPOCL.worldmodel import load_domain_and_problem
+from PyPOCL.plan_utility import check_plan
+
+class TestPortfolio(unittest.TestCase):
+    def test_manipulation_domain(self):
+        domain_name = "manipulation-domain"
+        domain_file = f"tests/benchmarks/{domain_name}/domain.pddl"
+        problem_file = f"tests/benchmarks/{domain_name}/problem.pddl"
+        worldmodel_file = f"tests/benchmarks/{domain_name}/worldmodel.json"
+        domain, problem = load_domain_and_problem(domain_file, problem_file, worldmodel_file)
+
+        configs = [PortfolioConfig("symbolic-first", flaw_order=0, h_weight=1),
+                   PortfolioConfig("classic", flaw_order=1, h_weight=2)]
+        plans, report = solve_portfolio(domain, problem, configs, k=1, cutoff=30)
+        self.assertGreater(len(plans), 0, "No plans found")
+        self.assertIn(report.winner, configs)
+        self.assertEqual(report.planning_report.plans_found, len(plans))
+        for plan in plans:
+            self.assertTrue(check_plan(plan), "Plan is not valid")
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,102 @@
+import os
+import shutil
+import tempfile
+import unittest
+from unittest import mock
+
+from PyPOCL import deterministic_uuid, worldmodel
+from PyPOCL.worldmodel import load_domain_and_problem, compile_domain_and_problem, problem_cache_key
+
+class TestProblemCache(unittest.TestCase):
+    def setUp(self):
+        self.tmp_dir = tempfile.mkdtemp()
+        self.uuid_state = deterministic_uuid.getstate()
+        self.cache_dir = worldmodel.CACHE_DIR
+        worldmodel.CACHE_DIR = os.path.join(self.tmp_dir, 'cache')
+        benchmark_dir = "tests/benchmarks/manipulation-domain"
+        self.domain_file = os.path.join(benchmark_dir, "domain.pddl")
+        self.problem_file = os.path.join(benchmark_dir, "problem.pddl")
+        self.worldmodel_file = os.path.join(benchmark_dir, "worldmodel.json")
+
+    def tearDown(self):
+        deterministic_uuid.setstate(self.uuid_state)
+        worldmodel.CACHE_DIR = self.cache_dir
+        shutil.rmtree(self.tmp_dir)
+
+    def test_cached_problem_is_equal(self):
+        deterministic_uuid.seed(0)
+        domain, problem = load_domain_and_problem(self.domain_file, self.problem_file, self.worldmodel_file)
+        uuid_state = deterministic_uuid.getstate()
+        self.assertEqual(len(os.listdir(worldmodel.CACHE_DIR)), 1)
+
+        deterministic_uuid.seed(0)
+        cached_domain, cached_problem = load_domain_and_problem(self.domain_file, self.problem_file, self.worldmodel_file)
+        self.assertEqual(len(os.listdir(worldmodel.CACHE_DIR)), 1)
+        # IDs continue after the compiled problem
+        self.assertEqual(deterministic_uuid.getstate(), uuid_state)
+        self.assertEqual([op.ID for op in cached_domain.operators], [op.ID for op in domain.operators])
+        self.assertEqual([str(pre) for pre in cached_problem.goal.preconds], [str(pre) for pre in problem.goal.preconds])
+        self.assertEqual({str(k): v.wkt for k, v in cached_problem.areas.items()}, {str(k): v.wkt for k, v in problem.areas.items()})
+        self.assertEqual(cached_domain.operators[0].cndt_map, domain.operators[0].cndt_map)
+
+    def test_ids_follow_generator(self):
+        # the problem is compiled once, later loads get the IDs a compile would create in the current state
+        for i in range(3):
+            load_domain_and_problem(self.domain_file, self.problem_file, self.worldmodel_file)
+        self.assertEqual(len(os.listdir(worldmodel.CACHE_DIR)), 1)
+
+        for integer_ids in [False, True]:
+            with self.subTest(integer_ids=integer_ids):
+                deterministic_uuid.use_integer_ids(integer_ids)
+                deterministic_uuid.duuid4()
+                state = deterministic_uuid.getstate()
+                domain, problem = compile_domain_and_problem(self.domain_file, self.problem_file, self.worldmodel_file)
+                compiled_state = deterministic_uuid.getstate()
+                deterministic_uuid.setstate(state)
+                cached_domain, cached_problem = load_domain_and_problem(self.domain_file, self.problem_file, self.worldmodel_file)
+                self.assertEqual(deterministic_uuid.getstate(), compiled_state)
+                self.assert_same_ids(cached_domain, cached_problem, domain, problem)
+
+    def assert_same_ids(self, cached_domain, cached_problem, domain, problem):
+        def literals(literals):
+            return [(lit.ID, str(lit), [arg.ID for arg in lit.Args]) for lit in literals]
+        steps = cached_domain.operators + [cached_problem.init, cached_problem.goal]
+        compiled_steps = domain.operators + [problem.init, problem.goal]
+        self.assertEqual([step.ID for step in steps], [step.ID for step in compiled_steps])
+        for step, compiled_step in zip(steps, compiled_steps):
+            self.assertEqual([arg.ID for arg in step.Args], [arg.ID for arg in compiled_step.Args])
+            self.assertEqual(literals(step.preconds), literals(compiled_step.preconds))
+            self.assertEqual(literals(step.effects), literals(compiled_step.effects))
+            self.assertEqual(step.cndt_map, compiled_step.cndt_map)
+            self.assertEqual(step.threat_map, compiled_step.threat_map)
+        self.assertEqual({obj.ID for obj in cached_problem.objects}, {obj.ID for obj in problem.objects})
+        self.assertEqual({k.ID: v.wkt for k, v in cached_problem.areas.items()}, {k.ID: v.wkt for k, v in problem.areas.items()})
+        self.assertEqual({k.ID: v.ID for k, v in cached_problem.initial_positions.items()}, {k.ID: v.ID for k, v in problem.initial_positions.items()})
+
+    def test_cache_size(self):
+        with mock.patch.object(worldmodel, 'CACHE_SIZE', 1):
+            load_domain_and_problem(self.domain_file, self.problem_file, self.worldmodel_file)
+            load_domain_and_problem(self.domain_file, self.problem_file, None)
+        self.assertEqual(os.listdir(worldmodel.CACHE_DIR), [problem_cache_key(self.domain_file, self.problem_file, None) + '.pickle'])
+
+    def test_bypass_cache(self):
+        load_domain_and_problem(self.domain_file, self.problem_file, self.worldmodel_file, use_cache=False)
+        self.assertFalse(os.path.exists(worldmodel.CACHE_DIR))
+
+    def test_key_depends_on_content(self):
+        key = problem_cache_key(self.domain_file, self.problem_file, self.worldmodel_file)
+        self.assertEqual(key, problem_cache_key(self.domain_file, self.problem_file, self.worldmodel_file))
+        self.assertNotEqual(key, problem_cache_key(self.domain_file, self.problem_file, None))
+
+        # a changed worldmodel with the same name gets a different key
+        changed_dir = os.path.join(self.tmp_dir, 'changed')
+        os.makedirs(changed_dir)
+        changed_worldmodel = os.path.join(changed_dir, os.path.basename(self.worldmodel_file))
+        with open(self.worldmodel_file) as f:
+            content = f.read()
+        with open(changed_worldmodel, 'w') as f:
+            f.write(content + '\n')
+        self.assertNotEqual(key, problem_cache_key(self.domain_file, self.problem_file, changed_worldmodel))
+
+if __name__ == '__main__':
+    unittest.main()
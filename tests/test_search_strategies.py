@@ -0,0 +1,78 @@
+import os
+import shutil
+import tempfile
+import unittest
+
+from PyPOCL.PyDPOCL import POCLPlanner
+from PyPOCL.worldmodel import load_domain_and_problem
+from PyPOCL.plan_utility import check_plan
+from PyPOCL.search_strategies import BeamFrontier, DepthFirstBnBFrontier, make_frontier
+
+class TestSearchStrategies(unittest.TestCase):
+    def setUp(self):
+        benchmark_dir = "tests/benchmarks/manipulation-domain"
+        self.domain, self.problem = load_domain_and_problem(os.path.join(benchmark_dir, "domain.pddl"),
+                                                            os.path.join(benchmark_dir, "problem.pddl"),
+                                                            os.path.join(benchmark_dir, "worldmodel.json"))
+
+    def solve(self, **kwargs):
+        planner = POCLPlanner(self.domain, self.problem)
+        plans, report = planner.solve(k=1, cutoff=60, **kwargs)
+        self.assertEqual(len(plans), 1)
+        self.assertTrue(check_plan(plans[0]))
+        return planner, plans[0], report
+
+    def test_astar(self):
+        planner, plan, _ = self.solve(strategy='astar')
+        self.assertEqual(planner.strategy, 'astar')
+
+    def test_greedy(self):
+        self.solve(strategy='greedy')
+
+    def test_beam(self):
+        planner, _, _ = self.solve(strategy='beam', beam_width=4)
+        self.assertIsInstance(planner._frontier, BeamFrontier)
+        self.assertEqual(planner._frontier.width, 4)
+
+    def test_dfbnb(self):
+        _, astar_plan, _ = self.solve(strategy='astar')
+        planner, plan, report = self.solve(strategy='dfbnb')
+        self.assertIsInstance(planner._frontier, DepthFirstBnBFrontier)
+        # the search only stops when the frontier is empty, the best solution is kept
+        self.assertEqual(len(planner), 0)
+        self.assertLessEqual(plan.cost, astar_plan.cost)
+        self.assertEqual(report.plans_found, len(planner.completed))
+
+    def test_memory_budget(self):
+        benchmark_dir = "tests/benchmarks/manipulation-domain-many-objects"
+        domain, problem = load_domain_and_problem(os.path.join(benchmark_dir, "domain.pddl"),
+                                                  os.path.join(benchmark_dir, "problem.pddl"),
+                                                  os.path.join(benchmark_dir, "worldmodel.json"))
+        planner = POCLPlanner(domain, problem)
+        plans, report = planner.solve(k=3, cutoff=60)
+
+        spill_dir = tempfile.mkdtemp()
+        self.addCleanup(shutil.rmtree, spill_dir)
+        bounded_planner = POCLPlanner(domain, problem)
+        bounded_plans, bounded_report = bounded_planner.solve(k=3, cutoff=60, max_resident=4, spill_dir=spill_dir)
+        frontier = bounded_planner._frontier
+        self.assertGreater(frontier.spills, 0)
+        self.assertLessEqual(frontier.resident - len(frontier._runs), 4)
+        self.assertEqual(len(frontier), len(planner))
+        self.assertEqual(len(list(frontier)), len(planner))
+        # plans are expanded in the same order as without a budget
+        self.assertEqual(bounded_report.expanded, report.expanded)
+        self.assertEqual([plan.cost for plan in bounded_plans], [plan.cost for plan in plans])
+        for plan in bounded_plans:
+            self.assertTrue(check_plan(plan))
+
+    def test_unknown_strategy(self):
+        with self.assertRaises(ValueError):
+            make_frontier('random')
+        with self.assertRaises(ValueError):
+            make_frontier('beam', beam_width=0)
+        with self.assertRaises(ValueError):
+            make_frontier('dfbnb', max_resident=10)
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,47 @@
+import unittest
+
+from PyPOCL.PyDPOCL import POCLPlanner
+from PyPOCL.worldmodel import load_domain_and_problem
+from PyPOCL.plan_utility import check_plan
+from PyPOCL import deterministic_uuid
+
+class TestSolveIter(unittest.TestCase):
+    def setUp(self):
+        domain_name = "manipulation-domain"
+        self.domain_file = f"tests/benchmarks/{domain_name}/domain.pddl"
+        self.problem_file = f"tests/benchmarks/{domain_name}/problem.pddl"
+        self.worldmodel_file = f"tests/benchmarks/{domain_name}/worldmodel.json"
+
+    def make_planner(self):
+        deterministic_uuid.seed(0)
+        domain, problem = load_domain_and_problem(self.domain_file, self.problem_file, self.worldmodel_file)
+        return POCLPlanner(domain, problem)
+
+    def test_yield_solutions(self):
+        plans, report = self.make_planner().solve(k=3, cutoff=60)
+
+        steps = self.make_planner().solve_iter(k=3, cutoff=60)
+        streamed = []
+        while True:
+            try:
+                plan, planning_report = next(steps)
+            except StopIteration as stop:
+                final_plans, final_report = stop.value
+                break
+            self.assertTrue(check_plan(plan), "Plan is not valid")
+            streamed.append(plan)
+            self.assertEqual(planning_report.plans_found, len(streamed))
+        self.assertEqual([plan.name for plan in streamed], [plan.name for plan in plans])
+        self.assertEqual(final_plans, streamed)
+        self.assertEqual(final_report.expanded, report.expanded)
+
+    def test_stop_early(self):
+        planner = self.make_planner()
+        for plan, planning_report in planner.solve_iter(k=10, cutoff=60):
+            break
+        self.assertTrue(check_plan(plan), "Plan is not valid")
+        self.assertEqual(planning_report.plans_found, 1)
+        self.assertEqual(len(planner.completed), 1)
+
+if __name__ == '__main__':
+    unittest.main()
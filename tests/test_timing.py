@@ -0,0 +1,61 @@
+import json
+import os
+import shutil
+import tempfile
+import unittest
+
+from PyPOCL.clockdeco import clock, collect_timings, count, active_timings
+from PyPOCL.PyDPOCL import POCLPlanner
+from PyPOCL.worldmodel import load_domain_and_problem
+
+@clock
+def inner():
+    count('calls')
+
+@clock
+def outer():
+    inner()
+    inner()
+
+class TestTimings(unittest.TestCase):
+    def test_nested_timers(self):
+        outer() # not timed
+        with collect_timings() as timings:
+            outer()
+            inner()
+        self.assertIsNone(active_timings())
+        self.assertEqual(timings.find('outer').calls, 1)
+        self.assertEqual(timings.find('outer', 'inner').calls, 2)
+        self.assertEqual(timings.find('outer', 'inner').counters, {'calls': 2})
+        self.assertEqual(timings.find('inner').calls, 1)
+        self.assertIsNone(timings.find('inner', 'outer'))
+        self.assertGreaterEqual(timings.root.time, timings.find('outer').time)
+        self.assertGreaterEqual(timings.find('outer').time, timings.find('outer', 'inner').time)
+
+    def test_solve(self):
+        benchmark_dir = "tests/benchmarks/manipulation-domain"
+        domain, problem = load_domain_and_problem(os.path.join(benchmark_dir, "domain.pddl"),
+                                                  os.path.join(benchmark_dir, "problem.pddl"),
+                                                  os.path.join(benchmark_dir, "worldmodel.json"))
+        _, report = POCLPlanner(domain, problem).solve(k=1, cutoff=60)
+        self.assertIsNone(report.timings)
+
+        tmp_dir = tempfile.mkdtemp()
+        try:
+            timing_file = os.path.join(tmp_dir, "timings.json")
+            _, report = POCLPlanner(domain, problem).solve(k=1, cutoff=60, timing_file=timing_file)
+            with open(timing_file) as f:
+                saved = json.load(f)
+        finally:
+            shutil.rmtree(tmp_dir)
+        timings = report.timings
+        self.assertEqual(timings.find('select_flaw').calls, report.expanded)
+        opf = timings.find('OPF')
+        self.assertIsNotNone(opf)
+        self.assertGreater(timings.find('OPF', 'add_step').counters['plans'], 0)
+        self.assertIsNotNone(timings.find('OPF', 'add_step', 'instantiate'))
+        self.assertEqual(saved['name'], 'search')
+        self.assertIn('OPF', [child['name'] for child in saved['children']])
+
+if __name__ == '__main__':
+    unittest.main()
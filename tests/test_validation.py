@@ -0,0 +1,76 @@
+import contextlib
+import io
+import unittest
+
+from PyPOCL import deterministic_uuid
+from PyPOCL.PyDPOCL import POCLPlanner
+from PyPOCL.plan_utility import changed_since, check_plan_correctness
+from PyPOCL.worldmodel import load_domain_and_problem
+
+class ComparingPlanner(POCLPlanner):
+    """planner which also checks every plan in full, and counts the plans for which the checks disagree"""
+    def __init__(self, *args, **kwargs):
+        self.checked = 0
+        self.disagreements = 0
+        super().__init__(*args, **kwargs)
+
+    def validate(self, plan, parent_plan=None):
+        if parent_plan is not None:
+            self.checked += 1
+            with contextlib.redirect_stdout(io.StringIO()):
+                if check_plan_correctness(plan) != check_plan_correctness(plan, parent_plan):
+                    self.disagreements += 1
+        super().validate(plan, parent_plan)
+
+class TestValidation(unittest.TestCase):
+    def setUp(self):
+        benchmark_dir = "tests/benchmarks/manipulation-domain-geometric-threats"
+        self.domain, self.problem = load_domain_and_problem(f"{benchmark_dir}/domain.pddl",
+                                                            f"{benchmark_dir}/problem.pddl",
+                                                            f"{benchmark_dir}/worldmodel.json")
+
+    def test_unknown_level(self):
+        with self.assertRaises(ValueError):
+            POCLPlanner(self.domain, self.problem, validation='partial')
+
+    def test_changed_since(self):
+        planner = POCLPlanner(self.domain, self.problem)
+        root = planner.pop()
+        root.update_flaws()
+        _, successors, _ = planner.expand_isolated(root, root.flaws.next(), 0)
+        self.assertGreater(len(successors), 0)
+        for plan, _ in successors:
+            steps, links, _, _ = changed_since(plan, root)
+            self.assertEqual(len(links), 1)
+            self.assertTrue({step.ID for step in plan.steps if step not in root.steps} <= steps)
+            self.assertEqual(changed_since(plan, plan), (set(), set(), set(), set()))
+
+    def test_full_by_default(self):
+        self.assertEqual(POCLPlanner(self.domain, self.problem, observers=[]).validation, 'full')
+        self.assertEqual(POCLPlanner(self.domain, self.problem, log=True, observers=[]).validation, 'full')
+
+    def test_levels_find_same_plans(self):
+        state = deterministic_uuid.getstate()
+        results = {}
+        for validation in ['off', 'incremental', 'full']:
+            deterministic_uuid.setstate(state)
+            planner = POCLPlanner(self.domain, self.problem, validation=validation)
+            plans, report = planner.solve(k=1, cutoff=60)
+            self.assertEqual(len(plans), 1)
+            results[validation] = (report.expanded, report.visited, plans[0].cost)
+            if validation == 'off':
+                self.assertEqual(report.validation_time, 0)
+            else:
+                self.assertGreater(report.validation_time, 0)
+        self.assertEqual(results['off'], results['incremental'])
+        self.assertEqual(results['off'], results['full'])
+
+    def test_incremental_agrees_with_full(self):
+        planner = ComparingPlanner(self.domain, self.problem, validation='incremental')
+        plans, _ = planner.solve(k=1, cutoff=60)
+        self.assertEqual(len(plans), 1)
+        self.assertGreater(planner.checked, 0)
+        self.assertEqual(planner.disagreements, 0)
+
+if __name__ == '__main__':
+    unittest.main()
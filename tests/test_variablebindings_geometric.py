@@ -2,7 +2,7 @@ import unittest
 
 from uuid import uuid4
 from collections import defaultdict
-from PyPOCL.Ground_Compiler_Library.VariableBindingsGeometric import VariableBindingsGeometric, MARGIN_OF_ERROR
+from PyPOCL.Ground_Compiler_Library.VariableBindingsGeometric import VariableBindingsGeometric, MARGIN_OF_ERROR, INDEX_OVERFLOW
 from PyPOCL.Ground_Compiler_Library.Element import Argument
 from shapely import Polygon, overlaps, within
 
@@ -348,5 +348,84 @@ class TestVariableBindingsGeometric(unittest.TestCase):
                         "goal2 area is not assigned correctly")
 
 
+    def test_query_areas(self):
+        """
+        test that the spatial index finds defined areas and assigned areas, and is updated after assignment
+        """
+        vb = VariableBindingsGeometric()
+
+        area_args = {"base": Argument(name="area_base"),
+                     "A": Argument(name="area_A"),
+                     "B": Argument(name="area_B")}
+        areas = {}
+        areas[area_args["base"]] = Polygon([(0, 0), (0, 1), (1, 1), (1, 0)])
+        areas[area_args["A"]] = Polygon([(0, 0), (0, 0.2), (0.2, 0.2), (0.2, 0)])
+        areas[area_args["B"]] = Polygon([(0.8, 0.8), (0.8, 1), (1, 1), (1, 0.8)])
+        vb.set_areas(areas)
+        vb.set_base_area(area_args["base"])
+
+        var = Argument(name="var_A")
+        vb.register_variable(var, Argument(name="obj_A"), 0.1, 0.1)
+        query = Polygon([(0.1, 0.1), (0.1, 0.5), (0.5, 0.5), (0.5, 0.1)])
+        self.assertEqual(vb.query_areas(query), {area_args["base"], area_args["A"]})
+        self.assertEqual(vb.query_areas(query, 'overlaps'), {area_args["A"]})
+
+        # an assigned area is found by queries made after the assignment
+        vb.set_assigned_area(var, Polygon([(0.3, 0.3), (0.3, 0.4), (0.4, 0.4), (0.4, 0.3)]))
+        self.assertEqual(vb.query_areas(query, 'overlaps'), {area_args["A"]})
+        self.assertEqual(vb.query_areas(query, 'contains'), {var})
+
+        # copies keep their own index
+        vb_copy = vb.copy()
+        vb_copy.set_assigned_area(var, Polygon([(0.8, 0.1), (0.8, 0.2), (0.9, 0.2), (0.9, 0.1)]))
+        self.assertEqual(vb_copy.query_areas(query, 'contains'), set())
+        self.assertEqual(vb.query_areas(query, 'contains'), {var})
+
+        # areas assigned after the index was built are found, also once the index is rebuilt
+        index = vb._dynamic_index
+        extra = [Argument(name=f"var_{i}") for i in range(INDEX_OVERFLOW + 1 - len(vb._unindexed))]
+        for i, extra_var in enumerate(extra):
+            vb.register_variable(extra_var, Argument(name=f"obj_{i}"), 0.01, 0.01)
+            x = 0.11 + 0.02*i
+            vb.set_assigned_area(extra_var, Polygon([(x, 0.45), (x, 0.46), (x + 0.01, 0.46), (x + 0.01, 0.45)]))
+            if i < len(extra) - 1:
+                self.assertIs(vb._dynamic_index, index)
+            self.assertEqual(vb.query_areas(query, 'contains'), {var} | set(extra[:i + 1]))
+        self.assertIsNot(vb._dynamic_index, index)
+        vb.set_assigned_area(var, Polygon([(0.8, 0.1), (0.8, 0.2), (0.9, 0.2), (0.9, 0.1)]))
+        self.assertEqual(vb.query_areas(query, 'contains'), set(extra))
+
+
+    def test_resolve_narrow_gap(self):
+        """
+        test that an area is placed in a gap which is just wide enough and not aligned with the grid
+        """
+        vb = VariableBindingsGeometric()
+
+        area_args = {"base": Argument(name="area_base"),
+                     "A": Argument(name="area_A"),
+                     "B": Argument(name="area_B")}
+        areas = {}
+        areas[area_args["base"]] = Polygon([(0, 0), (0, 0.3), (1, 0.3), (1, 0)])
+        areas[area_args["A"]] = Polygon([(0.005, 0), (0.005, 0.3), (0.303, 0.3), (0.303, 0)])
+        areas[area_args["B"]] = Polygon([(0.5137, 0), (0.5137, 0.3), (1, 0.3), (1, 0)])
+        vb.set_areas(areas)
+        vb.set_base_area(area_args["base"])
+
+        var = Argument(name="var_A")
+        vb.register_variable(var, Argument(name="obj_A"), 0.2107 - vb.buffer, 0.2)
+        vb.add_disjunction(var, area_args["A"])
+        vb.add_disjunction(var, area_args["B"])
+
+        grid_vb = vb.copy()
+        grid_vb.placement = 'grid'
+        self.assertFalse(grid_vb.resolve(var), "grid search found a position in the gap")
+        self.assertTrue(vb.resolve(var), "could not place the area in the gap")
+        area = vb.get_assigned_area(var)
+        self.assertAlmostEqual(area.bounds[0], 0.303, places=6)
+        self.assertFalse(overlaps(area.buffer(-MARGIN_OF_ERROR), areas[area_args["A"]]))
+        self.assertFalse(overlaps(area.buffer(-MARGIN_OF_ERROR), areas[area_args["B"]]))
+
+
 if __name__ == '__main__':
     unittest.main()
\ No newline at end of file